@@ -1,11 +1,20 @@
 # attack_demo.py
 import argparse
+import os
+import random
 import secrets
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
 
-from storage import load_public
+try:
+    import numpy as np
+except ImportError:  # numpy e opțional: simularea rapidă cade pe random din stdlib
+    np = None
+
+import bigint
+from storage import open_store
 from utils import generate_blum_modulus
 from ffs import keygen_ffs
-from storage import save_public
 
 def attacker_round(n: int, v: list[int], k: int) -> bool:
     """
@@ -22,7 +31,8 @@ def attacker_round(n: int, v: list[int], k: int) -> bool:
     y = secrets.randbelow(n - 2) + 2
 
     # compute base = y^2 * Π v^{e*}
-    base = pow(y, 2, n)
+    n = bigint.mpz(n)
+    base = bigint.powmod(y, 2, n)
     for i in range(k):
         if e_star[i] == 1:
             base = (base * v[i]) % n
@@ -43,7 +53,7 @@ def attacker_round(n: int, v: list[int], k: int) -> bool:
 
     # If guessed right, attacker sends y.
     # Verifier check:
-    z = pow(y, 2, n)
+    z = bigint.powmod(y, 2, n)
     for i in range(k):
         if e[i] == 1:
             z = (z * v[i]) % n
@@ -56,18 +66,97 @@ def trial(n: int, v: list[int], k: int, t: int) -> bool:
             return False
     return True
 
+# =========================
+# Simulare rapidă (Monte Carlo fără aritmetică modulară)
+# =========================
+# Atacul reușește într-o rundă exact când challenge-ul e al verifier-ului
+# coincide cu ghicitul e* (verificarea z = ±x trece apoi automat). e și e*
+# sunt k biți uniformi independenți, deci "e == e*" <=> e XOR e* == 0, un
+# șir uniform de k biți egal cu 0. O încercare reușește dacă asta se
+# întâmplă în toate cele t runde. Încercările sunt independente, așa că
+# ajunge să numărăm câte supraviețuiesc după fiecare rundă.
+
+_WORD = 62  # biți per extragere (< 63, ca să încapă în int64)
+
+
+def _survivors_numpy(rng, alive: int, k: int, batch: int) -> int:
+    """Din 'alive' încercări, câte ghicesc o rundă (toți cei k biți)."""
+    survivors = 0
+    while alive > 0:
+        size = min(alive, batch)
+        alive -= size
+        matched = np.ones(size, dtype=bool)
+        for offset in range(0, k, _WORD):
+            w = min(_WORD, k - offset)
+            matched &= rng.integers(0, 1 << w, size=size, dtype=np.int64) == 0
+        survivors += int(np.count_nonzero(matched))
+    return survivors
+
+
+def _survivors_python(rng: random.Random, alive: int, k: int) -> int:
+    return sum(1 for _ in range(alive) if rng.getrandbits(k) == 0)
+
+
+def simulate_chunk(k: int, t: int, trials: int, seed: int, batch: int = 1 << 20) -> int:
+    """Numărul de încercări câștigătoare din 'trials' (rulează și în procese worker)."""
+    rng = np.random.default_rng(seed) if np is not None else random.Random(seed)
+
+    alive = trials
+    for _ in range(t):
+        if alive == 0:
+            break
+        if np is not None:
+            alive = _survivors_numpy(rng, alive, k, batch)
+        else:
+            alive = _survivors_python(rng, alive, k)
+    return alive
+
+
+def simulate(k: int, t: int, trials: int, workers: int = 1, chunk: int = 50_000_000) -> int:
+    """Împarte 'trials' în bucăți cu seed-uri independente pe un process pool."""
+    sizes = [chunk] * (trials // chunk) + ([trials % chunk] if trials % chunk else [])
+    seeds = [secrets.randbits(128) for _ in sizes]
+    if workers <= 1 or len(sizes) == 1:
+        return sum(simulate_chunk(k, t, size, seed) for size, seed in zip(sizes, seeds))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return sum(ex.map(simulate_chunk, [k] * len(sizes), [t] * len(sizes), sizes, seeds))
+
+
+def wilson_interval(wins: int, trials: int, z: float = 1.959963984540054) -> tuple[float, float]:
+    """Interval de încredere Wilson (implicit 95%); funcționează și pentru 0 câștiguri."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = wins / trials
+    denom = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denom
+    half = z * sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--name", default=None, help="folosește keys/<name>_public.json dacă există")
     ap.add_argument("--keys-dir", default="keys")
+    ap.add_argument("--store", default=None, help="baza SQLite cu cheile publice (default: JSON in --keys-dir)")
     ap.add_argument("--k", type=int, default=5)
     ap.add_argument("--t", type=int, default=4)
-    ap.add_argument("--trials", type=int, default=2000)
+    ap.add_argument("--trials", type=lambda x: int(float(x)), default=2000, help="ex: 2000 sau 1e9")
     ap.add_argument("--bits", type=int, default=256, help="doar dacă nu folosești --name (generează n nou)")
+    ap.add_argument("--fast", action="store_true",
+                    help="simulare Monte Carlo a evenimentelor e == e* (NumPy + process pool)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="procese pentru --fast")
+    ap.add_argument("--cross-check", type=int, default=2000,
+                    help="cu --fast: cate incercari ruleaza si cu aritmetica completa (0 = deloc)")
+    bigint.add_cli_args(ap)
     args = ap.parse_args()
+    bigint.apply_cli_args(ap, args)
+
+    if args.fast:
+        return run_fast(args)
 
+    store = open_store(args.store, args.keys_dir)
     if args.name:
-        pub = load_public(args.name, keys_dir=args.keys_dir)
+        pub = store.load_public(args.name)
         n = pub["n"]
         k = pub["k"]
         v = pub["v"]
@@ -75,9 +164,10 @@ def main():
         # Generează un sistem nou rapid (public key) ca să testezi atacul
         p, q, n = generate_blum_modulus(args.bits)
         keys = keygen_ffs(n, args.k)
-        save_public(keys, "temp_attacksys", keys_dir=args.keys_dir)
+        store.save_public(keys, "temp_attacksys")
         k = keys.k
         v = keys.v
+    store.close()
 
     wins = 0
     for _ in range(args.trials):
@@ -88,9 +178,46 @@ def main():
     theoretical = 2 ** (-(k * args.t))
 
     print("=== ATTACK DEMO (impostor, fara secrete) ===")
-    print("k =", k, "t =", args.t, "trials =", args.trials)
+    print("k =", k, "t =", args.t, "trials =", args.trials, "| bigint:", bigint.name)
     print("Empiric success rate:", empirical)
     print("Teoretic approx:", theoretical)
 
+
+def load_or_make_system(args: argparse.Namespace) -> tuple[int, int, list[int]]:
+    store = open_store(args.store, args.keys_dir)
+    try:
+        if args.name:
+            pub = store.load_public(args.name)
+            return pub["n"], pub["k"], pub["v"]
+        p, q, n = generate_blum_modulus(args.bits)
+        keys = keygen_ffs(n, args.k)
+        store.save_public(keys, "temp_attacksys")
+        return n, keys.k, keys.v
+    finally:
+        store.close()
+
+
+def run_fast(args: argparse.Namespace) -> None:
+    n, k, v = load_or_make_system(args) if (args.name or args.cross_check > 0) else (0, args.k, [])
+    t = args.t
+
+    wins = simulate(k, t, args.trials, workers=args.workers)
+    lo, hi = wilson_interval(wins, args.trials)
+    theoretical = 2 ** (-(k * t))
+
+    print("=== ATTACK DEMO (simulare rapida, fara aritmetica modulara) ===")
+    print("k =", k, "t =", t, "trials =", args.trials, "| backend:", "numpy" if np is not None else "python",
+          "| workers:", args.workers)
+    print("Castiguri:", wins)
+    print("Empiric success rate:", wins / args.trials)
+    print(f"IC 95% (Wilson): [{lo:.3e}, {hi:.3e}]")
+    print("Teoretic 2^-(k*t):", theoretical, "| in interval?", lo <= theoretical <= hi)
+
+    if args.cross_check > 0:
+        full = sum(trial(n, v, k, t) for _ in range(args.cross_check))
+        clo, chi = wilson_interval(full, args.cross_check)
+        print(f"Cross-check aritmetica completa: {full}/{args.cross_check} "
+              f"IC 95% [{clo:.3e}, {chi:.3e}] | teoretic in interval? {clo <= theoretical <= chi}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,188 @@
+# audit.py
+# Re-verificarea în bloc a transcripturilor scrise de verifier.py / server.py
+# (--transcript): fiecare rundă (nume, runda, x, e, y, ok) este recalculată cu
+# verificarea protocolului cheii (protocols.py: ffs / gq) și comparată cu
+# rezultatul înregistrat.
+#
+# Fișierul se citește în flux (transcript.iter_chunks) și bucățile se trimit
+# unui pool de procese cu cel mult --in-flight bucăți în zbor, deci memoria
+# rămâne mărginită indiferent de mărimea jurnalului. Din nepotriviri și din
+# înregistrările corupte se păstrează doar numărul și primele --max-report.
+#
+# Exemplu:
+#   python verifier.py --name alice --sessions 1000 --pool 4 --transcript audit.log
+#   python audit.py audit.log --workers 8
+
+import argparse
+import os
+import struct
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+import protocols
+from storage import open_store
+from transcript import decode_record, iter_chunks
+
+# starea fiecărui worker: backend-ul de chei și cheile publice deja încărcate
+_store = None
+_pubs: Dict[str, Optional[Dict[str, Any]]] = {}
+
+
+def _init_worker(keys_dir: str, store: Optional[str]) -> None:
+    global _store
+    _store = open_store(store, keys_dir)
+    _pubs.clear()
+
+
+def _lookup(name: str) -> Optional[Dict[str, Any]]:
+    if name not in _pubs:
+        try:
+            _pubs[name] = _store.load_public(name)
+        except (OSError, KeyError, ValueError):
+            _pubs[name] = None
+    return _pubs[name]
+
+
+def audit_chunk(start: int, payloads: List[bytes]) -> Tuple[int, int, list, list]:
+    """
+    Re-verifică o bucată de înregistrări.
+    Întoarce (acceptate, fără cheie, nepotriviri, corupte); o nepotrivire este
+    (index, nume, runda, ok înregistrat, ok recalculat), o înregistrare
+    coruptă (index, motiv).
+    """
+    accepted = unknown = 0
+    mismatches = []
+    corrupt = []
+    for i, payload in enumerate(payloads, start=start):
+        try:
+            name, round_no, x, e, y, ok = decode_record(payload)
+        except (struct.error, ValueError) as exc:
+            corrupt.append((i, f"nu se poate decoda: {exc}"))
+            continue
+        pub = _lookup(name)
+        if pub is None:
+            unknown += 1
+            continue
+        actual = len(e) == pub["k"] and protocols.get(protocols.of_public(pub)).check(pub, x, e, y)
+        accepted += actual
+        if actual != ok:
+            mismatches.append((i, name, round_no, ok, actual))
+    return accepted, unknown, mismatches, corrupt
+
+
+def _chunks(path: str, chunk: int, start: int, corrupt: list):
+    """
+    iter_chunks, dar un fișier trunchiat sau fără antet devine o înregistrare
+    coruptă (index, motiv) în loc să oprească auditul; restul fișierului nu
+    se mai poate citi (lungimile nu mai sunt de încredere).
+    """
+    try:
+        for payloads in iter_chunks(path, chunk):
+            yield payloads
+            start += len(payloads)
+    except (EOFError, ValueError) as exc:
+        corrupt.append((start, f"{path}: {exc}"))
+
+
+def audit(paths: List[str], keys_dir: str = "keys", store: Optional[str] = None, workers: int = 1,
+          chunk: int = 4096, in_flight: int = 0, max_sample: int = 20) -> Dict[str, Any]:
+    """
+    Re-verifică toate înregistrările din 'paths'. workers=1 rulează în
+    procesul curent; altfel un ProcessPoolExecutor cu cel mult 'in_flight'
+    bucăți trimise și neterminate (default 2*workers).
+    Raportul numără nepotrivirile și înregistrările corupte și păstrează din
+    fiecare doar primele 'max_sample' (după index).
+    """
+    report = {"records": 0, "accepted": 0, "unknown": 0, "mismatches": 0, "mismatch_sample": [],
+              "corrupt": 0, "corrupt_sample": [], "bytes": 0}
+
+    def keep(key: str, sample: str, findings: list) -> None:
+        report[key] += len(findings)
+        kept = report[sample]
+        kept.extend(findings)
+        if len(kept) > max_sample:
+            kept.sort()
+            del kept[max_sample:]
+
+    def collect(count: int, result) -> None:
+        accepted, unknown, mismatches, corrupt = result
+        report["records"] += count
+        report["accepted"] += accepted
+        report["unknown"] += unknown
+        keep("mismatches", "mismatch_sample", mismatches)
+        keep("corrupt", "corrupt_sample", corrupt)
+
+    def read_errors(found: list) -> None:
+        keep("corrupt", "corrupt_sample", found)
+        found.clear()
+
+    t0 = time.perf_counter()
+    found: list = []
+    if workers <= 1:
+        _init_worker(keys_dir, store)
+        for path in paths:
+            start = report["records"]
+            for payloads in _chunks(path, chunk, start, found):
+                collect(len(payloads), audit_chunk(start, payloads))
+                start += len(payloads)
+            read_errors(found)
+    else:
+        limit = in_flight or 2 * workers
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(keys_dir, store)) as ex:
+            pending: Dict[Any, int] = {}
+            start = 0
+            for path in paths:
+                for payloads in _chunks(path, chunk, start, found):
+                    if len(pending) >= limit:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                            collect(pending.pop(fut), fut.result())
+                    pending[ex.submit(audit_chunk, start, payloads)] = len(payloads)
+                    start += len(payloads)
+                read_errors(found)
+            for fut in list(pending):
+                collect(pending.pop(fut), fut.result())
+
+    report["seconds"] = time.perf_counter() - t0
+    report["bytes"] = sum(os.path.getsize(p) for p in paths)
+    report["mismatch_sample"].sort()
+    report["corrupt_sample"].sort()
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-verificare paralela a transcripturilor FFS")
+    ap.add_argument("transcripts", nargs="+", help="fisiere scrise cu --transcript")
+    ap.add_argument("--keys-dir", default="keys")
+    ap.add_argument("--store", default=None, help="baza SQLite cu cheile publice (default: JSON in --keys-dir)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="procese (default: toate CPU-urile)")
+    ap.add_argument("--chunk", type=int, default=4096, help="inregistrari per bucata trimisa unui worker")
+    ap.add_argument("--in-flight", type=int, default=0, help="bucati in zbor (default: 2 * workers)")
+    ap.add_argument("--max-report", type=int, default=20, help="cate nepotriviri si inregistrari corupte se pastreaza si se afiseaza")
+    args = ap.parse_args()
+
+    report = audit(args.transcripts, args.keys_dir, args.store, args.workers, args.chunk, args.in_flight,
+                   args.max_report)
+
+    seconds = max(report["seconds"], 1e-9)
+    print("=== AUDIT TRANSCRIPT ===")
+    print("records:", report["records"], "| accepted:", report["accepted"],
+          "| unknown keys:", report["unknown"], "| mismatches:", report["mismatches"],
+          "| corrupt:", report["corrupt"])
+    print(f"time: {seconds:.2f}s | {report['records'] / seconds:,.0f} records/s"
+          f" | {report['bytes'] / seconds / 2**20:.1f} MiB/s | workers: {args.workers}")
+    for index, name, round_no, recorded, actual in report["mismatch_sample"]:
+        print(f"  #{index}: {name} runda {round_no}: inregistrat ok={recorded}, recalculat ok={actual}")
+    if report["mismatches"] > len(report["mismatch_sample"]):
+        print(f"  ... inca {report['mismatches'] - len(report['mismatch_sample'])}")
+    for index, reason in report["corrupt_sample"]:
+        print(f"  #{index}: corupt: {reason}")
+    if report["corrupt"] > len(report["corrupt_sample"]):
+        print(f"  ... inca {report['corrupt'] - len(report['corrupt_sample'])} corupte")
+
+    return 0 if not report["mismatches"] and not report["unknown"] and not report["corrupt"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+# bench_bigint.py
+# Backend-urile din bigint.py (int Python vs gmpy2): timp de keygen
+# (generate_blum_modulus + keygen_ffs) și runde ffs_round pe secundă,
+# la dimensiunile date ale lui n.
+import argparse
+import statistics
+import time
+
+import bigint
+from ffs import authenticate, keygen_ffs
+from utils import generate_blum_modulus
+
+
+def bench_keygen(nbits: int, k: int, samples: int):
+    times = []
+    keys = None
+    for _ in range(samples):
+        start = time.perf_counter()
+        _, _, n = generate_blum_modulus(nbits // 2)
+        keys = keygen_ffs(n, k)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), keys
+
+
+def bench_rounds(keys, seconds: float) -> float:
+    rounds = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        authenticate(keys, 16)
+        rounds += 16
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="bigint backend: keygen si runde/s (python vs gmpy2)")
+    ap.add_argument("--nbits", type=int, nargs="+", default=[2048, 4096], help="dimensiuni n (biti)")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--samples", type=int, default=3, help="keygen-uri per backend si dimensiune")
+    ap.add_argument("--seconds", type=float, default=2.0, help="durata masurarii rundelor")
+    ap.add_argument("--backends", nargs="+", choices=bigint.BACKENDS[1:], default=list(bigint.available()))
+    args = ap.parse_args()
+
+    missing = [b for b in args.backends if b not in bigint.available()]
+    if missing:
+        ap.error(f"backend indisponibil: {', '.join(missing)} (pip install gmpy2)")
+
+    print(f"=== BIGINT BACKENDS (k={args.k}, samples={args.samples}) ===")
+    print(f"{'n bits':>7} {'backend':>8} {'keygen s':>10} {'rounds/s':>10} {'keygen x':>9} {'rounds x':>9}")
+    for nbits in args.nbits:
+        base = None
+        for backend in args.backends:
+            bigint.use(backend)
+            keygen_s, keys = bench_keygen(nbits, args.k, args.samples)
+            rate = bench_rounds(keys, args.seconds)
+            if base is None:
+                base = (keygen_s, rate)
+            print(f"{nbits:>7} {backend:>8} {keygen_s:>10.3f} {rate:>10.0f} "
+                  f"{base[0] / keygen_s:>8.2f}x {rate / base[1]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
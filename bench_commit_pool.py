@@ -0,0 +1,56 @@
+# bench_commit_pool.py
+# Latența online per rundă a prover-ului (commit + răspuns) cu și fără
+# commitment-uri precalculate (commit_pool.CommitmentPool).
+import argparse
+import secrets
+import statistics
+import time
+
+from commit_pool import CommitmentPool
+from ffs import keygen_ffs
+from prover import ProverSession
+from utils import generate_blum_modulus
+
+
+def online_latencies(session: ProverSession, rounds: int) -> list[float]:
+    k = session.keys.k
+    samples = []
+    for _ in range(rounds):
+        e = [secrets.randbelow(2) for _ in range(k)]
+        start = time.perf_counter()
+        session._commit()
+        session._respond(session.r.pop(), e)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Prover per-round latency with/without commitment pool")
+    ap.add_argument("--bits", type=int, default=1024, help="bits pentru p,q (default: 1024)")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--capacity", type=int, default=256)
+    args = ap.parse_args()
+
+    _, _, n = generate_blum_modulus(args.bits)
+    keys = keygen_ffs(n, args.k)
+
+    plain = online_latencies(ProverSession(keys, "bench", args.rounds), args.rounds)
+
+    pool = CommitmentPool(n, capacity=args.capacity, low_water=args.capacity // 4)
+    pool.wait_full()
+    pooled = online_latencies(ProverSession(keys, "bench", args.rounds, commit_pool=pool), args.rounds)
+    stats = pool.stats()
+    pool.close()
+
+    print(f"=== COMMITMENT POOL (n bitlen {n.bit_length()}, k={args.k}, rounds={args.rounds}) ===")
+    print(f"{'path':>8} {'median us':>10} {'p95 us':>10}")
+    for label, s in (("online", plain), ("pool", pooled)):
+        s = sorted(s)
+        print(f"{label:>8} {statistics.median(s) * 1e6:>10.1f} {s[int(0.95 * (len(s) - 1))] * 1e6:>10.1f}")
+    print("drop:", f"{(1 - statistics.median(pooled) / statistics.median(plain)) * 100:.0f}%")
+    print("pool stats:", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench_identity.py
+# Lookup-uri de chei publice pe secundă la verifier: fișierele JSON din
+# keys_dir (storage.load_public, I/O + parsare per utilizator) față de
+# modul bazat pe identitate (identity.IdentityStore, v derivat din nume),
+# fără cache și cu LRU. Cheile sunt extrase de același centru, deci
+# ambele căi întorc exact aceleași publice.
+import argparse
+import random
+import tempfile
+import time
+
+import bigint
+from identity import IdentityStore, TrustedCenter, save_center
+from storage import JsonKeyStore
+
+
+def rate(store, names, lookups: int) -> float:
+    start = time.perf_counter()
+    for i in range(lookups):
+        store.load_public(names[i % len(names)])
+    return lookups / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lookup-uri/s: chei JSON vs chei derivate din identitate")
+    ap.add_argument("--bits", type=int, default=256, help="dimensiune p,q in biti (default: 256)")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--lookups", type=int, default=20000)
+    bigint.add_cli_args(ap)
+    args = ap.parse_args()
+    bigint.apply_cli_args(ap, args)
+
+    center = TrustedCenter.generate(args.bits, args.k)
+    names = [f"user{i:06d}" for i in range(args.users)]
+    random.shuffle(names)
+
+    with tempfile.TemporaryDirectory() as keys_dir:
+        _, params = save_center(center, keys_dir)
+        json_store = JsonKeyStore(keys_dir)
+        for name in names:
+            json_store.save_public(center.extract(name), name)
+
+        ident = IdentityStore(str(params), cache_size=0)
+        assert all(ident.load_public(nm)["v"] == json_store.load_public(nm)["v"] for nm in names[:10])
+        cached = IdentityStore(str(params), cache_size=args.users)
+
+        print(f"=== IDENTITY LOOKUPS (n={center.n.bit_length()} biti, k={args.k}, users={args.users}, "
+              f"lookups={args.lookups}, bigint={bigint.name}) ===")
+        print(f"{'store':>16} {'lookups/s':>12} {'us/lookup':>10}")
+        for label, store in (("json", json_store), ("identity", ident), ("identity+lru", cached)):
+            r = rate(store, names, args.lookups)
+            print(f"{label:>16} {r:>12.0f} {1e6 / r:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
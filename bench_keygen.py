@@ -0,0 +1,40 @@
+# bench_keygen.py
+# Scalare generare Blum modulus (p,q) pe 1..N procese.
+import argparse
+import os
+import statistics
+import time
+
+from utils import generate_blum_modulus
+
+
+def time_keygen(bits: int, workers: int, reps: int) -> list[float]:
+    samples = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        generate_blum_modulus(bits, workers=workers)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Blum modulus keygen: wall time vs numar de procese")
+    ap.add_argument("--bits", type=int, default=1024, help="bits pentru p,q (default: 1024)")
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--reps", type=int, default=5, help="repetari per configuratie (default: 5)")
+    args = ap.parse_args()
+
+    print(f"=== KEYGEN SCALING (bits(p)={args.bits}, reps={args.reps}) ===")
+    print(f"{'workers':>8} {'median ms':>12} {'min ms':>10} {'speedup':>8}")
+
+    base = None
+    for workers in range(1, args.max_workers + 1):
+        samples = time_keygen(args.bits, workers, args.reps)
+        med = statistics.median(samples)
+        if base is None:
+            base = med
+        print(f"{workers:>8} {med * 1000:>12.1f} {min(samples) * 1000:>10.1f} {base / med:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
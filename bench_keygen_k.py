@@ -0,0 +1,45 @@
+# bench_keygen_k.py
+# Timpul keygen_ffs (per secret) vs keygen_ffs_batch (inversare Montgomery) în funcție de k.
+import argparse
+import statistics
+import time
+
+from ffs import keygen_ffs, keygen_ffs_batch
+from utils import generate_blum_modulus
+from verifier import verifier_check
+
+
+def timed(fn, n: int, k: int, reps: int) -> float:
+    samples = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        fn(n, k)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="FFS keygen vs k: per-secret vs batched")
+    ap.add_argument("--bits", type=int, default=1024, help="bits pentru p,q (default: 1024)")
+    ap.add_argument("--k", type=int, nargs="+", default=[5, 64, 256, 1024, 4096])
+    ap.add_argument("--reps", type=int, default=5)
+    args = ap.parse_args()
+
+    _, _, n = generate_blum_modulus(args.bits)
+
+    # sanity: cheia batched verifică la fel ca cea clasică (y = s_j, e = e_j, x = ±1)
+    keys = keygen_ffs_batch(n, 8)
+    for j in range(keys.k):
+        e = [1 if i == j else 0 for i in range(keys.k)]
+        assert verifier_check(n, keys.v, 1, e, keys.s[j])
+
+    print(f"=== FFS KEYGEN vs k (n bitlen {n.bit_length()}, reps={args.reps}) ===")
+    print(f"{'k':>6} {'per-secret ms':>14} {'batched ms':>11} {'speedup':>8}")
+    for k in args.k:
+        old = timed(keygen_ffs, n, k, args.reps)
+        new = timed(keygen_ffs_batch, n, k, args.reps)
+        print(f"{k:>6} {old * 1000:>14.2f} {new * 1000:>11.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
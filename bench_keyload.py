@@ -0,0 +1,52 @@
+# bench_keyload.py
+# Timp de încărcare per cheie: format v1 (zecimal) vs v2 (hex), public și privat.
+import argparse
+import secrets
+import statistics
+import tempfile
+import time
+
+from ffs import FFSKeys
+from storage import load_private, load_public, save_private, save_public
+
+
+def random_keys(nbits: int, k: int) -> FFSKeys:
+    # valori aleatoare de dimensiunea lui n (parsarea nu depinde de structura cheii)
+    n = secrets.randbits(nbits) | (1 << (nbits - 1))
+    return FFSKeys(n=n, k=k, s=[secrets.randbelow(n) for _ in range(k)], v=[secrets.randbelow(n) for _ in range(k)])
+
+
+def time_load(fn, name: str, keys_dir: str, reps: int) -> float:
+    samples = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        fn(name, keys_dir=keys_dir)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Key load time: v1 (decimal JSON) vs v2 (hex JSON)")
+    ap.add_argument("--nbits", type=int, nargs="+", default=[2048, 4096], help="dimensiunea lui n")
+    ap.add_argument("--k", type=int, nargs="+", default=[5, 128])
+    ap.add_argument("--reps", type=int, default=50)
+    args = ap.parse_args()
+
+    print(f"=== KEY LOAD (reps={args.reps}) ===")
+    print(f"{'n bits':>7} {'k':>5} {'fmt':>4} {'public us':>10} {'private us':>11} {'pub bytes':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for nbits in args.nbits:
+            for k in args.k:
+                keys = random_keys(nbits, k)
+                for version in (1, 2):
+                    name = f"b{nbits}_{k}_v{version}"
+                    path = save_public(keys, name, keys_dir=tmp, version=version)
+                    save_private(keys, name, keys_dir=tmp, version=version)
+                    pub = time_load(load_public, name, tmp, args.reps)
+                    priv = time_load(load_private, name, tmp, args.reps)
+                    print(f"{nbits:>7} {k:>5} {'v' + str(version):>4} {pub * 1e6:>10.1f} {priv * 1e6:>11.1f} "
+                          f"{path.stat().st_size:>10}")
+
+
+if __name__ == "__main__":
+    main()
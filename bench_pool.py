@@ -0,0 +1,52 @@
+# bench_pool.py
+# Autentificări pe secundă: un proces prover nou per autentificare
+# (calea clasică din verifier.py) vs. pool de procese prover calde.
+import argparse
+import sys
+import time
+
+from prover_pool import ProverPool
+from storage import load_public
+from verifier import authenticate_spawn
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Spawn-per-auth vs warm prover pool")
+    ap.add_argument("--name", default="alice")
+    ap.add_argument("--keys-dir", default="keys")
+    ap.add_argument("--t", type=int, default=4)
+    ap.add_argument("--mode", default="sequential")
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--pool", type=int, default=2, help="dimensiunea pool-ului (default: 2)")
+    args = ap.parse_args()
+
+    # authenticate_spawn primește aceleași opțiuni ca verifier.py
+    args.python = sys.executable
+    args.verbose = False
+    args.precompute_mb = 0
+    args.window = None
+
+    pub = load_public(args.name, keys_dir=args.keys_dir)
+
+    def lookup(name: str):
+        return pub
+
+    start = time.perf_counter()
+    ok_spawn = sum(authenticate_spawn(args, lookup) for _ in range(args.sessions))
+    spawn_rate = args.sessions / (time.perf_counter() - start)
+
+    with ProverPool(args.pool, keys_dir=args.keys_dir) as pool:
+        pool.authenticate(lookup, args.name, args.t, args.mode)  # warm-up: încărcare chei
+        start = time.perf_counter()
+        ok_pool = sum(pool.authenticate(lookup, args.name, args.t, args.mode) for _ in range(args.sessions))
+        pool_rate = args.sessions / (time.perf_counter() - start)
+
+    print(f"=== PROVER POOL (t={args.t}, mode={args.mode}, sessions={args.sessions}) ===")
+    print(f"{'path':>14} {'auth/s':>10} {'accepted':>10}")
+    print(f"{'spawn-per-auth':>14} {spawn_rate:>10.1f} {ok_spawn:>10}")
+    print(f"{'pool(' + str(args.pool) + ')':>14} {pool_rate:>10.1f} {ok_pool:>10}")
+    print(f"speedup: {pool_rate / spawn_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench_precomp.py
+# Runde pe secundă (răspuns prover + verificare) vs k și fereastra tabelului.
+import argparse
+import secrets
+import time
+
+from ffs import keygen_ffs
+from precomp import SubsetProductTable, table_bytes
+from utils import generate_blum_modulus, random_coprime
+from verifier import verifier_check
+
+
+def rounds_per_sec(keys, window: int, rounds: int) -> float:
+    n, k = keys.n, keys.k
+    s_table = SubsetProductTable(keys.s, n, window) if window else None
+    v_table = SubsetProductTable(keys.v, n, window) if window else None
+
+    work = []
+    for _ in range(rounds):
+        r = random_coprime(n)
+        work.append((r, pow(r, 2, n), [secrets.randbelow(2) for _ in range(k)]))
+
+    start = time.perf_counter()
+    for r, x, e in work:
+        if s_table is not None:
+            y = s_table.product(e, r)
+        else:
+            y = r
+            for j in range(k):
+                if e[j] == 1:
+                    y = (y * keys.s[j]) % n
+        assert verifier_check(n, keys.v, x, e, y, v_table)
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Subset-product tables: rounds/s vs k and window")
+    ap.add_argument("--bits", type=int, default=1024, help="bits pentru p,q (default: 1024)")
+    ap.add_argument("--k", type=int, nargs="+", default=[5, 32, 128, 512])
+    ap.add_argument("--windows", type=int, nargs="+", default=[0, 2, 4, 8])
+    ap.add_argument("--rounds", type=int, default=500)
+    args = ap.parse_args()
+
+    _, _, n = generate_blum_modulus(args.bits)
+    print(f"=== PRECOMP (n bitlen {n.bit_length()}, rounds={args.rounds}) ===")
+    print(f"{'k':>6} {'window':>7} {'MiB/tabel':>10} {'rounds/s':>10} {'speedup':>8}")
+    for k in args.k:
+        keys = keygen_ffs(n, k)
+        base = None
+        for w in args.windows:
+            rps = rounds_per_sec(keys, w, args.rounds)
+            if base is None:
+                base = rps
+            mib = table_bytes(k, n, w) / 2**20 if w else 0.0
+            print(f"{k:>6} {w or '-':>7} {mib:>10.2f} {rps:>10.0f} {rps / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench_primes.py
+# Generare Blum primes: varianta veche (candidat random + 16 runde MR)
+# vs. ciur incremental + runde FIPS 186-5.
+import argparse
+import secrets
+import statistics
+import time
+
+from utils import _miller_rabin, is_probable_prime, mr_rounds, prime_candidates
+
+LEGACY_SMALL_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+
+
+def legacy_is_probable_prime(n: int, rounds: int = 16) -> bool:
+    for p in LEGACY_SMALL_PRIMES:
+        if n == p:
+            return True
+        if n % p == 0:
+            return False
+    return _miller_rabin(n, (secrets.randbelow(n - 3) + 2 for _ in range(rounds)))
+
+
+def legacy_prime(bits: int) -> tuple[int, int]:
+    """Reproduce generate_prime() de dinainte. Returnează (p, candidați testați)."""
+    tested = 0
+    while True:
+        p = secrets.randbits(bits) | (1 << (bits - 1)) | 1
+        if p % 4 != 3:
+            continue
+        tested += 1
+        if legacy_is_probable_prime(p):
+            return p, tested
+
+
+def sieve_prime(bits: int, bpsw: bool = False) -> tuple[int, int]:
+    tested = 0
+    rounds = mr_rounds(bits)
+    for p in prime_candidates(bits, require_mod4_eq_3=True):
+        tested += 1
+        if is_probable_prime(p, rounds=rounds, bpsw=bpsw):
+            return p, tested
+    raise AssertionError("unreachable")
+
+
+def run(fn, bits: int, reps: int) -> tuple[float, float]:
+    times, tested = [], []
+    for _ in range(reps):
+        start = time.perf_counter()
+        _, c = fn(bits)
+        times.append(time.perf_counter() - start)
+        tested.append(c)
+    return statistics.median(times) * 1000, statistics.mean(tested)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Prime search: legacy vs sieve + FIPS MR rounds")
+    ap.add_argument("--bits", type=int, nargs="+", default=[256, 512, 1024, 2048])
+    ap.add_argument("--reps", type=int, default=10, help="prime generate per configuratie (default: 10)")
+    args = ap.parse_args()
+
+    engines = [
+        ("legacy", legacy_prime),
+        ("sieve", sieve_prime),
+        ("sieve+bpsw", lambda b: sieve_prime(b, bpsw=True)),
+    ]
+
+    print(f"=== PRIME SEARCH (p ≡ 3 mod 4, reps={args.reps}) ===")
+    print(f"{'bits':>6} {'engine':>12} {'MR rounds':>10} {'tested/prime':>13} {'ms/prime':>10}")
+    for bits in args.bits:
+        for label, fn in engines:
+            ms, tested = run(fn, bits, args.reps)
+            rounds = 16 if label == "legacy" else mr_rounds(bits)
+            print(f"{bits:>6} {label:>12} {rounds:>10} {tested:>13.1f} {ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# bench_protocols.py
+# FFS vs Guillou–Quisquater la aceeași țintă de soundness (k*t >= S biți):
+# latența (p50), CPU și octeții pe fir per autentificare, plus mărimea
+# cheilor. Aceleași ProverSession / VerifierSession și același transport
+# (tuning.measure), deci diferența vine doar din protocol: FFS face k
+# înmulțiri per rundă și are k secrete, GQ o exponențiere cu un exponent
+# de ~k biți și un singur secret.
+import argparse
+
+import bigint
+import protocols
+import transport
+import tuning
+from utils import generate_blum_modulus
+from wire import CODECS, MODES
+
+
+def main():
+    ap = argparse.ArgumentParser(description="FFS vs GQ: latenta, CPU, octeti per autentificare la acelasi k*t")
+    ap.add_argument("--bits", type=int, default=256, help="dimensiune p,q in biti (default: 256)")
+    ap.add_argument("--soundness-bits", type=int, default=40, help="tinta k*t (default: 40)")
+    ap.add_argument("--t", type=int, nargs="+", default=[1, 2, 4, 8],
+                    help="numarul de runde; k = ceil(S / t) (default: 1 2 4 8)")
+    ap.add_argument("--transport", choices=("direct",) + transport.TRANSPORTS, default="queue")
+    ap.add_argument("--mode", choices=MODES, default="parallel")
+    ap.add_argument("--codec", choices=CODECS, default="bin")
+    ap.add_argument("--protocols", nargs="+", choices=protocols.NAMES, default=list(protocols.NAMES))
+    ap.add_argument("--sessions", type=int, default=100)
+    ap.add_argument("--warmup", type=int, default=10)
+    bigint.add_cli_args(ap)
+    args = ap.parse_args()
+    bigint.apply_cli_args(ap, args)
+
+    _, _, n = generate_blum_modulus(args.bits)
+    nbytes = (n.bit_length() + 7) // 8
+    print(f"=== PROTOCOLS (n={n.bit_length()} biti, k*t >= {args.soundness_bits}, transport={args.transport}, "
+          f"mode={args.mode}, codec={args.codec}, sessions={args.sessions}, bigint={bigint.name}) ===")
+    print(f"{'proto':>5} {'k':>4} {'t':>4} {'p50 ms':>9} {'cpu ms':>9} {'cpu_rate':>8} {'bytes':>7} "
+          f"{'pub B':>7} {'priv B':>7}")
+    for t in args.t:
+        k = -(-args.soundness_bits // t)
+        for name in args.protocols:
+            r = tuning.measure(n, k, t, args.transport, args.mode, args.codec, args.sessions, args.warmup, name)
+            # FFS: k valori v și k secrete s; GQ: un J și un a (fără n, comun)
+            count = k if name == "ffs" else 1
+            print(f"{name:>5} {k:>4} {t:>4} {r['latency_ms']:>9.3f} {r['cpu_ms']:>9.3f} {r['cpu_rate']:>8.0f} "
+                  f"{r['bytes']:>7} {count * nbytes:>7} {count * nbytes:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench_transport.py
+# Latența unei runde și mesaje/s pentru fiecare transport din transport.py,
+# cu aceleași ProverSession / VerifierSession (prover-ul într-un thread,
+# verifier-ul în thread-ul principal, o pereche de capete per transport).
+import argparse
+import statistics
+import threading
+import time
+
+import transport
+from prover import ProverSession, run_session as run_prover
+from storage import load_private
+from verifier import VerifierSession, run_session as run_verifier
+from wire import CODECS, MODES
+
+
+def bench(keys, name: str, kind: str, t: int, mode: str, codec: str, sessions: int):
+    pub = {"n": keys.n, "k": keys.k, "v": keys.v}
+    prover_end, verifier_end = transport.local_pair(kind)
+    codecs = (codec, "json")
+
+    def prover_loop() -> None:
+        for _ in range(sessions):
+            run_prover(ProverSession(keys, name, t, mode=mode, codecs=codecs), prover_end)
+
+    thread = threading.Thread(target=prover_loop, daemon=True)
+    thread.start()
+    times = []
+    accepted = 0
+    start = time.perf_counter()
+    for _ in range(sessions):
+        t0 = time.perf_counter()
+        accepted += run_verifier(VerifierSession(lambda _name: pub, t, modes=(mode,), codecs=codecs), verifier_end)
+        times.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    thread.join()
+    prover_end.close()
+    verifier_end.close()
+
+    # mesaje per sesiune: hello x2 + done, plus 4 per rundă (sequential) sau 4 în total (parallel)
+    messages = 3 + (4 * t if mode == "sequential" else 4)
+    round_us = statistics.median(times) / t * 1e6
+    return round_us, sessions * messages / total, accepted
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark per transport: latenta runda, mesaje/s")
+    ap.add_argument("--name", default="alice")
+    ap.add_argument("--keys-dir", default="keys")
+    ap.add_argument("--t", type=int, default=8)
+    ap.add_argument("--mode", choices=MODES, default="sequential")
+    ap.add_argument("--codec", choices=CODECS, default="bin", help="codec pentru stdio/unix/tcp")
+    ap.add_argument("--sessions", type=int, default=500)
+    ap.add_argument("--transports", nargs="+", choices=transport.TRANSPORTS, default=list(transport.TRANSPORTS))
+    args = ap.parse_args()
+
+    keys = load_private(args.name, keys_dir=args.keys_dir)
+    print(f"=== TRANSPORT (n={keys.n.bit_length()} biti, k={keys.k}, t={args.t}, mode={args.mode}, "
+          f"codec={args.codec}, sessions={args.sessions}) ===")
+    print(f"{'transport':>10} {'round us':>10} {'msg/s':>10} {'accepted':>9}")
+    for kind in args.transports:
+        round_us, rate, accepted = bench(keys, args.name, kind, args.t, args.mode, args.codec, args.sessions)
+        print(f"{kind:>10} {round_us:>10.1f} {rate:>10.0f} {accepted:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_wire.py
+# Codec JSON vs binar: timp encode/decode și octeți per rundă.
+import argparse
+import io
+import secrets
+import time
+
+from wire import JSON, make_codec
+
+
+def round_messages(n: int, k: int, round_no: int) -> list[dict]:
+    """Mesajele unei runde secvențiale (commit, challenge, response, result)."""
+    return [
+        {"type": "commit", "round": round_no, "x": secrets.randbelow(n)},
+        {"type": "challenge", "round": round_no, "e": [secrets.randbelow(2) for _ in range(k)]},
+        {"type": "response", "round": round_no, "y": secrets.randbelow(n)},
+        {"type": "result", "round": round_no, "ok": True},
+    ]
+
+
+def bench(codec, msgs: list[dict], reps: int) -> tuple[float, float, int]:
+    frames = [codec.encode(m) for m in msgs]
+    size = sum(len(f) for f in frames)
+    stream = b"".join(frames)
+
+    start = time.perf_counter()
+    for _ in range(reps):
+        for m in msgs:
+            codec.encode(m)
+    enc = (time.perf_counter() - start) / reps
+
+    start = time.perf_counter()
+    for _ in range(reps):
+        inp = io.BytesIO(stream)
+        for _ in msgs:
+            codec.read(inp)
+    dec = (time.perf_counter() - start) / reps
+    return enc, dec, size
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Wire codecs: JSON lines vs binary frames")
+    ap.add_argument("--nbits", type=int, nargs="+", default=[2048, 4096], help="dimensiunea lui n")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--rounds", type=int, default=100, help="runde per masuratoare")
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+
+    print(f"=== WIRE CODECS (k={args.k}, {args.rounds} rounds x {args.reps} reps) ===")
+    print(f"{'n bits':>7} {'codec':>6} {'enc us/rnd':>11} {'dec us/rnd':>11} {'bytes/rnd':>10}")
+    for nbits in args.nbits:
+        n = secrets.randbits(nbits) | (1 << (nbits - 1))
+        msgs = [m for r in range(1, args.rounds + 1) for m in round_messages(n, args.k, r)]
+        for codec in (JSON, make_codec("bin", n, args.k)):
+            enc, dec, size = bench(codec, msgs, args.reps)
+            print(f"{nbits:>7} {codec.name:>6} {enc / args.rounds * 1e6:>11.1f} "
+                  f"{dec / args.rounds * 1e6:>11.1f} {size / args.rounds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
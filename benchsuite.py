@@ -0,0 +1,301 @@
+# benchsuite.py
+# Suita de benchmark-uri FFS (înlocuiește Bench.py).
+#
+#   python benchsuite.py run --bits 512 1024 --k 5 32 --t 4 16 --out results.json
+#   python benchsuite.py compare baseline.json results.json --threshold 0.10
+#
+# Faze măsurate, pentru fiecare (bits, k, t) din grilă:
+#   keygen    - keygen_ffs / keygen_ffs_batch pe un n dat
+#   commit    - pasul (a): r, x = ±r^2 mod n (result ok -> commit, prin on_message)
+#   response  - pasul (c): y = r * Π s_j^{e_j} mod n (challenge -> response, prin on_message)
+#   verify    - pasul (d): verifier_check
+#   serialize - encode + decode pentru mesajele unei runde (json și bin)
+#   auth      - autentificare completă ProverSession <-> VerifierSession
+#               (t runde, mesajele trec prin codec), sequential și parallel
+#   rsa       - semnare + verificare RSA pe n de aceeași dimensiune (referință)
+#   modulus   - generate_blum_modulus (lent; doar la cerere)
+# Fiecare fază: warm-up, apoi 'samples' măsurători; raport median/p95/p99.
+import argparse
+import io
+import json
+import platform
+import secrets
+import statistics
+import sys
+import time
+from math import gcd
+from typing import Any, Callable, Dict, List, Optional
+
+from ffs import BATCH_KEYGEN_MIN_K, keygen_ffs, keygen_ffs_batch
+from prover import ProverSession
+from utils import generate_blum_modulus, generate_prime, modinv
+from verifier import VerifierSession, verifier_check
+from wire import CODECS, JSON, encode, make_codec
+
+PHASES = ("keygen", "commit", "response", "verify", "serialize", "auth", "rsa", "modulus")
+DEFAULT_PHASES = ("keygen", "commit", "response", "verify", "serialize", "auth", "rsa")
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Percentila q (0..1), metoda nearest-rank."""
+    if not sorted_samples:
+        return float("nan")
+    idx = min(len(sorted_samples) - 1, max(0, int(round(q * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[idx]
+
+
+def measure(fn: Callable[[], Any], warmup: int, samples: int,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """setup (opțional) rulează înaintea fiecărui apel fn, fără să fie cronometrat."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    times = []
+    for _ in range(samples):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "samples": samples,
+        "median_us": statistics.median(times) * 1e6,
+        "p95_us": percentile(times, 0.95) * 1e6,
+        "p99_us": percentile(times, 0.99) * 1e6,
+        "min_us": times[0] * 1e6,
+    }
+
+
+def rsa_keygen(bits: int):
+    e = 65537
+    while True:
+        p = generate_prime(bits, require_mod4_eq_3=False)
+        q = generate_prime(bits, require_mod4_eq_3=False)
+        if p == q:
+            continue
+        phi = (p - 1) * (q - 1)
+        if gcd(e, phi) == 1:
+            n = p * q
+            d = modinv(e, phi)
+            return n, e, d
+
+
+def exchange(prover: ProverSession, verifier: VerifierSession) -> bool:
+    """Pompează mesajele între cele două sesiuni, trecându-le prin codec-ul negociat."""
+    def deliver(msg, sender_codec, receiver_codec):
+        frame = encode(msg, sender_codec)
+        codec = JSON if msg["type"] == "hello" or receiver_codec is None else receiver_codec
+        return codec.read(io.BytesIO(frame))
+
+    to_verifier = [prover.hello()]
+    while to_verifier and not verifier.done:
+        to_prover = []
+        for msg in to_verifier:
+            to_prover += verifier.on_message(deliver(msg, prover.wire_codec, verifier.wire_codec))
+        to_verifier = []
+        for msg in to_prover:
+            to_verifier += prover.on_message(deliver(msg, verifier.wire_codec, prover.wire_codec))
+    return verifier.ok
+
+
+class SequentialRounds:
+    """
+    Rundele unei ProverSession sequential conduse prin on_message, ca într-o
+    sesiune reală, dar cu challenge-ul fix e și fără verifier: commit() trimite
+    result ok (-> commit), respond() trimite challenge (-> response).
+    before_commit / before_respond aduc sesiunea în starea potrivită (necronometrat).
+    """
+
+    def __init__(self, keys, e: List[int], rounds: int):
+        self.e = e
+        self.session = ProverSession(keys, "bench", rounds)
+        self.session.hello()
+        out = self.session.on_message({"type": "hello", "role": "verifier", "protocol": keys.protocol,
+                                       "mode": "sequential", "codec": "json"})
+        self.x = out[0]["x"]
+        self.y: Optional[int] = None
+        self.awaiting = "challenge"
+
+    def commit(self) -> None:
+        out = self.session.on_message({"type": "result", "round": self.session.round_no, "ok": True})
+        assert out[0]["type"] == "commit", out
+        self.x = out[0]["x"]
+        self.awaiting = "challenge"
+
+    def respond(self) -> None:
+        out = self.session.on_message({"type": "challenge", "round": self.session.round_no, "e": self.e})
+        assert out[0]["type"] == "response", out
+        self.y = out[0]["y"]
+        self.awaiting = "result"
+
+    def before_commit(self) -> None:
+        if self.awaiting == "challenge":
+            self.respond()
+
+    def before_respond(self) -> None:
+        if self.awaiting == "result":
+            self.commit()
+
+
+def bench_point(phases, n: int, bits: int, k: int, t: int, warmup: int, samples: int,
+                rsa_keys: Dict[int, Any]) -> List[Dict[str, Any]]:
+    keys = keygen_ffs_batch(n, k) if k >= BATCH_KEYGEN_MIN_K else keygen_ffs(n, k)
+    pub = {"n": n, "k": k, "v": keys.v}
+    rows = []
+    # o rundă per apel (+ cea de la hello și una de rezervă), ca sesiunea să nu se încheie
+    rounds = warmup + samples + 2
+
+    def add(phase: str, fn: Callable[[], Any], setup: Optional[Callable[[], Any]] = None, **extra) -> None:
+        row = {"phase": phase, "bits": bits, "k": k, "t": t}
+        row.update(extra)
+        row.update(measure(fn, warmup, samples, setup))
+        rows.append(row)
+        label = phase + "".join(f"[{v}]" for v in extra.values())
+        print(f"  {label:<22} median {row['median_us']:>11.1f} us   p95 {row['p95_us']:>11.1f}   "
+              f"p99 {row['p99_us']:>11.1f}", flush=True)
+
+    e = [secrets.randbelow(2) for _ in range(k)]
+    sample = SequentialRounds(keys, e, 1)
+    sample.respond()
+    x, y = sample.x, sample.y
+
+    if "keygen" in phases:
+        add("keygen", lambda: keygen_ffs_batch(n, k) if k >= BATCH_KEYGEN_MIN_K else keygen_ffs(n, k))
+    if "commit" in phases:
+        driver = SequentialRounds(keys, e, rounds)
+        add("commit", driver.commit, setup=driver.before_commit)
+    if "response" in phases:
+        driver = SequentialRounds(keys, e, rounds)
+        add("response", driver.respond, setup=driver.before_respond)
+    if "verify" in phases:
+        add("verify", lambda: verifier_check(n, keys.v, x, e, y))
+    if "serialize" in phases:
+        msgs = [{"type": "commit", "round": 1, "x": x}, {"type": "challenge", "round": 1, "e": e},
+                {"type": "response", "round": 1, "y": y}, {"type": "result", "round": 1, "ok": True}]
+        for name in CODECS:
+            codec = make_codec(name, n, k)
+            stream = b"".join(codec.encode(m) for m in msgs)
+
+            def roundtrip(codec=codec, stream=stream):
+                for m in msgs:
+                    codec.encode(m)
+                inp = io.BytesIO(stream)
+                for _ in msgs:
+                    codec.read(inp)
+            add("serialize", roundtrip, codec=name)
+    if "auth" in phases:
+        for mode in ("sequential", "parallel"):
+            def auth(mode=mode):
+                ok = exchange(ProverSession(keys, "bench", t, mode=mode),
+                              VerifierSession(lambda _name: pub, t))
+                assert ok
+            add("auth", auth, mode=mode)
+    if "rsa" in phases:
+        if bits not in rsa_keys:
+            rsa_keys[bits] = rsa_keygen(bits)
+        rn, re_, rd = rsa_keys[bits]
+        m = secrets.randbelow(rn - 1) + 1
+
+        def rsa():
+            sig = pow(m, rd, rn)  # semnare
+            pow(sig, re_, rn)     # verificare
+        add("rsa", rsa)
+    if "modulus" in phases:
+        add("modulus", lambda: generate_blum_modulus(bits))
+    return rows
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    phases = set(args.phases)
+    rsa_keys: Dict[int, Any] = {}
+    results = []
+    for bits in args.bits:
+        _, _, n = generate_blum_modulus(bits)
+        for k in args.k:
+            for t in args.t:
+                print(f"--- bits(p)={bits} k={k} t={t} ---", flush=True)
+                results += bench_point(phases, n, bits, k, t, args.warmup, args.samples, rsa_keys)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "grid": {"bits": args.bits, "k": args.k, "t": args.t},
+            "warmup": args.warmup,
+            "samples": args.samples,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print("Saved:", args.out)
+    return 0
+
+
+def _row_key(row: Dict[str, Any]) -> tuple:
+    extra = tuple(sorted((k, v) for k, v in row.items() if k in ("codec", "mode")))
+    return (row["phase"], row["bits"], row["k"], row["t"]) + extra
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        base = {_row_key(r): r for r in json.load(f)["results"]}
+    with open(args.current, encoding="utf-8") as f:
+        cur = {_row_key(r): r for r in json.load(f)["results"]}
+
+    metric = args.metric
+    regressions = 0
+    print(f"=== COMPARE ({metric}, threshold {args.threshold * 100:.0f}%) ===")
+    print(f"{'phase':<32} {'baseline us':>12} {'current us':>12} {'delta':>8}")
+    for key in sorted(cur, key=str):
+        if key not in base:
+            continue
+        b, c = base[key][metric], cur[key][metric]
+        delta = (c - b) / b if b else 0.0
+        flag = ""
+        if delta > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif delta < -args.threshold:
+            flag = "  faster"
+        label = f"{key[0]} b={key[1]} k={key[2]} t={key[3]}" + "".join(f" {v}" for _, v in key[4:])
+        print(f"{label:<32} {b:>12.1f} {c:>12.1f} {delta * 100:>7.1f}%{flag}")
+
+    missing = [k for k in base if k not in cur]
+    if missing:
+        print(f"({len(missing)} puncte din baseline lipsesc din rezultatele curente)")
+    print("Regressions:", regressions)
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="FFS benchmark suite (grid, warm-up, median/p95/p99, compare)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="ruleaza grila de benchmark-uri")
+    p_run.add_argument("--bits", type=int, nargs="+", default=[512, 1024], help="bits pentru p,q")
+    p_run.add_argument("--k", type=int, nargs="+", default=[5, 32])
+    p_run.add_argument("--t", type=int, nargs="+", default=[4, 16])
+    p_run.add_argument("--phases", nargs="+", choices=PHASES, default=list(DEFAULT_PHASES))
+    p_run.add_argument("--warmup", type=int, default=5)
+    p_run.add_argument("--samples", type=int, default=50)
+    p_run.add_argument("--out", default=None, help="fisier JSON pentru rezultate")
+    p_run.set_defaults(func=cmd_run)
+
+    p_cmp = sub.add_parser("compare", help="compara doua rezultate si semnaleaza regresii")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--metric", choices=("median_us", "p95_us", "p99_us"), default="median_us")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="crestere relativa tolerata (default: 0.10)")
+    p_cmp.set_defaults(func=cmd_compare)
+
+    args = ap.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+# bigint.py
+# Backend-ul pentru aritmetica cu numere mari (pow modular, invers, test de
+# primalitate, simbol Jacobi): gmpy2 (GMP) dacă e instalat, altfel int-urile Python.
+#
+# Selecție:
+#   - variabila de mediu FFS_BIGINT = auto | python | gmpy2 (default auto)
+#   - opțiunea --bigint din CLI-uri (add_cli_args + apply_cli_args)
+# use() scrie alegerea și în FFS_BIGINT, ca subprocesele (prover.py pornit
+# de verifier, worker-ii din process pool) să folosească același backend.
+#
+# Apelanții folosesc mereu bigint.mpz / bigint.powmod / ... (nu
+# "from bigint import powmod"), ca schimbarea backend-ului să se vadă peste tot.
+# Valorile care ies din module (chei, mesaje pe fir) rămân int: mpz doar în calcule.
+import os
+import sys
+
+try:
+    import gmpy2
+except ImportError:  # gmpy2 e opțional
+    gmpy2 = None
+
+ENV_VAR = "FFS_BIGINT"
+BACKENDS = ("auto", "python", "gmpy2")
+
+name = "python"
+
+
+def _invert_python(a: int, n: int) -> int:
+    return pow(a, -1, n)
+
+
+def _invert_gmpy2(a, n):
+    try:
+        return gmpy2.invert(a, n)
+    except ZeroDivisionError:
+        # același tip de eroare ca pow(a, -1, n)
+        raise ValueError("base is not invertible for the given modulus") from None
+
+
+def _is_prime_gmpy2(n, rounds: int, bpsw: bool = False) -> bool:
+    # gmpy2.is_prime: trial division + 'rounds' runde Miller–Rabin (GMP)
+    if not gmpy2.is_prime(n, rounds):
+        return False
+    return gmpy2.is_bpsw_prp(n) if bpsw else True
+
+
+# funcțiile backend-ului curent (setate de use())
+mpz = int
+powmod = pow
+invert = _invert_python
+# is_prime(n, rounds, bpsw) sau None: utils.is_probable_prime folosește atunci Miller–Rabin propriu
+is_prime = None
+# jacobi(a, n) sau None: utils.jacobi folosește atunci algoritmul propriu
+jacobi = None
+
+
+def available() -> tuple:
+    """Backend-urile care pot fi folosite în acest mediu."""
+    return ("python", "gmpy2") if gmpy2 is not None else ("python",)
+
+
+def use(backend: str = "auto") -> str:
+    """Activează backend-ul ('auto' = gmpy2 dacă e instalat); întoarce numele ales."""
+    global name, mpz, powmod, invert, is_prime, jacobi
+    if backend not in BACKENDS:
+        raise ValueError(f"backend trebuie sa fie unul din {BACKENDS}")
+    if backend == "auto":
+        backend = "gmpy2" if gmpy2 is not None else "python"
+    if backend == "gmpy2":
+        if gmpy2 is None:
+            raise RuntimeError("gmpy2 nu este instalat (pip install gmpy2)")
+        mpz, powmod, invert, is_prime, jacobi = gmpy2.mpz, gmpy2.powmod, _invert_gmpy2, _is_prime_gmpy2, gmpy2.jacobi
+    else:
+        mpz, powmod, invert, is_prime, jacobi = int, pow, _invert_python, None, None
+    name = backend
+    os.environ[ENV_VAR] = backend
+    return backend
+
+
+def add_cli_args(ap) -> None:
+    """Opțiunea --bigint pentru un argparse.ArgumentParser."""
+    ap.add_argument("--bigint", choices=BACKENDS, default=None,
+                    help=f"aritmetica numere mari (default: ${ENV_VAR} sau auto = gmpy2 daca e instalat)")
+
+
+def apply_cli_args(ap, args) -> None:
+    """Activează backend-ul cerut cu --bigint (eroare de argparse dacă lipsește gmpy2)."""
+    if getattr(args, "bigint", None):
+        try:
+            use(args.bigint)
+        except RuntimeError as exc:
+            ap.error(str(exc))
+
+
+def _from_env() -> None:
+    backend = os.environ.get(ENV_VAR, "auto") or "auto"
+    try:
+        use(backend)
+    except (ValueError, RuntimeError) as exc:
+        print(f"{ENV_VAR}={backend}: {exc}; folosesc int-urile Python", file=sys.stderr)
+        use("python")
+
+
+_from_env()
@@ -0,0 +1,114 @@
+# commit_pool.py
+# Pool de commitment-uri precalculate pentru prover.
+# Pasul (a) al fiecărei runde (r random, x = (-1)^b * r^2 mod n) nu depinde
+# de challenge, deci poate fi calculat dinainte de un thread de fundal.
+# Prover-ul online doar scoate o pereche (r, x) și calculează răspunsul.
+import queue
+import secrets
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils import random_coprime
+
+
+def make_commitment(n: int) -> List[int]:
+    """[r, x] cu x = (-1)^b * r^2 mod n (listă, ca să poată fi ștearsă după folosire)."""
+    r = random_coprime(n)
+    x = pow(r, 2, n)
+    if secrets.randbelow(2) == 1:
+        x = (-x) % n
+    return [r, x]
+
+
+class CommitmentPool:
+    """
+    Coadă mărginită de perechi (r, x) pentru un modul n.
+    Thread-ul de fundal umple coada până la 'capacity' de fiecare dată când
+    scade sub 'low_water'. Fiecare pereche iese din coadă o singură dată și
+    e suprascrisă cu 0 imediat ce a fost luată.
+
+    stats():
+      produced   - perechi calculate în fundal
+      refills    - câte umpleri (coada a coborât sub low_water)
+      low_water  - de câte ori take() a lăsat coada sub low_water
+      hits       - take() servit din coadă
+      misses     - coadă goală, pereche calculată online
+    """
+
+    def __init__(self, n: int, capacity: int = 256, low_water: int = 64, start: bool = True):
+        if capacity <= 0 or not 0 <= low_water <= capacity:
+            raise ValueError("trebuie 0 <= low_water <= capacity si capacity >= 1")
+        self.n = n
+        self.capacity = capacity
+        self.low_water = low_water
+
+        self._q: "queue.Queue[List[int]]" = queue.Queue(maxsize=capacity)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._stats = {"produced": 0, "refills": 0, "low_water": 0, "hits": 0, "misses": 0}
+        self._thread = threading.Thread(target=self._run, name="commit-pool", daemon=True)
+        if start:
+            self._thread.start()
+
+    def _count(self, key: str) -> None:
+        # producătorul și consumatorii actualizează contoarele din thread-uri diferite
+        with self._cond:
+            self._stats[key] += 1
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._q.qsize() >= self.low_water and not self._stop.is_set():
+                    self._cond.wait()
+            if self._stop.is_set():
+                return
+            self._count("refills")
+            while self._q.qsize() < self.capacity and not self._stop.is_set():
+                self._q.put(make_commitment(self.n))
+                self._count("produced")
+
+    def take(self) -> Tuple[int, int]:
+        """Scoate o pereche (r, x); dacă pool-ul e gol, o calculează pe loc."""
+        try:
+            pair = self._q.get_nowait()
+            self._count("hits")
+        except queue.Empty:
+            pair = make_commitment(self.n)
+            self._count("misses")
+
+        if self._q.qsize() < self.low_water:
+            with self._cond:
+                self._stats["low_water"] += 1
+                self._cond.notify()
+
+        r, x = pair
+        pair[0] = pair[1] = 0
+        return r, x
+
+    def wait_full(self, timeout: Optional[float] = None) -> bool:
+        """Așteaptă până coada e plină (pentru warm-up / benchmark-uri)."""
+        stop_at = None if timeout is None else time.monotonic() + timeout
+        while self._q.qsize() < self.capacity:
+            if stop_at is not None and time.monotonic() >= stop_at:
+                return False
+            self._stop.wait(0.001)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            stats = dict(self._stats)
+        return dict(stats, available=self._q.qsize(), capacity=self.capacity)
+
+    def close(self) -> None:
+        """Oprește thread-ul și șterge perechile rămase."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+        while True:
+            try:
+                pair = self._q.get_nowait()
+            except queue.Empty:
+                break
+            pair[0] = pair[1] = 0
@@ -0,0 +1,121 @@
+# enroll.py
+# Înrolare în bloc de către centrul de încredere, cu modulul comun n din
+# Protocol 10.26: n se generează o singură dată ("main.py center-init"),
+# apoi cheile utilizatorilor (keygen_ffs pe același n) se creează în paralel
+# într-un pool de procese și se scriu în flux în storage.
+#
+# Numele vin dintr-un iterator (fișier sau contor), bucățile se trimit
+# worker-ilor cu cel mult 'in_flight' bucăți neterminate (ca în audit.py),
+# deci memoria nu depinde de mărimea lotului. Cheile se scriu în formatul
+# v3 (storage.py): modulul o singură dată în keys_dir/moduli/, referit prin ID.
+# Cu fișiere JSON (un fișier per utilizator) worker-ii scriu direct cheile,
+# deci și scrierea e paralelă; un store cu un singur scriitor (KeyDB) primește
+# publicele în procesul părinte, câte o tranzacție per bucată (save_many).
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ffs import BATCH_KEYGEN_MIN_K, FFSKeys, keygen_ffs, keygen_ffs_batch
+from storage import JsonKeyStore, save_private, save_public
+
+ENROLL_FORMAT_VERSION = 3
+
+# starea fiecărui worker: modulul comun, k și unde scrie (None = întoarce cheile părintelui)
+_n = 0
+_k = 0
+_public_dir: Optional[str] = None
+_private_dir: Optional[str] = None
+
+
+def _init_worker(n: int, k: int, public_dir: Optional[str] = None, private_dir: Optional[str] = None) -> None:
+    global _n, _k, _public_dir, _private_dir
+    _n, _k, _public_dir, _private_dir = n, k, public_dir, private_dir
+
+
+def mint_batch(names: List[str]) -> List[Tuple[str, list]]:
+    """
+    Cheile pentru 'names' pe modulul worker-ului. Scrie direct fișierele
+    JSON cerute la _init_worker; întoarce (nume, v) doar pentru cheile
+    publice pe care trebuie să le salveze părintele (nici n, nici secretele
+    s nu se mai trimit înapoi).
+    """
+    keygen = keygen_ffs_batch if _k >= BATCH_KEYGEN_MIN_K else keygen_ffs
+    out = []
+    for name in names:
+        keys = keygen(_n, _k)
+        if _private_dir is not None:
+            save_private(keys, name, keys_dir=_private_dir, version=ENROLL_FORMAT_VERSION)
+        if _public_dir is not None:
+            save_public(keys, name, keys_dir=_public_dir, version=ENROLL_FORMAT_VERSION)
+        else:
+            out.append((name, keys.v))
+    return out
+
+
+def iter_names(count: int = 0, prefix: str = "user", names_file: Optional[str] = None) -> Iterator[str]:
+    """Numele din fișier (unul per linie, fără linii goale) sau prefix000000 .. prefix<count-1>."""
+    if names_file:
+        with open(names_file, encoding="utf-8") as f:
+            for line in f:
+                name = line.strip()
+                if name:
+                    yield name
+        return
+    width = max(6, len(str(count - 1)))
+    for i in range(count):
+        yield f"{prefix}{i:0{width}d}"
+
+
+def _batches(names: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(names)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def enroll(n: int, k: int, names: Iterable[str], store, keys_dir: str = "keys", workers: int = 1,
+           chunk: int = 256, in_flight: int = 0, private: bool = True) -> Dict[str, Any]:
+    """
+    Creează cheile pentru toate 'names' pe modulul n și le scrie pe măsură
+    ce sosesc: publicele în 'store' (fișiere JSON direct din worker-i, altfel
+    save_many / save_public în părinte), privatele în keys_dir.
+    workers=1 rulează în procesul curent.
+    """
+    public_dir = store.keys_dir if isinstance(store, JsonKeyStore) else None
+    initargs = (n, k, public_dir, keys_dir if private else None)
+    save_many = getattr(store, "save_many", None)
+    report = {"minted": 0, "seconds": 0.0}
+
+    def write(size: int, batch: List[Tuple[str, list]]) -> None:
+        if batch:
+            # doar publicele: store-ul nu are nevoie de s
+            items = [(name, FFSKeys(n=n, k=k, s=[], v=v)) for name, v in batch]
+            if save_many is not None:
+                save_many(items)
+            else:
+                for name, keys in items:
+                    store.save_public(keys, name)
+        report["minted"] += size
+
+    t0 = time.perf_counter()
+    if workers <= 1:
+        _init_worker(*initargs)
+        for batch in _batches(names, chunk):
+            write(len(batch), mint_batch(batch))
+    else:
+        limit = in_flight or 2 * workers
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as ex:
+            pending: Dict[Any, int] = {}
+            for batch in _batches(names, chunk):
+                if len(pending) >= limit:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        write(pending.pop(fut), fut.result())
+                pending[ex.submit(mint_batch, batch)] = len(batch)
+            for fut in list(pending):
+                write(pending.pop(fut), fut.result())
+    report["seconds"] = time.perf_counter() - t0
+    return report
@@ -6,7 +6,10 @@
 import secrets
 from dataclasses import dataclass
 from math import gcd
+from time import perf_counter
 
+import bigint
+import metrics
 from utils import modinv, random_coprime
 
 
@@ -25,6 +28,8 @@ class FFSKeys:
     s: list[int]
     v: list[int]
 
+    protocol = "ffs"
+
 
 def keygen_ffs(n: int, k: int) -> FFSKeys:
     """
@@ -62,7 +67,73 @@ def keygen_ffs(n: int, k: int) -> FFSKeys:
     return FFSKeys(n=n, k=k, s=s_list, v=v_list)
 
 
-def ffs_round(keys: FFSKeys) -> bool:
+# de la ce k merită calea batched (o singură inversare modulară)
+BATCH_KEYGEN_MIN_K = 8
+
+
+def batch_modinv(values: list[int], n: int) -> list[int]:
+    """
+    Inversele tuturor valorilor mod n cu o singură inversare (trucul lui
+    Montgomery): prefixe c_i = a_1*...*a_i, inv = c_k^{-1}, apoi înapoi
+    a_i^{-1} = inv * c_{i-1}, inv = inv * a_i. Cost: 3(k-1) înmulțiri + 1 modinv.
+    """
+    if not values:
+        return []
+    prefix = [0] * len(values)
+    acc = 1
+    for i, a in enumerate(values):
+        acc = (acc * a) % n
+        prefix[i] = acc
+
+    inv = modinv(acc, n)
+    out = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        out[i] = (inv * prefix[i - 1]) % n
+        inv = (inv * values[i]) % n
+    out[0] = inv
+    return out
+
+
+def _random_residues(n: int, count: int) -> list[int]:
+    """count valori în [2, n-1] dintr-un singur apel la CSPRNG (64 biți în plus => bias neglijabil)."""
+    width = (n.bit_length() + 7) // 8 + 8
+    raw = secrets.token_bytes(width * count)
+    return [int.from_bytes(raw[i * width:(i + 1) * width], "big") % (n - 2) + 2 for i in range(count)]
+
+
+def keygen_ffs_batch(n: int, k: int) -> FFSKeys:
+    """
+    Aceeași cheie ca keygen_ffs() (Step 2, Protocol 10.26), dar pe lot,
+    pentru k mare (sute / mii de secrete):
+      - s1..sk dintr-un singur apel la CSPRNG
+      - gcd(s_i, n) = 1 pentru toți, verificat printr-un singur gcd pe
+        produsul lor mod n (doar dacă pică se caută vinovații)
+      - (s_i^2)^(-1) mod n pentru toți cu o singură inversare (batch_modinv)
+      - b1..bk dintr-un singur randbits(k)
+    """
+    if k <= 0:
+        raise ValueError("k trebuie sa fie >= 1")
+
+    s_list = _random_residues(n, k)
+
+    # coprimalitate în bloc: gcd(Π s_i mod n, n) = 1 <=> gcd(s_i, n) = 1 pentru toți i
+    prod = 1
+    for si in s_list:
+        prod = (prod * si) % n
+    if gcd(prod, n) != 1:
+        for i in range(k):
+            while gcd(s_list[i], n) != 1:
+                s_list[i] = _random_residues(n, 1)[0]
+
+    inv_sq = batch_modinv([(si * si) % n for si in s_list], n)
+
+    bits = secrets.randbits(k)
+    v_list = [inv if (bits >> i) & 1 == 0 else (-inv) % n for i, inv in enumerate(inv_sq)]
+
+    return FFSKeys(n=n, k=k, s=s_list, v=v_list)
+
+
+def ffs_round(keys: FFSKeys, tables=None, commit_pool=None) -> bool:
     """
     O rundă (din t) conform Step 4 din Protocol 10.26.
 
@@ -74,39 +145,87 @@ def ffs_round(keys: FFSKeys) -> bool:
     (d) Verifier B: calculează
         z = y^2 * Π v_j^{e_j} mod n
         acceptă dacă z = ±x și z != 0
+
+    tables (opțional): precomp.FFSTables; produsele din (c) și (d) se
+    calculează atunci din tabelele de submulțimi (~k/w înmulțiri).
+    commit_pool (opțional): commit_pool.CommitmentPool; pasul (a) vine
+    precalculat din pool.
     """
-    n = keys.n
+    n = bigint.mpz(keys.n)
     k = keys.k
+    s_table = tables.s if tables is not None else None
+    v_table = tables.v if tables is not None else None
+    timed = metrics.ENABLED
+    if timed:
+        t0 = perf_counter()
 
     # (a) Prover: commitment r și semn b
-    r = random_coprime(n)  # random r, gcd(r,n)=1 (sigur), 1<=r<=n-1
-    b = secrets.randbelow(2)
+    if commit_pool is not None:
+        r, x = commit_pool.take()
+    else:
+        r = random_coprime(keys.n)  # random r, gcd(r,n)=1 (sigur), 1<=r<=n-1
+        b = secrets.randbelow(2)
 
-    # x = (-1)^b * r^2 mod n
-    x = pow(r, 2, n)
-    if b == 1:
-        x = (-x) % n
+        # x = (-1)^b * r^2 mod n
+        x = bigint.powmod(r, 2, n)
+        if b == 1:
+            x = (-x) % n
+
+    if timed:
+        t1 = perf_counter()
 
     # (b) Verifier: challenge e vector
     e = [secrets.randbelow(2) for _ in range(k)]
+    if timed:
+        t2 = perf_counter()
 
     # (c) Prover: y = r * Π s_j^{e_j} mod n
-    y = r % n
-    for j in range(k):
-        if e[j] == 1:
-            y = (y * keys.s[j]) % n
+    if s_table is not None:
+        y = s_table.product(e, r % n)
+    else:
+        y = r % n
+        for j in range(k):
+            if e[j] == 1:
+                y = (y * keys.s[j]) % n
+
+    if timed:
+        t3 = perf_counter()
 
     # (d) Verifier: z = y^2 * Π v_j^{e_j} mod n
-    z = pow(y, 2, n)
-    for j in range(k):
-        if e[j] == 1:
-            z = (z * keys.v[j]) % n
+    if v_table is not None:
+        z = v_table.product(e, bigint.powmod(y, 2, n))
+    else:
+        z = bigint.powmod(y, 2, n)
+        for j in range(k):
+            if e[j] == 1:
+                z = (z * keys.v[j]) % n
 
     # verifică z = ±x și z != 0
+    ok = (z != 0) and (z == x or z == (-x) % n)
+
+    if timed:
+        t4 = perf_counter()
+        for phase, dt in (("commit", t1 - t0), ("challenge", t2 - t1), ("response", t3 - t2), ("check", t4 - t3)):
+            metrics.observe("ffs_round_seconds", dt, {"phase": phase})
+        metrics.inc("ffs_rounds_total", labels={"result": "ok" if ok else "fail"})
+    return ok
+
+
+def verifier_check(n: int, v: list[int], x: int, e: list[int], y: int, table=None) -> bool:
+    # z = y^2 * Π v_j^{e_j} mod n; accept if z = ±x and z != 0
+    # table: precomp.SubsetProductTable pentru v (opțional)
+    n = bigint.mpz(n)
+    if table is not None:
+        z = table.product(e, bigint.powmod(y, 2, n))
+    else:
+        z = bigint.powmod(y, 2, n)
+        for j in range(len(v)):
+            if e[j] == 1:
+                z = (z * v[j]) % n
     return (z != 0) and (z == x or z == (-x) % n)
 
 
-def authenticate(keys: FFSKeys, t: int) -> bool:
+def authenticate(keys: FFSKeys, t: int, tables=None, commit_pool=None) -> bool:
     """
     Rulează t runde; acceptă doar dacă toate runde reușesc.
     (Protocol 10.26: "B accepts A’s identity if all t rounds succeed.")
@@ -115,7 +234,7 @@ def authenticate(keys: FFSKeys, t: int) -> bool:
         raise ValueError("t trebuie sa fie >= 1")
 
     for _ in range(t):
-        if not ffs_round(keys):
+        if not ffs_round(keys, tables, commit_pool):
             return False
     return True
 
@@ -127,11 +246,12 @@ def authenticate(keys: FFSKeys, t: int) -> bool:
 def ffs_round_verbose(keys: FFSKeys, round_no: int = 1) -> bool:
     """
     Exact aceeași rundă ca ffs_round(), dar printează toate valorile relevante
-    (x, e, y, z) și verificările z==x / z==-x mod n.
+    (x, e, y, z), verificările z==x / z==-x mod n și timpul fiecărui pas.
     """
     n = keys.n
     k = keys.k
 
+    t0 = perf_counter()
     r = random_coprime(n)
     b = secrets.randbelow(2)
 
@@ -139,19 +259,23 @@ def ffs_round_verbose(keys: FFSKeys, round_no: int = 1) -> bool:
     if b == 1:
         x = (-x) % n
 
+    t1 = perf_counter()
     e = [secrets.randbelow(2) for _ in range(k)]
 
+    t2 = perf_counter()
     y = r % n
     for j in range(k):
         if e[j] == 1:
             y = (y * keys.s[j]) % n
 
+    t3 = perf_counter()
     z = pow(y, 2, n)
     for j in range(k):
         if e[j] == 1:
             z = (z * keys.v[j]) % n
 
     ok = (z != 0) and (z == x or z == (-x) % n)
+    t4 = perf_counter()
 
     print(f"\n--- Runda {round_no} ---")
     print("b =", b)
@@ -162,6 +286,8 @@ def ffs_round_verbose(keys: FFSKeys, round_no: int = 1) -> bool:
     print("cond: z == x ?", z == x)
     print("cond: z == -x mod n ?", z == (-x) % n)
     print("OK ?", ok)
+    print(f"timp: commit {(t1 - t0) * 1e6:.1f} us | challenge {(t2 - t1) * 1e6:.1f} us | "
+          f"response {(t3 - t2) * 1e6:.1f} us | check {(t4 - t3) * 1e6:.1f} us")
 
     return ok
 
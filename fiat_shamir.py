@@ -0,0 +1,189 @@
+# fiat_shamir.py
+# Varianta non-interactivă a Protocolului 10.26 (transformarea Fiat–Shamir):
+# prover-ul calculează toate cele t commitment-uri x_1..x_t, apoi derivă
+# challenge-urile e_1..e_t (t*k biți) dintr-un hash peste cheia publică,
+# nume, context/nonce și commitment-uri. Rezultatul este un singur mesaj
+# (dovada) care poate fi verificat oricând, fără runde interactive.
+#
+# Atenție: un atacator poate încerca offline oricâte seturi de commitment-uri,
+# deci securitatea este ~k*t biți de lucru (nu 2^-(k*t) per încercare online);
+# de aceea t implicit se alege ca k*t >= SECURITY_BITS, iar verifier-ul respinge
+# dovezile sub acest prag (dovada nu își poate alege singură soundness-ul).
+#
+# Etapele vin din protocols.py, deci aceeași construcție merge și pentru GQ;
+# dovezile non-FFS au câmpul "protocol", absorbit și în hash.
+
+import hashlib
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+import protocols
+from ffs import FFSKeys
+
+PROOF_TYPE = "ffs_proof"
+PROOF_VERSION = 1
+SECURITY_BITS = 128
+_DOMAIN = b"FFS-10.26/fiat-shamir/v1"
+
+
+def default_rounds(k: int, security_bits: int = SECURITY_BITS) -> int:
+    """Numărul minim de runde t cu k*t >= security_bits."""
+    return max(1, -(-security_bits // k))
+
+
+def _absorb(h, data: bytes) -> None:
+    # prefix de lungime: concatenarea rămâne neambiguă
+    h.update(len(data).to_bytes(4, "big"))
+    h.update(data)
+
+
+def _int_bytes(x: int) -> bytes:
+    return x.to_bytes((x.bit_length() + 7) // 8 or 1, "big")
+
+
+def derive_challenges(n: int, v: List[int], name: str, context: bytes,
+                      x: List[int], k: int, protocol: str = protocols.DEFAULT) -> List[List[int]]:
+    """
+    e_1..e_t din SHAKE-256(domeniu[, protocol], n, v, nume, context, t, x_1..x_t),
+    extins la t*k biți; runda i folosește biții [i*k, (i+1)*k).
+    """
+    t = len(x)
+    h = hashlib.shake_256()
+    _absorb(h, _DOMAIN)
+    if protocol != protocols.DEFAULT:
+        _absorb(h, protocol.encode("ascii"))
+    _absorb(h, _int_bytes(n))
+    _absorb(h, k.to_bytes(4, "big"))
+    for vj in v:
+        _absorb(h, _int_bytes(vj))
+    _absorb(h, name.encode("utf-8"))
+    _absorb(h, context)
+    _absorb(h, t.to_bytes(4, "big"))
+    for xi in x:
+        _absorb(h, _int_bytes(xi))
+
+    bits = int.from_bytes(h.digest((t * k + 7) // 8), "big")
+    return [[(bits >> (i * k + j)) & 1 for j in range(k)] for i in range(t)]
+
+
+def prove(keys: FFSKeys, name: str, t: int, context: bytes = b"", tables=None) -> Dict[str, Any]:
+    """
+    Dovada non-interactivă pentru cheia 'keys' (FFS sau GQ):
+      (a) x_i = commit-ul protocolului (FFS: (-1)^{b_i} * r_i^2 mod n) pentru i = 1..t
+      (b) e_1..e_t = derive_challenges(...)
+      (c) y_i = răspunsul protocolului (FFS: r_i * Π s_j^{e_ij} mod n)
+    tables (opțional, doar FFS): precomp.FFSTables, produsul din (c) vine din tabelul s.
+    """
+    if t <= 0:
+        raise ValueError("t trebuie sa fie >= 1")
+    proto = protocols.get(keys.protocol)
+    s_table = tables.s if tables is not None else None
+
+    r_list: List[int] = []
+    x_list: List[int] = []
+    for _ in range(t):
+        r, x = proto.commit(keys)
+        r_list.append(r)
+        x_list.append(x)
+
+    challenges = derive_challenges(keys.n, keys.v, name, context, x_list, keys.k, proto.name)
+    y_list = [proto.respond(keys, r, e, s_table) for r, e in zip(r_list, challenges)]
+
+    proof = {
+        "type": PROOF_TYPE,
+        "version": PROOF_VERSION,
+        "name": name,
+        "k": keys.k,
+        "t": t,
+        "context": context.hex(),
+        "x": [format(x, "x") for x in x_list],
+        "y": [format(y, "x") for y in y_list],
+    }
+    if proto.name != protocols.DEFAULT:
+        proof["protocol"] = proto.name
+    return proof
+
+
+def verify(proof: Dict[str, Any], pub: Dict[str, Any], min_t: Optional[int] = None,
+           security_bits: int = SECURITY_BITS) -> bool:
+    """
+    Verifică o dovadă cu cheia publică pub = {n, k, v[, v_table, protocol]}:
+    recalculează challenge-urile din hash și aplică verificarea protocolului
+    pe fiecare rundă. Respinge dovezile cu mai puțin de
+    max(min_t, default_rounds(k, security_bits)) runde: min_t poate doar
+    ridica pragul, nu îl poate coborî sub k*t >= security_bits.
+    """
+    if proof.get("type") != PROOF_TYPE or proof.get("version") != PROOF_VERSION:
+        return False
+    protocol = protocols.of_public(pub)
+    if proof.get("protocol", protocols.DEFAULT) != protocol:
+        return False
+    proto = protocols.get(protocol)
+    n, k, v = pub["n"], pub["k"], pub["v"]
+    floor = default_rounds(k, security_bits)
+    min_t = floor if min_t is None else max(min_t, floor)
+    try:
+        t = int(proof["t"])
+        x_list = [int(x, 16) for x in proof["x"]]
+        y_list = [int(y, 16) for y in proof["y"]]
+        context = bytes.fromhex(proof.get("context", ""))
+    except (KeyError, TypeError, ValueError):
+        return False
+    if not isinstance(proof.get("name"), str) or proof.get("k") != k or t < min_t or len(x_list) != t or len(y_list) != t:
+        return False
+    if not all(0 < x < n for x in x_list) or not all(0 < y < n for y in y_list):
+        return False
+
+    challenges = derive_challenges(n, v, proof["name"], context, x_list, k, protocol)
+    for x, e, y in zip(x_list, challenges, y_list):
+        if not proto.check(pub, x, e, y):
+            return False
+    return True
+
+
+def dumps(proof: Dict[str, Any]) -> str:
+    """O dovadă pe o linie (fișierele de dovezi sunt JSON lines)."""
+    return json.dumps(proof, separators=(",", ":"))
+
+
+def read_proofs(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Dovezile dintr-un fișier JSON lines (liniile goale sunt ignorate). O linie
+    care nu e un obiect JSON devine {"error": ..., "line": nr}, respinsă de verify_many.
+    """
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                proof = json.loads(line)
+            except json.JSONDecodeError:
+                yield {"error": "invalid JSON", "line": lineno}
+                continue
+            if not isinstance(proof, dict):
+                yield {"error": "not a JSON object", "line": lineno}
+                continue
+            yield proof
+
+
+def verify_many(proofs, lookup, min_t: Optional[int] = None, cache: Optional[Dict[str, Any]] = None,
+                security_bits: int = SECURITY_BITS) -> Iterator[tuple]:
+    """
+    Verificare în bloc: (nume, ok) pentru fiecare dovadă; cheile publice
+    se încarcă o singură dată per nume prin lookup(name). Liniile invalide
+    din read_proofs apar ca ("line <nr>: <eroare>", False).
+    """
+    cache = {} if cache is None else cache
+    for proof in proofs:
+        if "error" in proof:
+            yield f"line {proof.get('line')}: {proof['error']}", False
+            continue
+        name = proof.get("name")
+        try:
+            if name not in cache:
+                cache[name] = lookup(name)
+            ok = verify(proof, cache[name], min_t, security_bits)
+        except (KeyError, TypeError, ValueError, OSError):
+            ok = False
+        yield name, ok
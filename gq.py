@@ -0,0 +1,97 @@
+# gq.py
+# Guillou–Quisquater (Handbook of Applied Cryptography, Protocol 10.31),
+# pe același tip de modul n ca FFS. Un singur secret a per utilizator:
+#   - exponentul public V: cel mai mic prim > 2^k (parametru de sistem, fix per k)
+#   - cheia publică J = (a^V)^(-1) mod n, cheia privată a
+# O rundă: x = r^V; challenge e ∈ [0, 2^k); y = r * a^e; verifier: J^e * y^V = x.
+# Probabilitatea de trișare pe rundă e ~2^-k, ca la o rundă FFS cu k secrete,
+# deci k*t are aceeași semnificație la ambele protocoale.
+#
+# Challenge-ul circulă ca la FFS: listă de k biți (bitul j = bitul j al lui e),
+# așa că mesajele și codec-urile din wire.py rămân aceleași.
+import secrets
+from dataclasses import dataclass
+from functools import lru_cache
+
+import bigint
+from utils import is_probable_prime, modinv, random_coprime
+
+
+@dataclass
+class GQKeys:
+    """
+    Cheile Guillou–Quisquater, cu aceeași formă ca FFSKeys:
+      - n: modulul
+      - k: biții challenge-ului (exponentul public e gq_exponent(k))
+      - s: [a], secretul
+      - v: [J], J = (a^V)^(-1) mod n
+    """
+    n: int
+    k: int
+    s: list[int]
+    v: list[int]
+
+    protocol = "gq"
+
+
+@lru_cache(maxsize=None)
+def gq_exponent(k: int) -> int:
+    """Exponentul public V: cel mai mic prim > 2^k (deci orice challenge de k biți e < V)."""
+    if k <= 0:
+        raise ValueError("k trebuie sa fie >= 1")
+    v = (1 << k) + 1
+    while not is_probable_prime(v):
+        v += 2
+    return v
+
+
+def challenge_int(e: list[int]) -> int:
+    """Challenge-ul ca întreg din lista de biți (bitul j = e[j])."""
+    m = 0
+    for j, bit in enumerate(e):
+        if bit:
+            m |= 1 << j
+    return m
+
+
+def keygen_gq(n: int, k: int) -> GQKeys:
+    """Secretul a (gcd(a, n) = 1) și publicul J = (a^V)^(-1) mod n."""
+    a = random_coprime(n)
+    j = modinv(int(bigint.powmod(bigint.mpz(a), gq_exponent(k), n)), n)
+    return GQKeys(n=n, k=k, s=[a], v=[j])
+
+
+def gq_commit(keys: GQKeys) -> tuple:
+    """(r, x = r^V mod n)."""
+    r = random_coprime(keys.n)
+    return r, int(bigint.powmod(bigint.mpz(r), gq_exponent(keys.k), keys.n))
+
+
+def gq_respond(keys: GQKeys, r: int, e: list[int]) -> int:
+    """y = r * a^e mod n."""
+    n = bigint.mpz(keys.n)
+    return int(r * bigint.powmod(bigint.mpz(keys.s[0]), challenge_int(e), n) % n)
+
+
+def gq_check(n: int, j: int, k: int, x: int, e: list[int], y: int) -> bool:
+    """Acceptă dacă z = J^e * y^V mod n este x și z != 0."""
+    n = bigint.mpz(n)
+    z = bigint.powmod(bigint.mpz(j), challenge_int(e), n) * bigint.powmod(bigint.mpz(y), gq_exponent(k), n) % n
+    return z != 0 and z == x
+
+
+def gq_round(keys: GQKeys) -> bool:
+    r, x = gq_commit(keys)
+    e = [secrets.randbelow(2) for _ in range(keys.k)]
+    y = gq_respond(keys, r, e)
+    return gq_check(keys.n, keys.v[0], keys.k, x, e, y)
+
+
+def authenticate_gq(keys: GQKeys, t: int) -> bool:
+    """Rulează t runde GQ; acceptă doar dacă toate reușesc."""
+    if t <= 0:
+        raise ValueError("t trebuie sa fie >= 1")
+    for _ in range(t):
+        if not gq_round(keys):
+            return False
+    return True
@@ -0,0 +1,184 @@
+# identity.py
+# Mod bazat pe identitate (în spiritul schemei Fiat–Shamir originale):
+# un centru de încredere păstrează p și q și publică doar n. Publicele unui
+# utilizator nu se mai stochează: v_1..v_k se derivă din nume, deterministic,
+# iar centrul calculează secretele s_j cu rădăcini pătrate (CRT). Verifier-ul
+# are nevoie doar de n și de numele din hello — fără lookup per utilizator.
+#
+# Derivare (aceeași la centru și la verifier):
+#   c_i = SHAKE-256(DOMAIN | n | name | i) mod n, i = 0, 1, ..., k-1
+#   v_i = c_i dacă Jacobi(c_i, n) = 1, altfel u*c_i mod n, unde u = cel mai mic
+#   întreg >= 2 cu Jacobi(u, n) = -1 (fix per n) — un singur simbol Jacobi per v_i,
+#   fără candidați respinși (Jacobi = 0 înseamnă un factor al lui n; practic imposibil).
+# Pentru n Blum (p ≡ q ≡ 3 mod 4), -1 nu e rest pătratic modulo p sau q, deci
+# dintre w = v^{-1} și -w exact unul e pătrat (Jacobi(v, n) = 1): s^2 = ±v^{-1},
+# adică v = (-1)^b * (s^2)^{-1} — exact forma cheilor din Protocol 10.26.
+#
+# Fișiere (în --keys-dir):
+#   center.private.json - p, q, k (doar la centru, mod 0600)
+#   center.params.json  - n, k; verifier-ii îl folosesc cu --store id:<cale>
+# Numele nu se potrivesc cu '*_public.json' / '*_private.json': migrate-keys,
+# import-ul în KeyDB și listarea cheilor nu văd centrul ca utilizator.
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import bigint
+from ffs import FFSKeys
+from utils import generate_blum_modulus, jacobi, modinv
+
+DOMAIN = b"ffs-identity-v1"
+CENTER_PRIVATE = "center.private.json"
+CENTER_PUBLIC = "center.params.json"
+DEFAULT_CACHE = 1024
+
+
+def _absorb(h, data: bytes) -> None:
+    h.update(len(data).to_bytes(4, "big"))
+    h.update(data)
+
+
+def _candidates(n: int, name: str) -> Iterator[int]:
+    prefix = hashlib.shake_256()
+    _absorb(prefix, DOMAIN)
+    _absorb(prefix, n.to_bytes((n.bit_length() + 7) // 8, "big"))
+    _absorb(prefix, name.encode("utf-8"))
+    # 128 biți în plus: distribuția mod n e practic uniformă
+    size = (n.bit_length() + 7) // 8 + 16
+    i = 0
+    while True:
+        h = prefix.copy()
+        h.update(i.to_bytes(4, "big"))
+        yield int.from_bytes(h.digest(size), "big") % n
+        i += 1
+
+
+def non_residue(n: int) -> int:
+    """Cel mai mic u >= 2 cu Jacobi(u, n) = -1 (multiplicatorul fix al derivării)."""
+    u = 2
+    while jacobi(u, n) != -1:
+        u += 1
+    return u
+
+
+def derive_public(n: int, name: str, k: int, u: Optional[int] = None) -> List[int]:
+    """Publicele v_1..v_k ale identității 'name' (toate cu Jacobi(v, n) = 1)."""
+    if k <= 0:
+        raise ValueError("k trebuie sa fie >= 1")
+    if u is None:
+        u = non_residue(n)
+    v: List[int] = []
+    for c in _candidates(n, name):
+        j = jacobi(c, n)
+        if j == 0:
+            continue
+        v.append(c if j == 1 else c * u % n)
+        if len(v) == k:
+            break
+    return v
+
+
+class TrustedCenter:
+    """Centrul de încredere: cunoaște factorizarea n = p*q și extrage cheile private."""
+
+    def __init__(self, p: int, q: int, k: int):
+        if p % 4 != 3 or q % 4 != 3:
+            raise ValueError("p si q trebuie sa fie ≡ 3 mod 4 (Blum)")
+        self.p, self.q, self.k = p, q, k
+        self.n = p * q
+        # coeficienții CRT: x ≡ a mod p, x ≡ b mod q  =>  x = a*cp + b*cq mod n
+        self._cp = q * modinv(q, p) % self.n
+        self._cq = p * modinv(p, q) % self.n
+        self.u = non_residue(self.n)
+
+    @classmethod
+    def generate(cls, bits: int, k: int, workers: int = 1) -> "TrustedCenter":
+        p, q, _ = generate_blum_modulus(bits, workers=workers)
+        return cls(p, q, k)
+
+    def _sqrt(self, w: int) -> int:
+        # p ≡ 3 mod 4: sqrt(w) mod p = w^((p+1)/4)
+        p, q = self.p, self.q
+        rp = int(bigint.powmod(bigint.mpz(w % p), (p + 1) // 4, p))
+        rq = int(bigint.powmod(bigint.mpz(w % q), (q + 1) // 4, q))
+        return (rp * self._cp + rq * self._cq) % self.n
+
+    def extract(self, name: str) -> FFSKeys:
+        """Cheia privată a identității 'name': s_j cu v_j = (-1)^b_j * (s_j^2)^(-1) mod n."""
+        n = self.n
+        v = derive_public(n, name, self.k, self.u)
+        s = []
+        for vj in v:
+            w = modinv(vj, n)
+            # Jacobi(w, n) = 1: w e pătrat mod p și mod q, sau niciunul (atunci -w e)
+            if jacobi(w, self.p) != 1:
+                w = n - w
+            s.append(self._sqrt(w))
+        return FFSKeys(n=n, k=self.k, s=s, v=v)
+
+    def public_params(self) -> Dict[str, Any]:
+        return {"n": self.n, "k": self.k}
+
+
+def save_center(center: TrustedCenter, keys_dir: str = "keys") -> tuple:
+    """Scrie center.private.json (0600) și center.params.json; întoarce cele două căi."""
+    out = Path(keys_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    priv = out / CENTER_PRIVATE
+    fd = os.open(str(priv), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"type": "ffs_center", "version": 2, "p": format(center.p, "x"),
+                   "q": format(center.q, "x"), "k": center.k}, f, separators=(",", ":"))
+    pub = out / CENTER_PUBLIC
+    pub.write_text(json.dumps({"type": "ffs_id_params", "version": 2, "n": format(center.n, "x"),
+                               "k": center.k}, separators=(",", ":")), encoding="utf-8")
+    return priv, pub
+
+
+def load_center(keys_dir: str = "keys") -> TrustedCenter:
+    d = json.loads((Path(keys_dir) / CENTER_PRIVATE).read_text(encoding="utf-8"))
+    if d.get("type") != "ffs_center":
+        raise ValueError("Fisierul nu pare a fi cheia centrului de incredere.")
+    return TrustedCenter(int(d["p"], 16), int(d["q"], 16), int(d["k"]))
+
+
+def load_params(path: str) -> Dict[str, Any]:
+    """Parametrii publici {n, k} din center.params.json."""
+    d = json.loads(Path(path).read_text(encoding="utf-8"))
+    if d.get("type") != "ffs_id_params":
+        raise ValueError("Fisierul nu pare a fi parametrii publici ai centrului.")
+    return {"n": int(d["n"], 16), "k": int(d["k"])}
+
+
+class IdentityStore:
+    """
+    "Store" de chei publice fără stocare per utilizator: load_public(name)
+    derivă v din nume. Orice nume are o cheie publică; doar cei cărora
+    centrul le-a extras cheia privată se pot autentifica. Ultimele
+    'cache_size' derivări se păstrează într-un LRU.
+    """
+
+    def __init__(self, path: str, cache_size: int = DEFAULT_CACHE):
+        params = load_params(path)
+        self.n, self.k = params["n"], params["k"]
+        self.u = non_residue(self.n)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def load_public(self, name: str) -> Dict[str, Any]:
+        pub = self._cache.get(name)
+        if pub is not None:
+            self._cache.move_to_end(name)
+            return pub
+        pub = {"n": self.n, "k": self.k, "v": derive_public(self.n, name, self.k, self.u)}
+        if self.cache_size > 0:
+            self._cache[name] = pub
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return pub
+
+    def close(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,179 @@
+# keydb.py
+# Bază de date locală (SQLite) cu toate cheile publice FFS, indexată după nume.
+# Înlocuiește keys/<name>_public.json când sunt foarte mulți utilizatori:
+# lookup O(1) (index pe cheia primară), un singur fișier, import/export în
+# formatul JSON existent.
+#
+# Modulul n (comun tuturor utilizatorilor în Protocol 10.26) se stochează o
+# singură dată în tabela moduli; coloana public_keys.n conține referința
+# b"\x00" + ID (8 octeți). Un n scris direct (baze mai vechi) nu începe
+# niciodată cu 0x00, deci ambele forme se citesc în continuare.
+# Doar chei FFS (k valori v pe rând); cheile GQ rămân în fișierele JSON.
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from ffs import FFSKeys
+import storage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS public_keys (
+    name TEXT PRIMARY KEY,
+    n    BLOB NOT NULL,
+    k    INTEGER NOT NULL,
+    v    BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS moduli (
+    id BLOB PRIMARY KEY,
+    n  BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+_REF = b"\x00"
+
+
+def _pack(n: int, values: list[int]) -> bytes:
+    # v1..vk big-endian, fiecare pe lățimea lui n
+    width = (n.bit_length() + 7) // 8
+    return b"".join(x.to_bytes(width, "big") for x in values)
+
+
+def _unpack(n: int, k: int, blob: bytes) -> list[int]:
+    width = (n.bit_length() + 7) // 8
+    return [int.from_bytes(blob[i * width:(i + 1) * width], "big") for i in range(k)]
+
+
+class KeyDB:
+    """
+    Cheile publice într-un singur fișier SQLite.
+    Aceeași interfață ca storage.JsonKeyStore: load_public / save_public.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+        # id -> n (întregul), pentru modulele deja citite / scrise (și confirmate)
+        self._moduli: Dict[bytes, int] = {}
+        # modulele inserate în tranzacția curentă; intră în _moduli doar după commit
+        self._new_moduli: Dict[bytes, int] = {}
+
+    @contextmanager
+    def _transaction(self):
+        """with self.conn, dar cache-ul de module urmează commit-ul / rollback-ul."""
+        try:
+            with self.conn:
+                yield
+        except BaseException:
+            self._new_moduli.clear()
+            raise
+        self._moduli.update(self._new_moduli)
+        self._new_moduli.clear()
+
+    def _modulus(self, blob: bytes) -> int:
+        if not blob.startswith(_REF):
+            return int.from_bytes(blob, "big")
+        n_id = blob[len(_REF):]
+        n = self._moduli.get(n_id)
+        if n is None:
+            row = self.conn.execute("SELECT n FROM moduli WHERE id = ?", (n_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Modulul {n_id.hex()} lipseste din {self.path}")
+            n = self._moduli[n_id] = int.from_bytes(row[0], "big")
+        return n
+
+    def _modulus_ref(self, n: int) -> bytes:
+        n_id = bytes.fromhex(storage.modulus_id(n))
+        if n_id not in self._moduli and n_id not in self._new_moduli:
+            self.conn.execute("INSERT OR IGNORE INTO moduli VALUES (?, ?)",
+                              (n_id, n.to_bytes((n.bit_length() + 7) // 8, "big")))
+            self._new_moduli[n_id] = n
+        return _REF + n_id
+
+    def load_public(self, name: str) -> Dict[str, Any]:
+        row = self.conn.execute("SELECT n, k, v FROM public_keys WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        n = self._modulus(row[0])
+        k = int(row[1])
+        return {"n": n, "k": k, "v": _unpack(n, k, row[2])}
+
+    def _row(self, name: str, n: int, k: int, v: list[int]) -> tuple:
+        # apelat în tranzacția care inserează rândul (și, la nevoie, modulul)
+        return name, self._modulus_ref(n), k, _pack(n, v)
+
+    @staticmethod
+    def _check_ffs(keys: FFSKeys, name: str) -> None:
+        if keys.protocol != "ffs":
+            raise ValueError(f"KeyDB stocheaza doar chei FFS (cheia lui {name} e {keys.protocol})")
+
+    def save_public(self, keys: FFSKeys, name: str) -> str:
+        self._check_ffs(keys, name)
+        with self._transaction():
+            self.conn.execute("INSERT OR REPLACE INTO public_keys VALUES (?, ?, ?, ?)",
+                              self._row(name, keys.n, keys.k, keys.v))
+        return f"{self.path}#{name}"
+
+    def save_many(self, items) -> int:
+        """Salvează (name, FFSKeys) într-o singură tranzacție; întoarce numărul de chei."""
+        with self._transaction():
+            rows = []
+            for name, keys in items:
+                self._check_ffs(keys, name)
+                rows.append(self._row(name, keys.n, keys.k, keys.v))
+            self.conn.executemany("INSERT OR REPLACE INTO public_keys VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def names(self) -> Iterator[str]:
+        for (name,) in self.conn.execute("SELECT name FROM public_keys ORDER BY name"):
+            yield name
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM public_keys").fetchone()[0]
+
+    def import_json(self, keys_dir: str = "keys", batch: int = 10000) -> Dict[str, int]:
+        """
+        Importă toate keys_dir/<name>_public.json, în tranzacții de câte 'batch'.
+        Returnează {"imported": .., "skipped": ..} (skipped = chei non-FFS, ex. GQ).
+        """
+        counts = {"imported": 0, "skipped": 0}
+        rows = []
+        for path in sorted(Path(keys_dir).glob("*_public.json")):
+            name = path.name[:-len("_public.json")]
+            pub = storage.load_public(name, keys_dir=keys_dir)
+            if "protocol" in pub:
+                counts["skipped"] += 1  # doar chei FFS (k valori v pe rând)
+                continue
+            rows.append(self._row(name, pub["n"], pub["k"], pub["v"]))
+            if len(rows) >= batch:
+                counts["imported"] += self._insert_many(rows)
+                rows = []
+        counts["imported"] += self._insert_many(rows)
+        return counts
+
+    def _insert_many(self, rows: list) -> int:
+        with self._transaction():
+            self.conn.executemany("INSERT OR REPLACE INTO public_keys VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def export_json(self, keys_dir: str = "keys") -> int:
+        """Scrie fiecare cheie ca keys_dir/<name>_public.json (formatul din storage.py)."""
+        count = 0
+        for name, n_blob, k, v_blob in self.conn.execute("SELECT name, n, k, v FROM public_keys"):
+            n = self._modulus(n_blob)
+            storage.save_public(FFSKeys(n=n, k=k, s=[], v=_unpack(n, k, v_blob)), name, keys_dir=keys_dir)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "KeyDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,287 @@
+# loadgen.py
+# Generator de încărcare: mulți proveri simulați (ProverSession + cheia
+# privată) care se autentifică la server.py peste Unix socket sau TCP, ca să
+# găsim punctul în care verifier-ul se saturează.
+#
+#   python loadgen.py --rates 50 100 200 400 800 --duration 5 --concurrency 256
+#   python loadgen.py --connect tcp://127.0.0.1:7000 --name alice --rates 0 --concurrency 64
+#   python loadgen.py --k 32 --bits 512 --t 8 --rates 100 200 --procs 4
+#
+# Fără --connect se pornește local un server.py pe un Unix socket temporar.
+# Sosirile sunt Poisson (open-loop) cu rata dată; latența se măsoară de la
+# momentul programat al sosirii, deci include și așteptarea după un loc liber
+# (fără "coordinated omission"). Rata 0 = closed-loop: 'concurrency' clienți
+# care se autentifică unul după altul, fără pauză.
+#
+# Genunchiul (knee): prima rată la care throughput-ul scade sub 90% din rata
+# oferită sau p99 crește de peste KNEE_P99_FACTOR ori față de prima treaptă.
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchsuite import percentile
+from ffs import BATCH_KEYGEN_MIN_K, FFSKeys, keygen_ffs, keygen_ffs_batch
+from prover import ProverSession
+from storage import load_private, save_private, save_public
+from utils import generate_blum_modulus
+from server import MAX_LINE
+from wire import CODECS, MODES, encode, parse_address
+
+KNEE_THROUGHPUT = 0.9
+KNEE_P99_FACTOR = 3.0
+
+
+async def _open(connect: str):
+    kind, target = parse_address(connect)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(target, limit=MAX_LINE)
+    host, port = target
+    return await asyncio.open_connection(host, port, limit=MAX_LINE)
+
+
+async def authenticate_once(keys: FFSKeys, name: str, t: int, mode: str, codecs, connect: str,
+                            timeout: float) -> str:
+    """
+    O autentificare completă ca prover; întoarce rezultatul:
+    accepted / rejected / mesajul de eroare al serverului / connect / timeout.
+    """
+    try:
+        reader, writer = await asyncio.wait_for(_open(connect), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return "connect"
+
+    session = ProverSession(keys, name, t, mode=mode, codecs=codecs)
+    try:
+        writer.write(encode(session.hello()))
+        while not session.done:
+            msg = await asyncio.wait_for(session.wire_codec.aread(reader), timeout)
+            if msg.get("type") == "error":
+                return str(msg.get("message", "error"))
+            for out in session.on_message(msg):
+                writer.write(encode(out, session.wire_codec))
+            await writer.drain()
+        return {0: "accepted", 1: "rejected"}.get(session.exit_code, "error")
+    except asyncio.TimeoutError:
+        return "timeout"
+    except ConnectionError:
+        # după o rundă respinsă serverul închide fără să aștepte "done"
+        if session.done:
+            return {0: "accepted", 1: "rejected"}.get(session.exit_code, "error")
+        return "disconnected"
+    except (EOFError, ValueError, asyncio.IncompleteReadError):
+        return "disconnected"
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+async def run_step(keys: FFSKeys, name: str, t: int, mode: str, codecs, connect: str, rate: float,
+                   concurrency: int, duration: float, timeout: float, seed: Optional[int] = None
+                   ) -> Tuple[List[float], Counter, float]:
+    """
+    O treaptă de încărcare de 'duration' secunde.
+    Întoarce (latențe în secunde, contor de rezultate, durata efectivă).
+    """
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+
+    async def one(scheduled: float) -> None:
+        async with slots:
+            result = await authenticate_once(keys, name, t, mode, codecs, connect, timeout)
+        outcomes[result] += 1
+        if result == "accepted":
+            latencies.append(time.perf_counter() - scheduled)
+
+    start = time.perf_counter()
+    end = start + duration
+    tasks = []
+    if rate > 0:
+        # open-loop: sosiri Poisson, independente de cât de repede răspunde serverul
+        next_at = start
+        while True:
+            next_at += rng.expovariate(rate)
+            if next_at >= end:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(one(next_at)))
+    else:
+        # closed-loop: 'concurrency' clienți, fiecare începe imediat după ce termină
+        async def client() -> None:
+            while time.perf_counter() < end:
+                await one(time.perf_counter())
+
+        tasks = [asyncio.ensure_future(client()) for _ in range(concurrency)]
+    await asyncio.gather(*tasks)
+    return latencies, outcomes, time.perf_counter() - start
+
+
+def _step_worker(keys_dir: str, name: str, t: int, mode: str, codecs, connect: str, rate: float,
+                 concurrency: int, duration: float, timeout: float, seed: int):
+    keys = load_private(name, keys_dir=keys_dir)
+    latencies, outcomes, elapsed = asyncio.run(
+        run_step(keys, name, t, mode, codecs, connect, rate, concurrency, duration, timeout, seed))
+    return latencies, dict(outcomes), elapsed
+
+
+def measure_step(args: argparse.Namespace, rate: float, step: int) -> Dict[str, Any]:
+    """O treaptă, împărțită pe --procs procese (rata și concurența se împart egal)."""
+    procs = args.procs
+    jobs = [(args.keys_dir, args.name, args.t, args.mode, args.codecs, args.connect, rate / procs,
+             max(1, args.concurrency // procs), args.duration, args.timeout, args.seed + 1000 * step + i)
+            for i in range(procs)]
+    if procs == 1:
+        results = [_step_worker(*jobs[0])]
+    else:
+        with ProcessPoolExecutor(procs) as ex:
+            results = list(ex.map(_step_worker, *zip(*jobs)))
+
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    elapsed = 0.0
+    for lat, out, secs in results:
+        latencies.extend(lat)
+        outcomes.update(out)
+        elapsed = max(elapsed, secs)
+    latencies.sort()
+
+    total = sum(outcomes.values())
+    return {
+        "offered": rate,
+        "sessions": total,
+        "accepted": outcomes.get("accepted", 0),
+        "throughput": outcomes.get("accepted", 0) / elapsed if elapsed > 0 else 0.0,
+        "error_rate": (total - outcomes.get("accepted", 0)) / total if total else 0.0,
+        "outcomes": dict(outcomes),
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "max_ms": latencies[-1] * 1e3 if latencies else float("nan"),
+    }
+
+
+def find_knee(steps: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Prima treaptă saturată (vezi KNEE_*), sau None dacă nu s-a atins saturația."""
+    base_p99 = steps[0]["p99_ms"] if steps else float("nan")
+    for step in steps:
+        if step["offered"] > 0 and step["throughput"] < KNEE_THROUGHPUT * step["offered"]:
+            return step
+        if step["p99_ms"] > KNEE_P99_FACTOR * base_p99:
+            return step
+    return None
+
+
+def make_temp_keys(args: argparse.Namespace) -> None:
+    """--k: cheie nouă (name = args.name) într-un director temporar de chei."""
+    _, _, n = generate_blum_modulus(args.bits)
+    keys = keygen_ffs_batch(n, args.k) if args.k >= BATCH_KEYGEN_MIN_K else keygen_ffs(n, args.k)
+    save_public(keys, args.name, keys_dir=args.keys_dir)
+    save_private(keys, args.name, keys_dir=args.keys_dir)
+
+
+def start_server(args: argparse.Namespace, sock_path: str, k: int) -> subprocess.Popen:
+    """server.py local pe un Unix socket; așteaptă până apare socket-ul."""
+    cmd = [sys.executable, "server.py", "--listen", "unix:" + sock_path, "--keys-dir", args.keys_dir,
+           "--min-bits", str(k * args.t), "--max-sessions", str(args.server_sessions)]
+    if args.store:
+        cmd += ["--store", args.store]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while not os.path.exists(sock_path):
+        if proc.poll() is not None or time.time() > deadline:
+            proc.kill()
+            raise RuntimeError("server.py nu a pornit")
+        time.sleep(0.05)
+    return proc
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load generator: N proveri simulati contra server.py")
+    ap.add_argument("--connect", default=None,
+                    help="server existent (tcp://host:port / unix:/cale); default: server.py local")
+    ap.add_argument("--name", default="alice")
+    ap.add_argument("--keys-dir", default="keys")
+    ap.add_argument("--store", default=None, help="baza SQLite pentru server-ul local")
+    ap.add_argument("--k", type=int, default=None,
+                    help="genereaza o cheie temporara cu acest k (doar cu server local)")
+    ap.add_argument("--bits", type=int, default=256, help="dimensiune p,q pentru --k (default: 256)")
+    ap.add_argument("--t", type=int, default=4)
+    ap.add_argument("--mode", choices=MODES, default="sequential")
+    ap.add_argument("--codecs", nargs="+", choices=CODECS, default=list(CODECS))
+    ap.add_argument("--rates", type=float, nargs="+", default=[50, 100, 200, 400],
+                    help="rate de sosire (autentificari/s) de incercat, in ordine; 0 = closed-loop")
+    ap.add_argument("--duration", type=float, default=5.0, help="secunde per treapta")
+    ap.add_argument("--concurrency", type=int, default=256, help="autentificari simultane maxime")
+    ap.add_argument("--procs", type=int, default=1, help="procese generator (clientii costa si ei CPU)")
+    ap.add_argument("--timeout", type=float, default=10.0, help="termen per mesaj (secunde)")
+    ap.add_argument("--server-sessions", type=int, default=1000, help="--max-sessions pentru server-ul local")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.k is not None and args.connect is not None:
+        ap.error("--k foloseste o cheie temporara; nu se poate combina cu --connect")
+
+    with tempfile.TemporaryDirectory(prefix="ffs-load-") as tmp:
+        if args.k is not None:
+            args.keys_dir = os.path.join(tmp, "keys")
+            args.store = None
+            make_temp_keys(args)
+
+        k = load_private(args.name, keys_dir=args.keys_dir).k
+        server = None
+        if args.connect is None:
+            sock_path = os.path.join(tmp, "verifier.sock")
+            server = start_server(args, sock_path, k)
+            args.connect = "unix:" + sock_path
+
+        print(f"=== LOADGEN ({args.connect}, k={k}, t={args.t}, mode={args.mode}, "
+              f"concurrency={args.concurrency}, procs={args.procs}) ===")
+        print(f"{'offered/s':>10} {'done/s':>9} {'sessions':>9} {'errors':>7} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  outcomes")
+        steps = []
+        try:
+            for i, rate in enumerate(args.rates):
+                step = measure_step(args, rate, i)
+                steps.append(step)
+                offered = f"{rate:.0f}" if rate > 0 else "closed"
+                others = {key: v for key, v in step["outcomes"].items() if key != "accepted"}
+                print(f"{offered:>10} {step['throughput']:>9.1f} {step['sessions']:>9} "
+                      f"{step['error_rate']:>7.1%} {step['p50_ms']:>9.2f} {step['p95_ms']:>9.2f} "
+                      f"{step['p99_ms']:>9.2f} {step['max_ms']:>9.2f}  {others or ''}")
+        finally:
+            if server is not None:
+                server.send_signal(signal.SIGINT)
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+    knee = find_knee(steps)
+    best = max(steps, key=lambda s: s["throughput"])
+    print(f"\nmax throughput: {best['throughput']:.1f} auth/s")
+    if knee is None:
+        print("knee: nu s-a atins saturatia; incercati rate mai mari")
+    else:
+        print(f"knee: ~{knee['offered']:.0f} auth/s oferite "
+              f"(throughput {knee['throughput']:.1f}/s, p99 {knee['p99_ms']:.2f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,74 +1,411 @@
 # main.py
 import argparse
+import os
+import sys
+import threading
 
 from utils import generate_blum_modulus
-from ffs import keygen_ffs, authenticate, authenticate_verbose
-from storage import save_public, save_private, load_private
+from ffs import authenticate, authenticate_verbose
+import bigint
+import metrics
+import protocols
+from precomp import precompute_keys
+from wire import CODECS, MODES
+import transport
+import tuning
+from storage import KEY_FORMAT_VERSION, KEY_FORMAT_VERSIONS, migrate_keys, open_store, save_private, load_private
 
 
 def cmd_keygen(args: argparse.Namespace) -> int:
+    # k (și protocolul): explicite, altfel din profilul scris de "tune", altfel 5 / ffs
+    profile = tuning.load_profile(args.profile)
+    args.k = tuning.profile_value(profile, "k", args.k, 5)
+    args.protocol = tuning.profile_value(profile, "protocol", args.protocol, protocols.DEFAULT)
+
     # Generează Blum modulus (p,q ≡ 3 mod 4) conform Protocol 10.26
-    p, q, n = generate_blum_modulus(args.bits)
+    p, q, n = generate_blum_modulus(args.bits, workers=args.workers)
 
-    keys = keygen_ffs(n, args.k)
+    keys = protocols.get(args.protocol).keygen(n, args.k)
 
-    pub_path = save_public(keys, args.name, keys_dir=args.keys_dir)
+    store = open_store(args.store, args.keys_dir)
+    try:
+        pub_path = store.save_public(keys, args.name)
+    finally:
+        store.close()
     priv_path = save_private(keys, args.name, keys_dir=args.keys_dir)
 
-    print("=== KEYGEN (FFS Protocol 10.26) ===")
+    print("=== KEYGEN (FFS Protocol 10.26) ===" if args.protocol == "ffs" else "=== KEYGEN (GQ Protocol 10.31) ===")
     print("name:", args.name)
     print("bits(p):", args.bits, "=> n bitlen:", n.bit_length())
-    print("k:", args.k)
+    print("protocol:", args.protocol, "| k:", args.k, "| workers:", args.workers)
+    if profile is not None:
+        print("profile:", args.profile, f"(t={profile['t']}, mode={profile['mode']}, "
+              f"k*t >= {profile['soundness_bits']})")
     print("p % 4 =", p % 4, "| q % 4 =", q % 4)
     print("Saved public :", pub_path)
     print("Saved private:", priv_path)
     return 0
 
 
+def authenticate_sessions(keys, name: str, t: int, kind: str, mode: str = "sequential", tables=None) -> bool:
+    """
+    Aceeași autentificare ca prover.py <-> verifier.py (ProverSession /
+    VerifierSession), dar cu ambele capete în procesul curent, legate prin
+    transportul 'kind' (transport.TRANSPORTS); prover-ul rulează într-un thread.
+    Cu "queue" mesajele nu se serializează deloc.
+    """
+    from prover import ProverSession, run_session as run_prover
+    from verifier import VerifierSession, run_session as run_verifier
+
+    pub = protocols.public_key(keys)
+    if tables is not None and tables.v is not None:
+        pub["v_table"] = tables.v
+
+    def lookup(who: str):
+        if who != name:
+            raise KeyError(who)
+        return pub
+
+    prover = ProverSession(keys, name, t, mode=mode, s_table=tables.s if tables is not None else None)
+    verifier = VerifierSession(lookup, t, modes=(mode,))
+    prover_end, verifier_end = transport.local_pair(kind)
+    thread = threading.Thread(target=run_prover, args=(prover, prover_end), daemon=True)
+    thread.start()
+    try:
+        return run_verifier(verifier, verifier_end)
+    finally:
+        thread.join()
+        prover_end.close()
+        verifier_end.close()
+
+
 def cmd_auth(args: argparse.Namespace) -> int:
     # Încarcă cheia privată (care include și publicele v)
     keys = load_private(args.name, keys_dir=args.keys_dir)
+    if keys.protocol != "ffs" and (args.precompute_mb > 0 or args.verbose):
+        print(f"--precompute-mb / --verbose exista doar pentru FFS (cheia lui {args.name} e {keys.protocol})")
+        return 2
+    tables = None
+    if args.precompute_mb > 0:
+        tables = precompute_keys(keys, args.window, int(args.precompute_mb * 2**20))
 
-    print("=== AUTH (FFS Protocol 10.26) ===")
+    print("=== AUTH (FFS Protocol 10.26) ===" if keys.protocol == "ffs" else "=== AUTH (GQ Protocol 10.31) ===")
     print("name:", args.name)
     print("n bitlen:", keys.n.bit_length())
-    print("k:", keys.k, "t:", args.t)
+    print("protocol:", keys.protocol, "| k:", keys.k, "t:", args.t)
     print("mode:", "verbose" if args.verbose else "normal")
+    if args.transport != "direct":
+        print("transport:", args.transport, "| rounds:", args.mode)
+    if tables is not None and tables.v is not None:
+        print("precompute: window", tables.v.window, f"({tables.v.nbytes / 2**20:.1f} MiB / tabel)")
 
-    ok = authenticate_verbose(keys, args.t) if args.verbose else authenticate(keys, args.t)
+    if args.metrics_out:
+        metrics.enable()
+    if args.transport != "direct":
+        ok = authenticate_sessions(keys, args.name, args.t, args.transport, args.mode, tables)
+    elif args.verbose:
+        ok = authenticate_verbose(keys, args.t)
+    elif keys.protocol != "ffs":
+        ok = protocols.authenticate(keys, args.t)
+    else:
+        ok = authenticate(keys, args.t, tables)
 
     print("\n=== REZULTAT FINAL ===")
     print("Autentificare reusita?", ok)
+    if args.metrics_out:
+        print("Metrics:", metrics.export(args.metrics_out, args.metrics_format))
     return 0 if ok else 1
 
 
+def cmd_prove(args: argparse.Namespace) -> int:
+    import fiat_shamir
+
+    keys = load_private(args.name, keys_dir=args.keys_dir)
+    t = args.t if args.t is not None else fiat_shamir.default_rounds(keys.k)
+    if keys.protocol != "ffs" and args.precompute_mb > 0:
+        print(f"--precompute-mb exista doar pentru FFS (cheia lui {args.name} e {keys.protocol})")
+        return 2
+    tables = None
+    if args.precompute_mb > 0:
+        tables = precompute_keys(keys, args.window, int(args.precompute_mb * 2**20))
+
+    if keys.k * t < fiat_shamir.SECURITY_BITS:
+        print(f"Atentie: k*t = {keys.k * t} < {fiat_shamir.SECURITY_BITS}; verify-proof va respinge dovada.",
+              file=sys.stderr)
+    line = fiat_shamir.dumps(fiat_shamir.prove(keys, args.name, t, args.context.encode("utf-8"), tables))
+    if args.out is None:
+        print(line)
+        return 0
+    with open(args.out, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+    print("=== PROVE (Fiat–Shamir, non-interactiv) ===")
+    print("name:", args.name, "| protocol:", keys.protocol, "| k:", keys.k, "t:", t, f"(k*t = {keys.k * t} biti)")
+    print("Appended proof:", args.out)
+    return 0
+
+
+def cmd_verify_proof(args: argparse.Namespace) -> int:
+    import fiat_shamir
+
+    store = open_store(args.store, args.keys_dir)
+    accepted = total = 0
+    try:
+        for path in args.proofs:
+            for name, ok in fiat_shamir.verify_many(fiat_shamir.read_proofs(path), store.load_public, args.min_t):
+                total += 1
+                accepted += ok
+                if args.verbose or not ok:
+                    print(f"{path}: {name}: {'ACCEPT' if ok else 'REJECT'}")
+    finally:
+        store.close()
+    print("=== VERIFY PROOF (Fiat–Shamir) ===")
+    print(f"Accepted: {accepted}/{total}")
+    return 0 if total and accepted == total else 1
+
+
+def cmd_tune(args: argparse.Namespace) -> int:
+    if args.transport == "direct":
+        modes = ["sequential"]  # fără mesaje: modul rundelor nu contează
+    else:
+        modes = args.modes
+    pairs = [(k, t) for k, t in tuning.candidates(args.soundness_bits, args.k_max, args.t_max) if k >= args.k_min]
+    if not pairs:
+        print("Nicio pereche (k, t) nu atinge tinta cu limitele date.")
+        return 1
+
+    print(f"=== TUNE (k*t >= {args.soundness_bits}, transport={args.transport}, objective={args.objective}) ===")
+    _, _, n = generate_blum_modulus(args.bits)
+    print("bits(p):", args.bits, "=> n bitlen:", n.bit_length(), "| sessions:", args.sessions,
+          "| bigint:", bigint.name)
+    print(f"{'proto':>5} {'k':>4} {'t':>4} {'mode':>10} {'p50 ms':>9} {'p95 ms':>9} {'cpu ms':>9} "
+          f"{'cpu_rate':>8} {'bytes':>7}")
+    results = []
+    for protocol in args.protocols:
+        for k, t in pairs:
+            for mode in modes:
+                r = tuning.measure(n, k, t, args.transport, mode, args.codec, args.sessions, args.warmup, protocol)
+                results.append(r)
+                print(f"{protocol:>5} {k:>4} {t:>4} {mode:>10} {r['latency_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+                      f"{r['cpu_ms']:>9.3f} {r['cpu_rate']:>8.0f} {r['bytes']:>7}")
+
+    choice = tuning.best(results, args.objective)
+    profile = tuning.make_profile(choice, results, args.soundness_bits, args.objective, args.transport,
+                                  args.codec, args.bits)
+    path = tuning.save_profile(profile, args.profile)
+    print(f"Recommended: protocol={choice['protocol']} k={choice['k']} t={choice['t']} mode={choice['mode']} "
+          f"(p50 {choice['latency_ms']:.3f} ms, {choice['cpu_rate']:.0f} auth/s/core CPU-bound, "
+          f"cheating prob 2^-{choice['k'] * choice['t']})")
+    print("Saved profile:", path)
+    return 0
+
+
+def cmd_center_init(args: argparse.Namespace) -> int:
+    from identity import TrustedCenter, save_center
+
+    center = TrustedCenter.generate(args.bits, args.k, workers=args.workers)
+    priv_path, pub_path = save_center(center, args.keys_dir)
+    print("=== CENTER INIT (identity-based) ===")
+    print("bits(p):", args.bits, "=> n bitlen:", center.n.bit_length(), "| k:", args.k)
+    print("Saved center private:", priv_path, "(p, q - secret)")
+    print("Saved center public :", pub_path, f"(verifier: --store id:{pub_path})")
+    return 0
+
+
+def cmd_extract(args: argparse.Namespace) -> int:
+    from identity import load_center
+
+    center = load_center(args.keys_dir)
+    priv_paths = []
+    for name in args.names:
+        priv_paths.append(save_private(center.extract(name), name, keys_dir=args.keys_dir))
+    print("=== EXTRACT (identity-based) ===")
+    print("n bitlen:", center.n.bit_length(), "| k:", center.k)
+    for path in priv_paths:
+        print("Saved private:", path)
+    return 0
+
+
+def cmd_enroll(args: argparse.Namespace) -> int:
+    from enroll import enroll, iter_names
+    from identity import CENTER_PUBLIC, load_params
+
+    center = args.center or f"{args.keys_dir}/{CENTER_PUBLIC}"
+    try:
+        params = load_params(center)
+    except FileNotFoundError:
+        print(f"Lipseste {center}: generati modulul comun cu 'center-init'.")
+        return 1
+    if not args.names_file and args.count <= 0:
+        print("Dati --count N sau --names-file.")
+        return 1
+    k = args.k or params["k"]
+
+    store = open_store(args.store, args.keys_dir)
+    try:
+        report = enroll(params["n"], k, iter_names(args.count, args.prefix, args.names_file), store,
+                        keys_dir=args.keys_dir, workers=args.workers, chunk=args.chunk,
+                        in_flight=args.in_flight, private=not args.no_private)
+    finally:
+        store.close()
+    seconds = max(report["seconds"], 1e-9)
+    print("=== ENROLL (trusted center, modul comun) ===")
+    print("n bitlen:", params["n"].bit_length(), "| k:", k, "| workers:", args.workers)
+    print(f"minted: {report['minted']} | time: {seconds:.2f}s | {report['minted'] / seconds:,.0f} keys/s")
+    print("store:", args.store or f"{args.keys_dir}/ (format v3, modul in {args.keys_dir}/moduli/)")
+    return 0
+
+
+def cmd_store_import(args: argparse.Namespace) -> int:
+    from keydb import KeyDB
+
+    with KeyDB(args.store or args.db) as db:
+        counts = db.import_json(args.keys_dir)
+        print(f"Imported {counts['imported']} public keys from {args.keys_dir}/ into {db.path} (total {len(db)})")
+        if counts["skipped"]:
+            print(f"Skipped {counts['skipped']} non-FFS keys (GQ keys stay in the JSON files)")
+    return 0
+
+
+def cmd_store_export(args: argparse.Namespace) -> int:
+    from keydb import KeyDB
+
+    with KeyDB(args.store or args.db) as db:
+        count = db.export_json(args.keys_dir)
+        print(f"Exported {count} public keys from {db.path} into {args.keys_dir}/")
+    return 0
+
+
+def cmd_migrate_keys(args: argparse.Namespace) -> int:
+    counts = migrate_keys(args.keys_dir, version=args.to)
+    print(f"=== MIGRATE KEYS ({args.keys_dir}/ -> v{args.to}) ===")
+    print("migrated:", counts["migrated"], "| already v%d:" % args.to, counts["skipped"])
+    return 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="ffs",
         description="Feige–Fiat–Shamir (Protocol 10.26) - keygen + auth (JSON keys)",
     )
     parser.add_argument("--keys-dir", default="keys", help="folder pentru chei (default: keys/)")
+    parser.add_argument("--store", default=None,
+                        help="baza SQLite pentru cheile publice (default: JSON in --keys-dir)")
+    bigint.add_cli_args(parser)
 
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p_keygen = sub.add_parser("keygen", help="genereaza chei (public+private) si le salveaza in JSON")
     p_keygen.add_argument("--name", required=True, help="numele user-ului (ex: alice)")
     p_keygen.add_argument("--bits", type=int, default=256, help="dimensiune p,q in biti (default: 256)")
-    p_keygen.add_argument("--k", type=int, default=5, help="numar secrete/publice (default: 5)")
+    p_keygen.add_argument("--k", type=int, default=None,
+                          help="numar secrete/publice (default: din --profile, altfel 5)")
+    p_keygen.add_argument("--protocol", choices=protocols.NAMES, default=None,
+                          help="ffs (k secrete) sau gq (un secret, challenge de k biti) (default: din --profile, altfel ffs)")
+    p_keygen.add_argument("--profile", default=None, help="profil scris de 'tune' (ia k si protocolul din el)")
+    p_keygen.add_argument("--workers", type=int, default=1,
+                          help="procese pentru cautarea p,q in paralel (default: 1)")
     p_keygen.set_defaults(func=cmd_keygen)
 
     p_auth = sub.add_parser("auth", help="ruleaza autentificarea folosind cheia privata salvata")
     p_auth.add_argument("--name", required=True, help="numele user-ului (ex: alice)")
     p_auth.add_argument("--t", type=int, default=4, help="numar runde (default: 4)")
     p_auth.add_argument("--verbose", action="store_true", help="afiseaza detalii pe runda")
+    p_auth.add_argument("--precompute-mb", type=float, default=0,
+                        help="memorie per tabel de produse precalculate (MiB, 0 = dezactivat)")
+    p_auth.add_argument("--window", type=int, default=None, help="fereastra tabelului (default: automat)")
+    p_auth.add_argument("--transport", choices=("direct",) + transport.TRANSPORTS, default="direct",
+                        help="direct: ffs.authenticate; altfel ProverSession <-> VerifierSession in proces "
+                             "peste transportul dat (queue = fara serializare)")
+    p_auth.add_argument("--mode", choices=MODES, default="sequential",
+                        help="modul rundelor pentru --transport (default: sequential)")
+    metrics.add_cli_args(p_auth)
     p_auth.set_defaults(func=cmd_auth)
 
+    p_prove = sub.add_parser("prove", help="genereaza o dovada non-interactiva (Fiat–Shamir)")
+    p_prove.add_argument("--name", required=True, help="numele user-ului (ex: alice)")
+    p_prove.add_argument("--t", type=int, default=None,
+                         help="numar runde (default: minim cu k*t >= 128)")
+    p_prove.add_argument("--context", default="", help="context / nonce legat de dovada (ex: id sesiune)")
+    p_prove.add_argument("--out", default=None, help="adauga dovada in fisierul JSON lines (default: stdout)")
+    p_prove.add_argument("--precompute-mb", type=float, default=0,
+                         help="memorie pentru tabelul de produse al lui s (MiB, 0 = dezactivat)")
+    p_prove.add_argument("--window", type=int, default=None, help="fereastra tabelului (default: automat)")
+    p_prove.set_defaults(func=cmd_prove)
+
+    p_verify = sub.add_parser("verify-proof", help="verifica dovezi non-interactive (fisiere JSON lines)")
+    p_verify.add_argument("proofs", nargs="+", help="fisiere cu dovezi (una per linie)")
+    p_verify.add_argument("--min-t", type=int, default=None,
+                          help="respinge dovezile cu mai putine runde (default si minim: k*t >= 128)")
+    p_verify.add_argument("--verbose", action="store_true", help="afiseaza rezultatul fiecarei dovezi")
+    p_verify.set_defaults(func=cmd_verify_proof)
+
+    p_center = sub.add_parser("center-init", help="centru de incredere: genereaza p, q si publica doar n")
+    p_center.add_argument("--bits", type=int, default=256, help="dimensiune p,q in biti (default: 256)")
+    p_center.add_argument("--k", type=int, default=5, help="numar secrete/publice per identitate (default: 5)")
+    p_center.add_argument("--workers", type=int, default=1,
+                          help="procese pentru cautarea p,q in paralel (default: 1)")
+    p_center.set_defaults(func=cmd_center_init)
+
+    p_extract = sub.add_parser("extract", help="centru de incredere: cheia privata derivata din nume")
+    p_extract.add_argument("names", nargs="+", help="identitatile (ex: alice bob)")
+    p_extract.set_defaults(func=cmd_extract)
+
+    p_enroll = sub.add_parser("enroll", help="centru de incredere: chei in bloc pe modulul comun")
+    p_enroll.add_argument("--count", type=int, default=0, help="numar de utilizatori <prefix>000000..")
+    p_enroll.add_argument("--prefix", default="user", help="prefixul numelor pentru --count (default: user)")
+    p_enroll.add_argument("--names-file", default=None, help="fisier cu numele, unul per linie")
+    p_enroll.add_argument("--center", default=None,
+                          help="parametrii publici ai centrului (default: <keys-dir>/center.params.json)")
+    p_enroll.add_argument("--k", type=int, default=None, help="numar secrete/publice (default: k-ul centrului)")
+    p_enroll.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                          help="procese pentru keygen (default: toate CPU-urile)")
+    p_enroll.add_argument("--chunk", type=int, default=256, help="utilizatori per bucata trimisa unui worker")
+    p_enroll.add_argument("--in-flight", type=int, default=0, help="bucati in zbor (default: 2 * workers)")
+    p_enroll.add_argument("--no-private", action="store_true", help="nu scrie cheile private in --keys-dir")
+    p_enroll.set_defaults(func=cmd_enroll)
+
+    p_tune = sub.add_parser("tune", help="masoara perechi (k, t) cu k*t >= tinta si scrie un profil")
+    p_tune.add_argument("--soundness-bits", type=int, default=20,
+                        help="tinta: probabilitate de trisare <= 2^-S, adica k*t >= S (default: 20)")
+    p_tune.add_argument("--transport", choices=("direct",) + transport.TRANSPORTS, default="queue",
+                        help="transportul masurat (default: queue; direct = fara mesaje)")
+    p_tune.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES),
+                        help="modurile de runde incercate (default: toate)")
+    p_tune.add_argument("--codec", choices=CODECS, default="bin", help="codec pentru stdio/unix/tcp si octeti")
+    p_tune.add_argument("--protocols", nargs="+", choices=protocols.NAMES, default=[protocols.DEFAULT],
+                        help="protocoalele masurate (default: ffs)")
+    p_tune.add_argument("--objective", choices=tuning.OBJECTIVES, default="latency",
+                        help="latency: p50 minim; cpu_rate: 1/CPU per sesiune maxim (limita per core, "
+                             "nu throughput-ul serverului; acela se masoara cu loadgen.py)")
+    p_tune.add_argument("--bits", type=int, default=256, help="dimensiune p,q in biti (default: 256)")
+    p_tune.add_argument("--k-min", type=int, default=1)
+    p_tune.add_argument("--k-max", type=int, default=64)
+    p_tune.add_argument("--t-max", type=int, default=64)
+    p_tune.add_argument("--sessions", type=int, default=50, help="autentificari masurate per candidat")
+    p_tune.add_argument("--warmup", type=int, default=5)
+    p_tune.add_argument("--profile", default="ffs_profile.json", help="fisierul profil (default: ffs_profile.json)")
+    p_tune.set_defaults(func=cmd_tune)
+
+    p_migrate = sub.add_parser("migrate-keys", help="rescrie fisierele de chei din --keys-dir in alt format")
+    p_migrate.add_argument("--to", type=int, choices=KEY_FORMAT_VERSIONS, default=KEY_FORMAT_VERSION,
+                           help=f"versiunea formatului (default: {KEY_FORMAT_VERSION})")
+    p_migrate.set_defaults(func=cmd_migrate_keys)
+
+    p_import = sub.add_parser("store-import", help="importa cheile publice JSON din --keys-dir in baza --store")
+    p_import.add_argument("--db", default="keys.db", help="baza SQLite daca lipseste --store (default: keys.db)")
+    p_import.set_defaults(func=cmd_store_import)
+
+    p_export = sub.add_parser("store-export", help="exporta cheile publice din baza --store ca JSON in --keys-dir")
+    p_export.add_argument("--db", default="keys.db", help="baza SQLite daca lipseste --store (default: keys.db)")
+    p_export.set_defaults(func=cmd_store_export)
+
     return parser
 
 
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
+    bigint.apply_cli_args(parser, args)
     return args.func(args)
 
 
@@ -0,0 +1,178 @@
+# metrics.py
+# Metrici de latență și contoare pentru prover, verifier și ffs.
+#
+# Dezactivate implicit. Codul instrumentat verifică întâi metrics.ENABLED
+# (un singur lookup de variabilă globală), deci costul când sunt oprite e
+# practic zero:
+#
+#     if metrics.ENABLED:
+#         t0 = perf_counter()
+#     ...
+#     if metrics.ENABLED:
+#         metrics.observe("ffs_verifier_check_seconds", perf_counter() - t0)
+#
+# Export: text Prometheus (exposition format) sau snapshot JSON.
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+ENABLED = False
+
+# limite (secunde) pentru histograme: 10us .. 10s
+DEFAULT_BUCKETS = (
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+HELP = {
+    "ffs_verifier_commit_wait_seconds": "Asteptare commit de la prover",
+    "ffs_verifier_challenge_seconds": "Generare challenge",
+    "ffs_verifier_response_wait_seconds": "Asteptare raspuns de la prover",
+    "ffs_verifier_check_seconds": "verifier_check per runda",
+    "ffs_verifier_session_seconds": "Sesiune verifier (hello -> done)",
+    "ffs_verifier_sessions_total": "Sesiuni verifier dupa rezultat",
+    "ffs_verifier_tickets_total": "Tichete de re-autentificare (emise / acceptate / motiv respingere)",
+    "ffs_verifier_rounds_saved_total": "Runde evitate prin tichete acceptate",
+    "ffs_prover_commit_seconds": "Calcul commitment",
+    "ffs_prover_challenge_wait_seconds": "Asteptare challenge de la verifier",
+    "ffs_prover_response_seconds": "Calcul raspuns",
+    "ffs_prover_session_seconds": "Sesiune prover (hello -> done)",
+    "ffs_prover_sessions_total": "Sesiuni prover dupa rezultat",
+    "ffs_round_seconds": "Runda ffs_round (local)",
+    "ffs_rounds_total": "Runde ffs_round dupa rezultat",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Labels], float] = {}
+_histograms: Dict[Tuple[str, Labels], "Histogram"] = {}
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # ultimul = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+def enable() -> None:
+    global ENABLED
+    ENABLED = True
+
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def inc(name: str, value: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+    key = (name, _labels(labels))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = Histogram()
+        h.observe(value)
+
+
+# =========================
+# Export
+# =========================
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def to_prometheus() -> str:
+    lines = []
+    with _lock:
+        seen = set()
+        for (name, labels), value in sorted(_counters.items()):
+            if name not in seen:
+                seen.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_fmt_labels(labels)} {value:g}")
+
+        for (name, labels), h in sorted(_histograms.items(), key=lambda kv: kv[0]):
+            if name not in seen:
+                seen.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', repr(bound)))} {cumulative}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', '+Inf'))} {h.count}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {h.sum:.9f}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {h.count}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> Dict:
+    with _lock:
+        return {
+            "created": time.time(),
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(_counters.items())
+            ],
+            "histograms": [
+                {"name": name, "labels": dict(labels), "buckets": list(h.buckets), "counts": list(h.counts),
+                 "sum": h.sum, "count": h.count}
+                for (name, labels), h in sorted(_histograms.items(), key=lambda kv: kv[0])
+            ],
+        }
+
+
+def export(path: str, fmt: Optional[str] = None) -> Path:
+    """Scrie metricile în 'path'; fmt = "prom" | "json" (implicit după extensie)."""
+    p = Path(path)
+    if fmt is None:
+        fmt = "json" if p.suffix == ".json" else "prom"
+    text = json.dumps(snapshot(), indent=2) if fmt == "json" else to_prometheus()
+    p.write_text(text, encoding="utf-8")
+    return p
+
+
+def add_cli_args(ap) -> None:
+    """--metrics-out / --metrics-format, comune pentru scripturi."""
+    ap.add_argument("--metrics-out", default=None,
+                    help="activeaza metricile si le scrie la final in acest fisier")
+    ap.add_argument("--metrics-format", choices=("prom", "json"), default=None,
+                    help="format export (default: dupa extensie, .json => json, altfel prom)")
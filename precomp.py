@@ -0,0 +1,140 @@
+# precomp.py
+# Tabele precalculate de produse pe submulțimi (windowed subset products)
+# pentru Π s_j^{e_j} mod n (prover) și Π v_j^{e_j} mod n (verifier).
+#
+# Valorile v1..vk (sau s1..sk) se împart în ferestre de câte w elemente.
+# Pentru fiecare fereastră păstrăm toate cele 2^w produse, indexate după
+# biții lui e din fereastra respectivă. O rundă costă astfel ~k/w înmulțiri
+# modulare în loc de până la k.
+#
+# Construcția costă ~(k/w) * 2^w înmulțiri, iar câștigul per produs e doar
+# ~k/2 - k/w: fereastra automată (choose_window) minimizează costul total
+# pentru numărul așteptat de produse, limitat de memorie, nu cea mai mare
+# fereastră care încape.
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+from ffs import FFSKeys
+
+MAX_WINDOW = 16
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MiB per tabel
+# câte produse (runde) servește un tabel pe durata lui, pentru alegerea ferestrei
+DEFAULT_PRODUCTS = 1 << 16
+
+Challenge = Union[Sequence[int], int]
+
+
+def challenge_to_int(e: Challenge) -> int:
+    """Vectorul (e1..ek) ca întreg: bitul j = e_{j+1}."""
+    if isinstance(e, int):
+        return e
+    return int("".join("1" if bit else "0" for bit in reversed(e)) or "0", 2)
+
+
+def entry_bytes(n: int) -> int:
+    # int Python (~28 B antet + cifre de 30 biți) + pointerul din listă
+    return 28 + 4 * ((n.bit_length() + 29) // 30) + 8
+
+
+def table_bytes(k: int, n: int, window: int) -> int:
+    """Memoria estimată pentru un tabel cu ferestre de 'window' biți."""
+    windows = (k + window - 1) // window
+    return windows * (1 << window) * entry_bytes(n)
+
+
+def window_cost(k: int, window: int, products: int) -> float:
+    """Înmulțiri modulare așteptate: construcția tabelului + 'products' produse."""
+    windows = (k + window - 1) // window
+    build = windows * ((1 << window) - 1)
+    # o fereastră cu toți biții 0 nu costă nimic
+    per_product = windows * (1 - 2.0 ** -window)
+    return build + products * per_product
+
+
+def choose_window(k: int, n: int, max_bytes: int = DEFAULT_MAX_BYTES,
+                  products: int = DEFAULT_PRODUCTS) -> int:
+    """
+    Fereastra (2..min(k, MAX_WINDOW)) cu cel mai mic window_cost pentru
+    'products' produse, dintre cele care încap în max_bytes; 0 dacă niciuna
+    nu încape sau dacă produsul simplu (~k/2 înmulțiri) e mai ieftin.
+    """
+    best, best_cost = 0, products * k / 2
+    for w in range(2, min(k, MAX_WINDOW) + 1):
+        if table_bytes(k, n, w) > max_bytes:
+            continue
+        cost = window_cost(k, w, products)
+        if cost < best_cost:
+            best, best_cost = w, cost
+    return best
+
+
+class SubsetProductTable:
+    """
+    Tabel de produse pe submulțimi pentru valorile values[0..k-1] mod n.
+    product(e, acc) = acc * Π values[j]^{e_j} mod n.
+    """
+
+    def __init__(self, values: Sequence[int], n: int, window: int):
+        if not 1 <= window <= MAX_WINDOW:
+            raise ValueError(f"window trebuie sa fie in [1, {MAX_WINDOW}]")
+        self.n = n
+        self.k = len(values)
+        self.window = window
+        self.tables: list[list[int]] = []
+
+        for start in range(0, self.k, window):
+            chunk = values[start:start + window]
+            table = [1] * (1 << len(chunk))
+            for mask in range(1, len(table)):
+                low = mask & -mask
+                table[mask] = (table[mask ^ low] * chunk[low.bit_length() - 1]) % n
+            self.tables.append(table)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(t) for t in self.tables) * entry_bytes(self.n)
+
+    def product(self, e: Challenge, acc: int = 1) -> int:
+        n = self.n
+        bits = challenge_to_int(e)
+        mask = (1 << self.window) - 1
+        for table in self.tables:
+            idx = bits & mask
+            if idx:
+                acc = (acc * table[idx]) % n
+            bits >>= self.window
+        return acc
+
+
+def build_table(values: Sequence[int], n: int, window: Optional[int] = None,
+                max_bytes: int = DEFAULT_MAX_BYTES, products: int = DEFAULT_PRODUCTS) -> Optional[SubsetProductTable]:
+    """
+    Construiește tabelul pentru values; window=None => choose_window(), pentru
+    'products' produse așteptate.
+    Returnează None dacă nu încape nicio fereastră utilă în max_bytes
+    (apelantul cade pe produsul simplu).
+    """
+    if window is None:
+        window = choose_window(len(values), n, max_bytes, products)
+        if window == 0:
+            return None
+    elif table_bytes(len(values), n, window) > max_bytes:
+        raise ValueError("tabelul depaseste limita de memorie")
+    return SubsetProductTable(values, n, window)
+
+
+@dataclass
+class FFSTables:
+    """Tabelele per cheie: s pentru prover (poate lipsi), v pentru verifier."""
+    s: Optional[SubsetProductTable]
+    v: Optional[SubsetProductTable]
+
+
+def precompute_keys(keys: FFSKeys, window: Optional[int] = None,
+                    max_bytes: int = DEFAULT_MAX_BYTES) -> FFSTables:
+    """Tabelele pentru ambele părți; max_bytes se aplică fiecărui tabel."""
+    return FFSTables(
+        s=build_table(keys.s, keys.n, window, max_bytes),
+        v=build_table(keys.v, keys.n, window, max_bytes),
+    )
@@ -0,0 +1,123 @@
+# protocols.py
+# Motorul de protocoale: etapele unei identificări challenge–response
+# (keygen, commit, challenge, respond, check) în spatele aceleiași interfețe,
+# ca ProverSession / VerifierSession, storage și benchmark-urile să nu depindă
+# de un protocol anume.
+#
+#   ffs - Feige–Fiat–Shamir (Protocol 10.26): k secrete, k biți de challenge pe rundă
+#   gq  - Guillou–Quisquater (Protocol 10.31): un secret, k biți de challenge pe rundă
+#
+# La ambele, k*t = biții de soundness (trișare cu probabilitate 2^-(k*t)),
+# challenge-ul e o listă de k biți și x, y sunt întregi mod n, deci mesajele
+# și codec-urile din wire.py sunt comune. Protocolul se negociază în hello
+# ("protocol"; lipsă = ffs) și trebuie să fie cel al cheii publice.
+import secrets
+from typing import Any, Dict, List, Tuple
+
+import bigint
+from ffs import BATCH_KEYGEN_MIN_K, keygen_ffs, keygen_ffs_batch, verifier_check
+from gq import gq_check, gq_commit, gq_respond, keygen_gq
+from utils import random_coprime
+
+DEFAULT = "ffs"
+# pragul implicit al server-ului, în biți de soundness: configurația implicită k=5, t=4
+DEFAULT_MIN_BITS = 20
+
+
+class FFSProtocol:
+    name = "ffs"
+
+    def keygen(self, n: int, k: int):
+        # pentru k mare: o singură inversare modulară pentru toți s_i^2
+        return keygen_ffs_batch(n, k) if k >= BATCH_KEYGEN_MIN_K else keygen_ffs(n, k)
+
+    def commit(self, keys) -> Tuple[int, int]:
+        # r aleator, b aleator, x = (-1)^b * r^2 mod n
+        n = bigint.mpz(keys.n)
+        r = random_coprime(keys.n)
+        x = bigint.powmod(r, 2, n)
+        if secrets.randbelow(2) == 1:
+            x = (-x) % n
+        return r, int(x)
+
+    def challenge(self, k: int) -> List[int]:
+        return [secrets.randbelow(2) for _ in range(k)]
+
+    def respond(self, keys, r: int, e: List[int], table=None) -> int:
+        # y = r * Π s_j^{e_j} mod n
+        n = bigint.mpz(keys.n)
+        if table is not None:
+            return int(table.product(e, r % n))
+        y = r % n
+        for j in range(keys.k):
+            if e[j] == 1:
+                y = (y * keys.s[j]) % n
+        return int(y)
+
+    def check(self, pub: Dict[str, Any], x: int, e: List[int], y: int) -> bool:
+        return verifier_check(pub["n"], pub["v"], x, e, y, pub.get("v_table"))
+
+    def soundness_bits(self, k: int, t: int) -> int:
+        # k biți de challenge pe rundă, t runde independente
+        return k * t
+
+
+class GQProtocol:
+    name = "gq"
+
+    def keygen(self, n: int, k: int):
+        return keygen_gq(n, k)
+
+    def commit(self, keys) -> Tuple[int, int]:
+        return gq_commit(keys)
+
+    def challenge(self, k: int) -> List[int]:
+        return [secrets.randbelow(2) for _ in range(k)]
+
+    def respond(self, keys, r: int, e: List[int], table=None) -> int:
+        return gq_respond(keys, r, e)
+
+    def check(self, pub: Dict[str, Any], x: int, e: List[int], y: int) -> bool:
+        return gq_check(pub["n"], pub["v"][0], pub["k"], x, e, y)
+
+    def soundness_bits(self, k: int, t: int) -> int:
+        # challenge-ul de k biți e un întreg < 2^k (exponentul public > 2^k): o rundă dă k biți
+        return k * t
+
+
+PROTOCOLS = {p.name: p for p in (FFSProtocol(), GQProtocol())}
+NAMES = tuple(PROTOCOLS)
+
+
+def get(name: str):
+    try:
+        return PROTOCOLS[name]
+    except KeyError:
+        raise ValueError(f"protocol trebuie sa fie unul din {NAMES}") from None
+
+
+def of_public(pub: Dict[str, Any]) -> str:
+    """Protocolul unei chei publice (cheile fără câmpul "protocol" sunt FFS)."""
+    return pub.get("protocol", DEFAULT)
+
+
+def public_key(keys) -> Dict[str, Any]:
+    """Cheia publică {n, k, v[, protocol]} a cheilor private 'keys' (ca storage.load_public)."""
+    pub = {"n": keys.n, "k": keys.k, "v": keys.v}
+    if keys.protocol != DEFAULT:
+        pub["protocol"] = keys.protocol
+    return pub
+
+
+def authenticate(keys, t: int) -> bool:
+    """t runde commit / challenge / respond / check, în proces, cu protocolul cheii."""
+    if t <= 0:
+        raise ValueError("t trebuie sa fie >= 1")
+    proto = get(keys.protocol)
+    pub = public_key(keys)
+    for _ in range(t):
+        r, x = proto.commit(keys)
+        e = proto.challenge(keys.k)
+        if not proto.check(pub, x, e, proto.respond(keys, r, e)):
+            return False
+    return True
@@ -1,64 +1,320 @@
 # prover.py
 import argparse
-import secrets
+import sys
+from time import perf_counter
+from typing import Any, Dict, List, Optional
 
+import bigint
+import metrics
+import protocols
+import tickets
+import transport
+from commit_pool import CommitmentPool
+from ffs import FFSKeys
+from precomp import build_table
 from storage import load_private
-from utils import random_coprime
-from wire import send, recv
+from wire import CODECS, MODES, make_codec
+
+
+def valid_challenge(e: Any, k: int) -> bool:
+    return isinstance(e, list) and len(e) == k and all(bit in (0, 1) for bit in e)
+
+
+class ProverSession:
+    """
+    Starea prover-ului pentru o autentificare, fără I/O.
+    hello() dă primul mesaj; on_message() primește un mesaj de la verifier
+    și întoarce mesajele de trimis. La final: done=True, exit_code 0/1/2.
+
+    Moduri (negociate prin hello):
+      - sequential: t runde commit → challenge → response → result
+      - parallel:   toate cele t commit-uri într-un mesaj, apoi toate
+                    challenge-urile, apoi toate răspunsurile (număr fix de
+                    round trip-uri, indiferent de t)
+
+    Protocolul (protocols.py) e cel al cheilor și e anunțat în hello;
+    s_table și commit_pool sunt doar pentru FFS.
+
+    ticket: tichet de re-autentificare (tickets.py) prezentat în hello; dacă
+    verifier-ul îl acceptă, sesiunea se termină fără runde (ticket_used).
+    want_ticket: cere un tichet nou la final; ajunge în self.ticket / ticket_expires.
+    """
+
+    def __init__(self, keys: FFSKeys, name: str, t: int, mode: str = "sequential", s_table=None,
+                 codecs=CODECS, commit_pool=None, ticket: Optional[str] = None, want_ticket: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"mode trebuie sa fie unul din {MODES}")
+        self.protocol = protocols.get(keys.protocol)
+        if self.protocol.name != "ffs" and (s_table is not None or commit_pool is not None):
+            raise ValueError("s_table / commit_pool exista doar pentru FFS")
+        self.keys = keys
+        self.name = name
+        self.t = t
+        self.mode = mode
+        self.s_table = s_table
+        self.commit_pool = commit_pool
+        self.codecs = tuple(codecs)
+        self.codec = "json"
+        self._wire_codec = None
+        self.ticket = ticket
+        self.ticket_expires: Optional[float] = None
+        self.want_ticket = want_ticket
+        self.ticket_used = False
+
+        self.round_no = 0
+        self.r: List[int] = []
+        self.done = False
+        self.exit_code: Optional[int] = None
+
+        # metrics: începutul sesiunii și momentul ultimului mesaj trimis
+        self._started: Optional[float] = None
+        self._sent_at: Optional[float] = None
+
+    def hello(self) -> Dict[str, Any]:
+        if metrics.ENABLED:
+            self._started = self._sent_at = perf_counter()
+        msg = {"type": "hello", "role": "prover", "name": self.name, "protocol": self.protocol.name,
+               "k": self.keys.k, "t": self.t, "mode": self.mode, "modes": list(MODES), "codecs": list(self.codecs)}
+        if self.ticket is not None:
+            msg["ticket"] = self.ticket
+        if self.want_ticket:
+            msg["want_ticket"] = True
+        return msg
+
+    @property
+    def wire_codec(self):
+        """Codec-ul negociat (JSON până la hello-ul verifier-ului)."""
+        if self._wire_codec is None or self._wire_codec.name != self.codec:
+            self._wire_codec = make_codec(self.codec, self.keys.n, self.keys.k)
+        return self._wire_codec
+
+    def _commit(self) -> int:
+        if metrics.ENABLED:
+            t0 = perf_counter()
+            x = self._commit_inner()
+            metrics.observe("ffs_prover_commit_seconds", perf_counter() - t0,
+                            {"pool": "yes" if self.commit_pool is not None else "no"})
+            return x
+        return self._commit_inner()
+
+    def _commit_inner(self) -> int:
+        if self.commit_pool is not None:
+            # pereche precalculată (commit_pool.CommitmentPool)
+            r, x = self.commit_pool.take()
+            self.r.append(r)
+            return x
+
+        r, x = self.protocol.commit(self.keys)
+        self.r.append(r)
+        return x
+
+    def _respond(self, r: int, e: List[int]) -> int:
+        if metrics.ENABLED:
+            t0 = perf_counter()
+            y = self._respond_inner(r, e)
+            metrics.observe("ffs_prover_response_seconds", perf_counter() - t0)
+            return y
+        return self._respond_inner(r, e)
+
+    def _respond_inner(self, r: int, e: List[int]) -> int:
+        return self.protocol.respond(self.keys, r, e, self.s_table)
+
+    def _fail(self, message: str) -> List[Dict[str, Any]]:
+        self.done = True
+        self.exit_code = 2
+        return [{"type": "error", "round": self.round_no, "message": message}]
+
+    def _finish(self, ok: bool) -> List[Dict[str, Any]]:
+        self.done = True
+        self.exit_code = 0 if ok else 1
+        return [{"type": "done", "ok": ok}]
+
+    def on_message(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not metrics.ENABLED:
+            return self._dispatch(msg)
+
+        now = perf_counter()
+        if self._started is None:
+            self._started = now
+        if self._sent_at is not None and msg.get("type") in ("challenge", "challenges"):
+            metrics.observe("ffs_prover_challenge_wait_seconds", now - self._sent_at, {"mode": self.mode})
+
+        was_done = self.done
+        out = self._dispatch(msg)
+        self._sent_at = perf_counter()
+
+        if self.done and not was_done:
+            result = {0: "accepted", 1: "rejected"}.get(self.exit_code, "error")
+            metrics.inc("ffs_prover_sessions_total", labels={"result": result})
+            metrics.observe("ffs_prover_session_seconds", self._sent_at - self._started, {"mode": self.mode})
+        return out
+
+    def _dispatch(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        mtype = msg.get("type")
+
+        if mtype == "error":
+            self.done = True
+            self.exit_code = 2
+            return []
+
+        if self.round_no == 0:
+            if mtype != "hello" or msg.get("role") != "verifier":
+                return self._fail("Expected hello")
+            if msg.get("protocol", protocols.DEFAULT) != self.protocol.name:
+                return self._fail("Protocol mismatch")
+            self.mode = msg.get("mode", self.mode)
+            if self.mode not in MODES:
+                return self._fail("Unknown mode")
+            self.codec = msg.get("codec", "json")
+            if self.codec not in self.codecs and self.codec != "json":
+                return self._fail("Unknown codec")
+            if msg.get("ticket") == "accepted":
+                # re-autentificare cu tichet: fără runde
+                self.ticket_used = True
+                self.done = True
+                self.exit_code = 0
+                return []
+            if "ticket" in msg:
+                self.ticket = None  # respins (expirat / revocat / invalid)
+            self.round_no = 1
+            if self.mode == "parallel":
+                xs = [self._commit() for _ in range(self.t)]
+                return [{"type": "commits", "x": xs}]
+            return [{"type": "commit", "round": 1, "x": self._commit()}]
+
+        if mtype == "ticket":
+            if isinstance(msg.get("ticket"), str):
+                self.ticket = msg["ticket"]
+                self.ticket_expires = msg.get("expires")
+            return []
+
+        if self.mode == "parallel":
+            return self._on_parallel(msg)
+        return self._on_sequential(msg)
+
+    def _on_sequential(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        round_no = self.round_no
+        mtype = msg.get("type")
+
+        if mtype == "challenge":
+            if msg.get("round") != round_no or len(self.r) != round_no:
+                return self._fail("Expected challenge")
+            e = msg["e"]
+            if not valid_challenge(e, self.keys.k):
+                return self._fail("Bad challenge format")
+            y = self._respond(self.r[-1], e)
+            self.r[-1] = 0
+            return [{"type": "response", "round": round_no, "y": y}]
+
+        if mtype == "result" and msg.get("round") == round_no:
+            if not msg.get("ok", False):
+                # verifier rejected; end early
+                return self._finish(False)
+            if round_no == self.t:
+                return self._finish(True)
+            self.round_no += 1
+            return [{"type": "commit", "round": self.round_no, "x": self._commit()}]
+
+        return self._fail("Expected result")
+
+    def _on_parallel(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        mtype = msg.get("type")
+
+        if mtype == "challenges" and self.r:
+            es = msg.get("e")
+            if not (isinstance(es, list) and len(es) == self.t and all(valid_challenge(e, self.keys.k) for e in es)):
+                return self._fail("Bad challenge format")
+            ys = [self._respond(r, e) for r, e in zip(self.r, es)]
+            for i in range(len(self.r)):
+                self.r[i] = 0
+            self.r = []
+            return [{"type": "responses", "y": ys}]
+
+        if mtype == "result" and not self.r:
+            return self._finish(bool(msg.get("ok", False)))
+
+        return self._fail("Expected challenges")
+
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--name", required=True)
     ap.add_argument("--keys-dir", default="keys")
     ap.add_argument("--t", type=int, default=4)
+    ap.add_argument("--mode", choices=MODES, default="sequential", help="modul propus in hello")
+    ap.add_argument("--codecs", nargs="+", choices=CODECS, default=list(CODECS),
+                    help="codec-uri oferite in hello, in ordinea preferintei")
+    ap.add_argument("--commit-pool", type=int, default=0,
+                    help="commitment-uri (r, x) precalculate in fundal (0 = dezactivat)")
+    ap.add_argument("--stats", action="store_true", help="afiseaza statistici pool pe stderr")
+    ap.add_argument("--connect", default=None,
+                    help="conectare la server.py (tcp://host:port sau unix:/cale) in loc de stdin/stdout")
+    ap.add_argument("--precompute-mb", type=float, default=0,
+                    help="memorie pentru tabelul de produse s (MiB, 0 = dezactivat)")
+    ap.add_argument("--window", type=int, default=None, help="fereastra tabelului (default: automat)")
+    ap.add_argument("--ticket-file", default=None,
+                    help="prezinta tichetul salvat aici (daca e valid) si salveaza tichetul nou primit")
+    metrics.add_cli_args(ap)
+    bigint.add_cli_args(ap)
     args = ap.parse_args()
+    bigint.apply_cli_args(ap, args)
+    if args.metrics_out:
+        metrics.enable()
 
     keys = load_private(args.name, keys_dir=args.keys_dir)
-    n = keys.n
-    k = keys.k
-
-    send({"type": "hello", "role": "prover", "name": args.name, "k": k, "t": args.t})
+    if keys.protocol != "ffs" and (args.commit_pool > 0 or args.precompute_mb > 0):
+        ap.error(f"--commit-pool / --precompute-mb exista doar pentru FFS (cheia lui {args.name} e {keys.protocol})")
+    s_table = build_table(keys.s, keys.n, args.window, int(args.precompute_mb * 2**20)) if args.precompute_mb > 0 else None
 
-    for round_no in range(1, args.t + 1):
-        # Prover chooses r, b and computes x = (-1)^b * r^2 mod n
-        r = random_coprime(n)
-        b = secrets.randbelow(2)
-        x = pow(r, 2, n)
-        if b == 1:
-            x = (-x) % n
+    pool = None
+    if args.commit_pool > 0:
+        pool = CommitmentPool(keys.n, capacity=args.commit_pool, low_water=max(1, args.commit_pool // 4))
+    ticket = tickets.load_ticket(args.ticket_file)
+    session = ProverSession(keys, args.name, args.t, mode=args.mode, s_table=s_table, codecs=args.codecs,
+                            commit_pool=pool, ticket=ticket, want_ticket=args.ticket_file is not None)
+    try:
+        code = connect_and_run(session, args.connect)
+        if args.ticket_file and not session.ticket_used and code == 0:
+            tickets.save_ticket(args.ticket_file, session.ticket, session.ticket_expires)
+        return code
+    finally:
+        if pool is not None:
+            if args.stats:
+                print("commit pool:", pool.stats(), file=sys.stderr)
+            pool.close()
+        if args.metrics_out:
+            metrics.export(args.metrics_out, args.metrics_format)
 
-        send({"type": "commit", "round": round_no, "x": str(x)})
 
-        msg = recv()
-        if msg.get("type") != "challenge" or msg.get("round") != round_no:
-            send({"type": "error", "round": round_no, "message": "Expected challenge"})
-            return 2
-
-        e = msg["e"]
-        if not (isinstance(e, list) and len(e) == k and all(bit in (0, 1) for bit in e)):
-            send({"type": "error", "round": round_no, "message": "Bad challenge format"})
-            return 2
+def connect_and_run(session: ProverSession, connect: Optional[str]) -> int:
+    """Pe stdin/stdout dacă connect e None, altfel pe socket către server.py."""
+    if connect is None:
+        return run_session(session, transport.stdio())
 
-        # y = r * Π s_j^{e_j} mod n
-        y = r % n
-        for j in range(k):
-            if e[j] == 1:
-                y = (y * keys.s[j]) % n
+    conn = transport.connect(connect)
+    try:
+        code = run_session(session, conn)
+    finally:
+        conn.close()
+    print("Accepted?", code == 0)
+    return code
 
-        send({"type": "response", "round": round_no, "y": str(y)})
 
-        msg2 = recv()
-        if msg2.get("type") != "result" or msg2.get("round") != round_no:
-            send({"type": "error", "round": round_no, "message": "Expected result"})
+def run_session(session: ProverSession, conn=None) -> int:
+    """Rulează sesiunea peste un transport (transport.py; implicit stdin/stdout)."""
+    conn = conn or transport.stdio()
+    conn.send(session.hello())
+    try:
+        while not session.done:
+            for msg in session.on_message(conn.recv(session.wire_codec)):
+                conn.send(msg, session.wire_codec)
+    except EOFError:
+        return 2
+    except ConnectionError:
+        # verifier-ul închide imediat după o rundă respinsă; "done"-ul nostru nu mai ajunge
+        if not session.done:
             return 2
-
-        if not msg2.get("ok", False):
-            # verifier rejected; end early
-            send({"type": "done", "ok": False})
-            return 1
-
-    send({"type": "done", "ok": True})
-    return 0
+    return session.exit_code
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,217 @@
+# prover_pool.py
+# Pool de procese prover de lungă durată: fiecare worker încarcă cheile o
+# singură dată și servește pe rând multe sesiuni de autentificare, în loc
+# ca verifier.py să pornească un interpretor nou (prover.py) pentru fiecare.
+import multiprocessing as mp
+import os
+import queue
+import threading
+from time import monotonic
+from typing import Any, Callable, Dict, Optional
+
+import protocols
+from commit_pool import CommitmentPool
+from precomp import build_table
+from prover import ProverSession
+from storage import load_private
+from verifier import VerifierSession
+
+MAX_POOL_SIZE = 64
+
+
+def _worker_main(conn, keys_dir: str, precompute_bytes: int, commit_pool: int = 0) -> None:
+    """Bucla unui worker: comenzi ("ping",), ("stop",), ("session", name, t, mode)."""
+    cache: Dict[str, Any] = {}
+    while True:
+        try:
+            cmd = conn.recv()
+        except (EOFError, OSError):
+            return
+        if not isinstance(cmd, tuple) or not cmd:
+            continue
+        op = cmd[0]
+
+        if op == "ping":
+            conn.send(("pong", os.getpid()))
+        elif op == "stop":
+            return
+        elif op == "session":
+            _, name, t, mode = cmd
+            try:
+                if name not in cache:
+                    keys = load_private(name, keys_dir=keys_dir)
+                    s_table = build_table(keys.s, keys.n, max_bytes=precompute_bytes) if precompute_bytes > 0 else None
+                    pool = CommitmentPool(keys.n, commit_pool, max(1, commit_pool // 4)) if commit_pool > 0 else None
+                    cache[name] = (keys, s_table, pool)
+                keys, s_table, pool = cache[name]
+            except (OSError, KeyError, ValueError) as exc:
+                conn.send({"type": "error", "message": f"cannot load key: {exc}"})
+                continue
+
+            session = ProverSession(keys, name, t, mode=mode, s_table=s_table, commit_pool=pool)
+            conn.send(session.hello())
+            while not session.done:
+                for out in session.on_message(conn.recv()):
+                    conn.send(out)
+
+
+class _Worker:
+    def __init__(self, ctx, keys_dir: str, precompute_bytes: int, commit_pool: int):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, keys_dir, precompute_bytes, commit_pool),
+                                daemon=True)
+        self.proc.start()
+        child.close()
+        self.sessions = 0
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            self.conn.send(("ping",))
+            return self.conn.poll(timeout) and self.conn.recv()[0] == "pong"
+        except (EOFError, OSError):
+            return False
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop",))
+        except (EOFError, OSError):
+            pass
+        self.proc.join(0.5)
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join()
+        self.conn.close()
+
+
+class ProverPool:
+    """
+    'size' procese prover calde (cel mult MAX_POOL_SIZE).
+    authenticate() împrumută un worker liber, rulează un VerifierSession
+    contra lui și îl pune înapoi. Un worker care moare, nu răspunde în
+    round_timeout sau pică la health_check() este înlocuit cu unul nou;
+    authenticate() rulează health_check() cel mult o dată la health_interval
+    secunde (0 = niciodată) și nu dă mai departe un worker mort.
+    commit_pool > 0: fiecare worker ține un CommitmentPool per cheie încărcată.
+    """
+
+    def __init__(self, size: int, keys_dir: str = "keys", precompute_bytes: int = 0,
+                 round_timeout: float = 10.0, ping_timeout: float = 2.0, commit_pool: int = 0,
+                 health_interval: float = 30.0):
+        if not 1 <= size <= MAX_POOL_SIZE:
+            raise ValueError(f"size trebuie sa fie in [1, {MAX_POOL_SIZE}]")
+        self.size = size
+        self.keys_dir = keys_dir
+        self.precompute_bytes = precompute_bytes
+        self.commit_pool = commit_pool
+        self.round_timeout = round_timeout
+        self.ping_timeout = ping_timeout
+        self.health_interval = health_interval
+
+        self._ctx = mp.get_context()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._checked_at = monotonic()
+        self.stats = {"sessions": 0, "replaced": 0}
+
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.keys_dir, self.precompute_bytes, self.commit_pool)
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        if healthy and worker.proc.is_alive():
+            self._idle.put(worker)
+            return
+        worker.stop()
+        with self._lock:
+            self.stats["replaced"] += 1
+            if self._closed:
+                return
+        self._idle.put(self._spawn())
+
+    def _due_health_check(self) -> bool:
+        if self.health_interval <= 0:
+            return False
+        with self._lock:
+            if monotonic() - self._checked_at < self.health_interval:
+                return False
+            self._checked_at = monotonic()
+            return True
+
+    def _borrow(self, timeout: Optional[float]) -> _Worker:
+        if self._due_health_check():
+            self.health_check()
+        worker = self._idle.get(timeout=timeout)
+        while not worker.proc.is_alive():
+            self._release(worker, False)
+            worker = self._idle.get(timeout=timeout)
+        return worker
+
+    def authenticate(self, lookup: Callable[[str], Dict[str, Any]], name: str, t: int,
+                     mode: str = "sequential", verbose: bool = False,
+                     timeout: Optional[float] = None, transcript=None,
+                     protocols=protocols.NAMES) -> bool:
+        """
+        O autentificare completă; False și pentru erori ale worker-ului.
+        protocols: protocoalele acceptate de verifier (ca la VerifierSession).
+        """
+        worker = self._borrow(timeout)
+        healthy = False
+        try:
+            worker.conn.send(("session", name, t, mode))
+            session = VerifierSession(lookup, t, modes=(mode,), verbose=verbose, transcript=transcript,
+                                      protocols=protocols)
+            last = None
+            while not session.done:
+                if not worker.conn.poll(self.round_timeout):
+                    raise TimeoutError("prover worker timeout")
+                msg = worker.conn.recv()
+                last = msg.get("type")
+                for out in session.on_message(msg):
+                    worker.conn.send(out)
+            if session.error is None and last != "done":
+                # sesiunea verifier-ului s-a încheiat înaintea prover-ului (rundă respinsă):
+                # "done"-ul lui nu trebuie să ajungă la următoarea sesiune a worker-ului
+                if not worker.conn.poll(self.round_timeout) or worker.conn.recv().get("type") != "done":
+                    raise TimeoutError("prover worker out of sync")
+            healthy = True
+            worker.sessions += 1
+            return session.ok
+        except (EOFError, OSError, TimeoutError):
+            return False
+        finally:
+            with self._lock:
+                self.stats["sessions"] += 1
+            self._release(worker, healthy)
+
+    def health_check(self) -> int:
+        """Ping pe toți worker-ii liberi; înlocuiește ce nu răspunde. Returnează câți au fost înlocuiți."""
+        checked = []
+        while True:
+            try:
+                checked.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        bad = 0
+        for worker in checked:
+            ok = worker.proc.is_alive() and worker.ping(self.ping_timeout)
+            bad += not ok
+            self._release(worker, ok)
+        return bad
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    def __enter__(self) -> "ProverPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,263 @@
+# server.py
+# Verifier asyncio de lungă durată: servește mulți prover-i concurenți
+# peste TCP sau Unix socket, folosind VerifierSession / verifier_check.
+import argparse
+import asyncio
+import os
+import signal
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import bigint
+import metrics
+import protocols
+import tickets
+import tuning
+from precomp import build_table
+from storage import open_store
+from transcript import open_transcript
+from verifier import VerifierSession
+from wire import CODECS, JSON, MODES, encode, parse_address
+
+MAX_LINE = 16 * 1024 * 1024  # mesajele parallel pot fi mari (t * n)
+
+
+class VerifierServer:
+    """
+    Un VerifierSession per conexiune.
+      - max_sessions: sesiuni active simultan; conexiunile în plus așteaptă
+        un loc (backpressure) fără să fie citite
+      - max_pending: peste atâtea conexiuni în așteptare se răspunde "busy"
+      - round_timeout: termenul (secunde) pentru fiecare mesaj al prover-ului
+      - transcript: transcript.TranscriptWriter comun tuturor sesiunilor (opțional)
+      - tickets: tickets.TicketIssuer pentru re-autentificări fără runde (opțional)
+      - protocols: protocoalele acceptate (protocols.py)
+      - min_bits: pragul de soundness k*t acceptat, independent de protocol
+        (o singură rundă GQ cu k >= min_bits e suficientă)
+    """
+
+    def __init__(self, keys_dir: str = "keys", store: Optional[str] = None, min_bits: int = protocols.DEFAULT_MIN_BITS, modes=MODES, codecs=CODECS, max_sessions: int = 1000,
+                 max_pending: int = 10000, round_timeout: float = 10.0, precompute_bytes: int = 0,
+                 cache_size: int = 4096, verbose: bool = False, transcript=None, tickets=None,
+                 protocols=protocols.NAMES):
+        self.store = open_store(store, keys_dir)
+        self.protocols = tuple(protocols)
+        self.transcript = transcript
+        self.tickets = tickets
+        self.min_bits = min_bits
+        self.modes = tuple(modes)
+        self.codecs = tuple(codecs)
+        self.round_timeout = round_timeout
+        self.max_pending = max_pending
+        self.precompute_bytes = precompute_bytes
+        self.verbose = verbose
+
+        self._slots = asyncio.Semaphore(max_sessions)
+        self._pending = 0
+        self._tasks: set[asyncio.Task] = set()
+        # tabelele v depind doar de (n, v): o cheie înlocuită primește alt tabel
+        self._tables = lru_cache(maxsize=cache_size)(self._table)
+        # cheile publice se citesc din store la fiecare hello (fișier JSON, interogare
+        # indexată SQLite, LRU-ul propriu al shm/identitate): o re-cheiere sau o
+        # ștergere se vede imediat, fără repornirea serverului
+        self.lookup = self._load
+        self.stats = {"accepted": 0, "rejected": 0, "errors": 0, "busy": 0, "timeouts": 0}
+
+    def _table(self, n: int, v: tuple):
+        return build_table(list(v), n, max_bytes=self.precompute_bytes)
+
+    def _load(self, name: str) -> Dict[str, Any]:
+        pub = self.store.load_public(name)
+        if self.precompute_bytes > 0 and protocols.of_public(pub) == "ffs":
+            pub = dict(pub, v_table=self._tables(pub["n"], tuple(pub["v"])))
+        return pub
+
+    async def _write(self, writer: asyncio.StreamWriter, msg: Dict[str, Any], codec=None) -> None:
+        writer.write(encode(msg, codec))
+        await writer.drain()
+
+    async def _abort(self, writer: asyncio.StreamWriter, message: str, codec=None) -> None:
+        # ultimul mesaj al unei sesiuni eșuate; prover-ul poate fi deja deconectat
+        try:
+            await self._write(writer, {"type": "error", "message": message}, codec)
+        except ConnectionError:
+            pass
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._tasks.add(asyncio.current_task())
+        # fiecare sesiune intră într-un singur contor din stats
+        outcome = None
+        try:
+            if self._pending >= self.max_pending:
+                outcome = "busy"
+                await self._write(writer, {"type": "error", "message": "busy"})
+                return
+
+            self._pending += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self._pending -= 1
+
+            try:
+                outcome = await self._serve(reader, writer)
+            finally:
+                self._slots.release()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if outcome is None:
+                outcome = "errors"
+        except Exception as exc:
+            # o eroare neprevăzută închide doar sesiunea ei, dar tot se numără
+            if outcome is None:
+                outcome = "errors"
+            print(f"session error: {exc!r}", file=sys.stderr)
+        finally:
+            if outcome is not None:
+                self.stats[outcome] += 1
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> str:
+        """O sesiune; întoarce contorul din stats: accepted, rejected, errors sau timeouts."""
+        # pragul e în biți (min_bits), nu în runde: t=1 e doar minimul formal
+        session = VerifierSession(self.lookup, 1, modes=self.modes, codecs=self.codecs,
+                                  transcript=self.transcript, tickets=self.tickets, protocols=self.protocols,
+                                  min_bits=self.min_bits)
+
+        while not session.done:
+            codec = session.wire_codec or JSON
+            try:
+                msg = await asyncio.wait_for(codec.aread(reader), self.round_timeout)
+            except asyncio.TimeoutError:
+                await self._abort(writer, "timeout", session.wire_codec)
+                return "timeouts"
+            except EOFError:
+                return "errors"
+            except ValueError:
+                msg = {"type": "error", "message": "bad message"}
+            try:
+                replies = session.on_message(msg)
+            except (KeyError, TypeError, ValueError):
+                # cadru valid, dar mesaj fără câmpurile așteptate (ex. commit fără "x")
+                await self._abort(writer, "bad message", session.wire_codec)
+                return "errors"
+            for out in replies:
+                await self._write(writer, out, session.wire_codec)
+
+        if self.verbose:
+            print(f"{session.name}: mode={session.mode} codec={session.codec} t={session.t} accepted={session.ok}")
+        if session.error is not None:
+            return "errors"
+        return "accepted" if session.ok else "rejected"
+
+    async def shutdown(self, grace: float) -> None:
+        """Așteaptă sesiunile active cel mult 'grace' secunde, apoi le anulează."""
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+        _, still_running = await asyncio.wait(tasks, timeout=grace)
+        for task in still_running:
+            task.cancel()
+        await asyncio.gather(*still_running, return_exceptions=True)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    vs = VerifierServer(
+        keys_dir=args.keys_dir,
+        store=args.store,
+        min_bits=args.min_bits,
+        modes=args.modes,
+        codecs=args.codecs,
+        max_sessions=args.max_sessions,
+        max_pending=args.max_pending,
+        round_timeout=args.round_timeout,
+        precompute_bytes=int(args.precompute_mb * 2**20),
+        verbose=args.verbose,
+        transcript=open_transcript(args.transcript),
+        tickets=tickets.from_cli_args(args),
+        protocols=args.protocols,
+    )
+
+    kind, target = parse_address(args.listen)
+    if kind == "unix":
+        if os.path.exists(target):
+            os.unlink(target)
+        server = await asyncio.start_unix_server(vs.handle, path=target, limit=MAX_LINE)
+    else:
+        host, port = target
+        server = await asyncio.start_server(vs.handle, host=host, port=port, limit=MAX_LINE,
+                                            backlog=args.backlog)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    print(f"=== VERIFIER SERVER on {args.listen} (k*t>={args.min_bits}, modes={','.join(args.modes)}, "
+          f"protocols={','.join(args.protocols)}) ===", flush=True)
+    async with server:
+        await stop.wait()
+        # nu mai acceptăm conexiuni noi; sesiunile în curs se termină
+        server.close()
+        await vs.shutdown(args.grace)
+
+    if kind == "unix" and os.path.exists(target):
+        os.unlink(target)
+    vs.store.close()
+    if vs.transcript is not None:
+        vs.transcript.close()
+    print("Stats:", vs.stats)
+    if vs.tickets is not None:
+        print("Tickets:", vs.tickets.stats, f"| hit rate: {vs.tickets.hit_rate:.1%}")
+    if args.metrics_out:
+        print("Metrics:", metrics.export(args.metrics_out, args.metrics_format))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Verifier FFS multi-client (asyncio)")
+    ap.add_argument("--listen", default="tcp://127.0.0.1:7000", help="tcp://host:port sau unix:/cale")
+    ap.add_argument("--keys-dir", default="keys")
+    ap.add_argument("--store", default=None, help="baza SQLite cu cheile publice (default: JSON in --keys-dir)")
+    ap.add_argument("--min-bits", type=int, default=None,
+                    help="soundness minima acceptata, k*t biti, pentru orice protocol "
+                         f"(default: din --profile, altfel {protocols.DEFAULT_MIN_BITS})")
+    ap.add_argument("--profile", default=None, help="profil scris de 'main.py tune' (soundness_bits)")
+    ap.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    ap.add_argument("--codecs", nargs="+", choices=CODECS, default=list(CODECS),
+                    help="codec-uri acceptate dupa hello")
+    ap.add_argument("--protocols", nargs="+", choices=protocols.NAMES, default=list(protocols.NAMES),
+                    help="protocoale acceptate (ffs, gq)")
+    ap.add_argument("--max-sessions", type=int, default=1000, help="sesiuni active simultan")
+    ap.add_argument("--max-pending", type=int, default=10000, help="conexiuni care asteapta un loc")
+    ap.add_argument("--backlog", type=int, default=1024)
+    ap.add_argument("--round-timeout", type=float, default=10.0, help="termen per mesaj (secunde)")
+    ap.add_argument("--grace", type=float, default=5.0, help="asteptare la oprire (secunde)")
+    ap.add_argument("--precompute-mb", type=float, default=0,
+                    help="memorie per tabel de produse v (MiB, 0 = dezactivat)")
+    ap.add_argument("--transcript", default=None,
+                    help="adauga rundele verificate in acest jurnal (vezi audit.py)")
+    tickets.add_cli_args(ap)
+    ap.add_argument("--verbose", action="store_true")
+    metrics.add_cli_args(ap)
+    bigint.add_cli_args(ap)
+    args = ap.parse_args()
+    bigint.apply_cli_args(ap, args)
+    args.min_bits = tuning.profile_value(tuning.load_profile(args.profile), "soundness_bits", args.min_bits,
+                                         protocols.DEFAULT_MIN_BITS)
+    if args.metrics_out:
+        metrics.enable()
+
+    asyncio.run(serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,349 @@
+# shm_registry.py
+# Registru de chei publice în memorie partajată (multiprocessing.shared_memory)
+# pentru verifier-e cu mai multe procese: cheile se încarcă o singură dată,
+# iar fiecare worker citește direct din segment, fără copie, și construiește
+# int-urile doar la cerere (cu un LRU de chei decodate).
+#
+# Segmente:
+#   <prefix>        - control (16 octeți): MAGIC_CTL, generația curentă (u64)
+#   <prefix>_<gen>  - datele generației 'gen' (imutabile după publicare)
+#
+# Segmentul de date:
+#   antet   : MAGIC | generație u64 | număr chei u32 | sloturi u32
+#   index   : 'sloturi' intrări (hash u64, offset u64 + 1; 0 = liber), tabel
+#             hash cu adresare deschisă (sondare liniară), hash = blake2b-64(nume)
+#   chei    : nume_len u16 | lățime u16 | k u32 | nume | n | v_1..v_k
+#             fiecare întreg big-endian pe 'lățime' octeți (lățimea lui n)
+#
+# Hot reload: registry.reload() construiește generația următoare, o
+# publică în control și abia apoi șterge segmentul vechi (worker-ii care îl
+# au deja mapat îl pot citi în continuare). Worker-ii verifică generația la
+# fiecare lookup și se re-atașează când s-a schimbat.
+#
+#   python shm_registry.py serve --keys-dir keys --prefix ffs-keys --watch 2
+#   python server.py --store shm:ffs-keys
+#   python audit.py audit.log --store shm:ffs-keys --workers 8
+
+import argparse
+import hashlib
+import os
+import signal
+import struct
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from ffs import FFSKeys
+
+MAGIC_CTL = b"FFSSHMC1"
+MAGIC = b"FFSSHMD1"
+_CTL = struct.Struct("<8sQ")
+_HEAD = struct.Struct("<8sQII")
+_SLOT = struct.Struct("<QQ")
+_REC = struct.Struct("<HHI")
+
+DEFAULT_PREFIX = "ffs-keys"
+DEFAULT_CACHE = 1024
+
+
+def _hash(name: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(name, digest_size=8).digest(), "little")
+
+
+def _segment_name(prefix: str, generation: int) -> str:
+    return f"{prefix}_{generation}"
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Atașare fără ca procesul curent să devină proprietarul segmentului."""
+    shm = shared_memory.SharedMemory(name=name)
+    # Python < 3.13 înregistrează și segmentele atașate la resource_tracker,
+    # care le-ar șterge la ieșirea worker-ului; proprietarul e SharedKeyRegistry.
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except (AttributeError, KeyError):
+        pass
+    return shm
+
+
+def _layout(entries: Iterable[Tuple[str, int, int, list]]) -> Tuple[int, list, int]:
+    """(sloturi index, înregistrările codate, mărimea segmentului) pentru cheile date."""
+    records = []
+    for name, n, k, v in entries:
+        nb = name.encode("utf-8")
+        width = (n.bit_length() + 7) // 8
+        body = b"".join([_REC.pack(len(nb), width, k), nb, n.to_bytes(width, "big")]
+                        + [x.to_bytes(width, "big") for x in v])
+        records.append((nb, body))
+    slots = 8
+    while slots < 2 * len(records):
+        slots *= 2
+    size = _HEAD.size + slots * _SLOT.size + sum(len(body) for _, body in records)
+    return slots, records, size
+
+
+def build_segment(prefix: str, generation: int, entries: Iterable[Tuple[str, int, int, list]]
+                  ) -> shared_memory.SharedMemory:
+    """Creează segmentul de date pentru generația dată (nume, n, k, v)."""
+    slots, records, size = _layout(entries)
+    shm = shared_memory.SharedMemory(name=_segment_name(prefix, generation), create=True, size=max(size, 1))
+    buf = shm.buf
+    _HEAD.pack_into(buf, 0, MAGIC, generation, len(records), slots)
+    table = _HEAD.size
+    pos = table + slots * _SLOT.size
+    mask = slots - 1
+    for nb, body in records:
+        h = _hash(nb)
+        i = h & mask
+        while _SLOT.unpack_from(buf, table + i * _SLOT.size)[1] != 0:
+            i = (i + 1) & mask
+        _SLOT.pack_into(buf, table + i * _SLOT.size, h, pos + 1)
+        buf[pos:pos + len(body)] = body
+        pos += len(body)
+    return shm
+
+
+def iter_store(store) -> Iterator[Tuple[str, int, int, list]]:
+    """(nume, n, k, v) pentru toate cheile publice dintr-un store (storage.open_store)."""
+    for name in store.names():
+        try:
+            pub = store.load_public(name)
+        except (OSError, KeyError, ValueError):
+            continue
+        if "protocol" in pub:
+            continue  # înregistrările au k valori v: doar chei FFS
+        yield name, pub["n"], pub["k"], pub["v"]
+
+
+class SharedKeyRegistry:
+    """
+    Proprietarul registrului: încarcă toate cheile din 'store' într-un segment
+    și publică generația în segmentul de control <prefix>.
+    """
+
+    def __init__(self, store, prefix: str = DEFAULT_PREFIX):
+        self.store = store
+        self.prefix = prefix
+        self.generation = 0
+        self.count = 0
+        self._data: Optional[shared_memory.SharedMemory] = None
+        self._ctl = shared_memory.SharedMemory(name=prefix, create=True, size=_CTL.size)
+        _CTL.pack_into(self._ctl.buf, 0, MAGIC_CTL, 0)
+        self.reload()
+
+    def reload(self) -> int:
+        """Generația următoare din conținutul curent al store-ului; întoarce numărul de chei."""
+        generation = self.generation + 1
+        data = build_segment(self.prefix, generation, iter_store(self.store))
+        self.count = _HEAD.unpack_from(data.buf, 0)[2]
+        _CTL.pack_into(self._ctl.buf, 0, MAGIC_CTL, generation)
+        old, self._data, self.generation = self._data, data, generation
+        if old is not None:
+            old.close()
+            old.unlink()
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.size if self._data is not None else 0
+
+    def close(self) -> None:
+        for shm in (self._data, self._ctl):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._data = self._ctl = None
+
+    def __enter__(self) -> "SharedKeyRegistry":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SharedKeyView:
+    """
+    Vederea unui worker asupra registrului <prefix>; aceeași interfață ca
+    storage.JsonKeyStore / keydb.KeyDB pentru citire (load_public, names, close).
+    Întregii se construiesc din segment doar la lookup; ultimele 'cache_size'
+    chei decodate se păstrează într-un LRU, golit la schimbarea generației.
+    """
+
+    def __init__(self, prefix: str = DEFAULT_PREFIX, cache_size: int = DEFAULT_CACHE):
+        self.prefix = prefix
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ctl = _attach(prefix)
+        if _CTL.unpack_from(self._ctl.buf, 0)[0] != MAGIC_CTL:
+            self._ctl.close()
+            raise ValueError(f"{prefix} nu pare a fi un registru de chei FFS.")
+        self._data: Optional[shared_memory.SharedMemory] = None
+        self.generation = -1
+        self._refresh()
+
+    def _current_generation(self) -> int:
+        return _CTL.unpack_from(self._ctl.buf, 0)[1]
+
+    def _refresh(self) -> None:
+        while True:
+            generation = self._current_generation()
+            if generation == self.generation:
+                return
+            try:
+                data = _attach(_segment_name(self.prefix, generation))
+                break
+            except FileNotFoundError:
+                # generația citită tocmai a fost înlocuită și ștearsă; recitim controlul
+                continue
+        magic, _, count, slots = _HEAD.unpack_from(data.buf, 0)
+        if magic != MAGIC:
+            data.close()
+            raise ValueError(f"Segment invalid pentru generatia {generation}.")
+        if self._data is not None:
+            self._data.close()
+        self._data, self.generation = data, generation
+        self.count, self._slots = count, slots
+        self._cache.clear()
+
+    def _find(self, nb: bytes) -> int:
+        """Offset-ul înregistrării pentru numele dat, sau -1."""
+        buf = self._data.buf
+        h = _hash(nb)
+        mask = self._slots - 1
+        i = h & mask
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(buf, _HEAD.size + i * _SLOT.size)
+            if offset == 0:
+                return -1
+            offset -= 1
+            if slot_hash == h:
+                nlen = _REC.unpack_from(buf, offset)[0]
+                start = offset + _REC.size
+                if buf[start:start + nlen] == nb:
+                    return offset
+            i = (i + 1) & mask
+
+    def load_public(self, name: str) -> Dict[str, Any]:
+        self._refresh()
+        pub = self._cache.get(name)
+        if pub is not None:
+            self._cache.move_to_end(name)
+            return dict(pub)
+
+        offset = self._find(name.encode("utf-8"))
+        if offset < 0:
+            raise KeyError(name)
+        buf = self._data.buf
+        nlen, width, k = _REC.unpack_from(buf, offset)
+        pos = offset + _REC.size + nlen
+        n = int.from_bytes(buf[pos:pos + width], "big")
+        pos += width
+        v = [int.from_bytes(buf[pos + j * width:pos + (j + 1) * width], "big") for j in range(k)]
+        pub = {"n": n, "k": k, "v": v}
+
+        self._cache[name] = pub
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        # apelantul poate adăuga câmpuri (ex. v_table); cache-ul rămâne curat
+        return dict(pub)
+
+    def names(self) -> Iterator[str]:
+        self._refresh()
+        buf = self._data.buf
+        for i in range(self._slots):
+            offset = _SLOT.unpack_from(buf, _HEAD.size + i * _SLOT.size)[1]
+            if offset:
+                nlen = _REC.unpack_from(buf, offset - 1)[0]
+                start = offset - 1 + _REC.size
+                yield bytes(buf[start:start + nlen]).decode("utf-8")
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self.count
+
+    def save_public(self, keys: FFSKeys, name: str):
+        raise TypeError("Registrul shm e doar pentru citire; adaugati cheia in store si reincarcati.")
+
+    def close(self) -> None:
+        self._cache.clear()
+        for shm in (self._data, self._ctl):
+            if shm is not None:
+                shm.close()
+        self._data = self._ctl = None
+
+
+def _store_mtime(args: argparse.Namespace) -> float:
+    path = args.store if args.store else args.keys_dir
+    try:
+        if os.path.isdir(path):
+            return max([os.path.getmtime(path)] + [e.stat().st_mtime for e in os.scandir(path)])
+        # KeyDB e în modul WAL: scrierile altor procese ajung întâi în <db>-wal
+        return max(os.path.getmtime(p) for p in (path, path + "-wal") if os.path.exists(p))
+    except (OSError, ValueError):
+        return 0.0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from storage import open_store
+
+    store = open_store(args.store, args.keys_dir)
+    stop = []
+
+    def on_signal(signum, frame) -> None:
+        stop.append(signum)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, on_signal)
+
+    with SharedKeyRegistry(store, args.prefix) as registry:
+        print(f"=== SHM REGISTRY {args.prefix} ===", flush=True)
+        print(f"generation {registry.generation}: {registry.count} keys, {registry.nbytes / 2**20:.2f} MiB",
+              flush=True)
+        seen = _store_mtime(args)
+        while not stop:
+            time.sleep(args.watch if args.watch > 0 else 1.0)
+            if args.watch > 0 and _store_mtime(args) != seen:
+                seen = _store_mtime(args)
+                registry.reload()
+                print(f"generation {registry.generation}: {registry.count} keys, "
+                      f"{registry.nbytes / 2**20:.2f} MiB", flush=True)
+    store.close()
+    return 0
+
+
+def cmd_lookup(args: argparse.Namespace) -> int:
+    view = SharedKeyView(args.prefix)
+    try:
+        pub = view.load_public(args.name)
+    except KeyError:
+        print(f"{args.name}: nu exista in {args.prefix} (generation {view.generation})")
+        return 1
+    finally:
+        view.close()
+    print(f"{args.name}: n bitlen {pub['n'].bit_length()}, k {pub['k']}")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Registru de chei publice in memorie partajata")
+    ap.add_argument("--prefix", default=DEFAULT_PREFIX, help="numele segmentului de control")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_serve = sub.add_parser("serve", help="incarca cheile si tine registrul activ (Ctrl+C pentru oprire)")
+    p_serve.add_argument("--keys-dir", default="keys")
+    p_serve.add_argument("--store", default=None, help="baza SQLite cu cheile publice (default: JSON in --keys-dir)")
+    p_serve.add_argument("--watch", type=float, default=2.0,
+                         help="reincarca la modificarea store-ului, verificat la atatea secunde (0 = niciodata)")
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_lookup = sub.add_parser("lookup", help="cauta o cheie in registrul activ")
+    p_lookup.add_argument("--name", required=True)
+    p_lookup.set_defaults(func=cmd_lookup)
+
+    args = ap.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
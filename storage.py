@@ -1,9 +1,25 @@
 # storage.py
+import hashlib
 import json
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from ffs import FFSKeys
+from gq import GQKeys
+
+
+# Formatul fișierelor de chei:
+#   v1 - întregii ca string zecimal, JSON indentat (fără câmp "version")
+#   v2 - "version": 2, întregii ca hex big-endian, JSON compact;
+#        conversia hex <-> int e liniară (zecimal <-> int e pătratică în CPython)
+#   v3 - ca v2, dar n nu se mai repetă în fiecare fișier: "n_id" trimite la
+#        keys_dir/moduli/<n_id>.json (modul comun tuturor utilizatorilor, Protocol 10.26)
+# Cheile altor protocoale decât FFS (protocols.py) au câmpul "protocol" (ex. "gq").
+KEY_FORMAT_VERSION = 2
+KEY_FORMAT_VERSIONS = (1, 2, 3)
+MODULI_DIR = "moduli"
 
 
 def _to_str_int(x: int) -> str:
@@ -16,72 +32,256 @@ def _from_str_int(x: str) -> int:
     return int(x)
 
 
+def _to_hex_int(x: int) -> str:
+    return format(x, "x")
+
+
+def _from_hex_int(x: str) -> int:
+    return int(x, 16)
+
+
+def _int_codec(version: int):
+    """(encode, decode) pentru întregii mari din formatul 'version'."""
+    if version == 1:
+        return _to_str_int, _from_str_int
+    if version in (2, 3):
+        return _to_hex_int, _from_hex_int
+    raise ValueError(f"Versiune necunoscuta a formatului de chei: {version}")
+
+
+def _dump(d: Dict[str, Any], version: int) -> str:
+    if version == 1:
+        return json.dumps(d, indent=2)
+    return json.dumps(d, separators=(",", ":"))
+
+
+def check_name(name: Any) -> str:
+    """
+    Numele unui utilizator așa cum vine de la un prover (hello): devine parte
+    din calea fișierului de chei, deci nu poate fi gol și nu poate conține
+    separatori de cale sau '..'.
+    """
+    if not isinstance(name, str) or not name or "/" in name or "\\" in name or ".." in name or "\0" in name:
+        raise ValueError(f"Nume de utilizator invalid: {name!r}")
+    return name
+
+
 def ensure_keys_dir(keys_dir: str = "keys") -> Path:
     p = Path(keys_dir)
     p.mkdir(parents=True, exist_ok=True)
     return p
 
 
-def save_public(keys: FFSKeys, name: str, keys_dir: str = "keys") -> Path:
+def modulus_id(n: int) -> str:
+    """ID-ul modulului: primii 64 de biți din SHA-256(n) (hex)."""
+    return hashlib.sha256(n.to_bytes((n.bit_length() + 7) // 8, "big")).hexdigest()[:16]
+
+
+# (keys_dir, id) deja scrise de acest proces: un singur stat/mkdir per modul
+_saved_moduli = set()
+
+
+def save_modulus(n: int, keys_dir: str = "keys") -> str:
+    """Scrie keys_dir/moduli/<id>.json dacă lipsește; întoarce ID-ul."""
+    n_id = modulus_id(n)
+    if (keys_dir, n_id) in _saved_moduli:
+        return n_id
+    path = ensure_keys_dir(str(Path(keys_dir) / MODULI_DIR)) / f"{n_id}.json"
+    if not path.exists():
+        # fișier temporar + rename: cititorii nu văd niciodată un modul scris pe jumătate
+        tmp = path.with_name(f".{n_id}.{os.getpid()}.tmp")
+        tmp.write_text(_dump({"type": "ffs_modulus", "version": 3, "n": _to_hex_int(n)}, 3), encoding="utf-8")
+        os.replace(tmp, path)
+    _saved_moduli.add((keys_dir, n_id))
+    return n_id
+
+
+@lru_cache(maxsize=64)
+def _load_modulus(moduli_dir: str, n_id: str) -> int:
+    # modulele sunt imuabile (ID = hash(n)), deci cache-ul nu se invalidează niciodată
+    d = json.loads((Path(moduli_dir) / f"{n_id}.json").read_text(encoding="utf-8"))
+    n = _from_hex_int(d["n"])
+    if d.get("type") != "ffs_modulus" or modulus_id(n) != n_id:
+        raise ValueError(f"Modulul {n_id} lipseste sau e corupt.")
+    return n
+
+
+def load_modulus(n_id: str, keys_dir: str = "keys") -> int:
+    return _load_modulus(str(Path(keys_dir) / MODULI_DIR), n_id)
+
+
+def _put_n(d: Dict[str, Any], n: int, keys_dir: str, version: int) -> None:
+    if version >= 3:
+        d["n_id"] = save_modulus(n, keys_dir)
+    else:
+        d["n"] = _int_codec(version)[0](n)
+
+
+def _get_n(d: Dict[str, Any], dec, keys_dir: str) -> int:
+    if "n_id" in d:
+        return load_modulus(d["n_id"], keys_dir)
+    return dec(d["n"])
+
+
+def _put_protocol(d: Dict[str, Any], keys) -> None:
+    if keys.protocol != "ffs":
+        d["protocol"] = keys.protocol
+
+
+def save_public(keys: FFSKeys, name: str, keys_dir: str = "keys", version: int = KEY_FORMAT_VERSION) -> Path:
     """
     Salvează cheia publică: n, k, v[]
     """
-    d: Dict[str, Any] = {
-        "type": "ffs_public",
-        "n": _to_str_int(keys.n),
+    enc, _ = _int_codec(version)
+    d: Dict[str, Any] = {"type": "ffs_public"}
+    if version > 1:
+        d["version"] = version
+    _put_n(d, keys.n, keys_dir, version)
+    _put_protocol(d, keys)
+    d.update({
         "k": keys.k,
-        "v": [_to_str_int(x) for x in keys.v],
-    }
+        "v": [enc(x) for x in keys.v],
+    })
     out_dir = ensure_keys_dir(keys_dir)
     path = out_dir / f"{name}_public.json"
-    path.write_text(json.dumps(d, indent=2), encoding="utf-8")
+    path.write_text(_dump(d, version), encoding="utf-8")
     return path
 
 
-def save_private(keys: FFSKeys, name: str, keys_dir: str = "keys") -> Path:
+def save_private(keys: FFSKeys, name: str, keys_dir: str = "keys", version: int = KEY_FORMAT_VERSION) -> Path:
     """
     Salvează cheia privată: n, k, s[], v[]
     (În practică ai păstra s și poate n,k; păstrăm și v ca să fie simplu.)
     """
-    d: Dict[str, Any] = {
-        "type": "ffs_private",
-        "n": _to_str_int(keys.n),
+    enc, _ = _int_codec(version)
+    d: Dict[str, Any] = {"type": "ffs_private"}
+    if version > 1:
+        d["version"] = version
+    _put_n(d, keys.n, keys_dir, version)
+    _put_protocol(d, keys)
+    d.update({
         "k": keys.k,
-        "s": [_to_str_int(x) for x in keys.s],
-        "v": [_to_str_int(x) for x in keys.v],
-    }
+        "s": [enc(x) for x in keys.s],
+        "v": [enc(x) for x in keys.v],
+    })
     out_dir = ensure_keys_dir(keys_dir)
     path = out_dir / f"{name}_private.json"
-    path.write_text(json.dumps(d, indent=2), encoding="utf-8")
+    path.write_text(_dump(d, version), encoding="utf-8")
     return path
 
 
+def _read(path: Path, expected_type: str):
+    d = json.loads(path.read_text(encoding="utf-8"))
+    if d.get("type") != expected_type:
+        return d, None
+    _, dec = _int_codec(int(d.get("version", 1)))
+    return d, dec
+
+
 def load_public(name: str, keys_dir: str = "keys") -> Dict[str, Any]:
     """
-    Încarcă cheia publică și o returnează ca dict:
-      { n:int, k:int, v:list[int] }
+    Încarcă cheia publică (format v1, v2 sau v3) și o returnează ca dict:
+      { n:int, k:int, v:list[int] [, protocol:str (doar dacă nu e FFS)] }
     """
     path = Path(keys_dir) / f"{name}_public.json"
-    d = json.loads(path.read_text(encoding="utf-8"))
-    if d.get("type") != "ffs_public":
+    d, dec = _read(path, "ffs_public")
+    if dec is None:
         raise ValueError("Fisierul nu pare a fi o cheie publica FFS.")
-    return {
-        "n": _from_str_int(d["n"]),
+    pub = {
+        "n": _get_n(d, dec, keys_dir),
         "k": int(d["k"]),
-        "v": [_from_str_int(x) for x in d["v"]],
+        "v": [dec(x) for x in d["v"]],
     }
+    if "protocol" in d:
+        pub["protocol"] = d["protocol"]
+    return pub
 
 
 def load_private(name: str, keys_dir: str = "keys") -> FFSKeys:
     """
-    Încarcă cheia privată ca FFSKeys (include și publicele v).
+    Încarcă cheia privată (format v1, v2 sau v3) ca FFSKeys / GQKeys (include și publicele v).
     """
     path = Path(keys_dir) / f"{name}_private.json"
-    d = json.loads(path.read_text(encoding="utf-8"))
-    if d.get("type") != "ffs_private":
+    d, dec = _read(path, "ffs_private")
+    if dec is None:
         raise ValueError("Fisierul nu pare a fi o cheie privata FFS.")
-    n = _from_str_int(d["n"])
+    n = _get_n(d, dec, keys_dir)
     k = int(d["k"])
-    s = [_from_str_int(x) for x in d["s"]]
-    v = [_from_str_int(x) for x in d["v"]]
+    s = [dec(x) for x in d["s"]]
+    v = [dec(x) for x in d["v"]]
+    if d.get("protocol", "ffs") == "gq":
+        return GQKeys(n=n, k=k, s=s, v=v)
     return FFSKeys(n=n, k=k, s=s, v=v)
+
+
+def key_format_version(path: Path) -> int:
+    d = json.loads(Path(path).read_text(encoding="utf-8"))
+    return int(d.get("version", 1))
+
+
+def migrate_keys(keys_dir: str = "keys", version: int = KEY_FORMAT_VERSION) -> Dict[str, int]:
+    """
+    Rescrie toate cheile din keys_dir în formatul 'version'.
+    Returnează {"migrated": .., "skipped": ..} (skipped = deja în formatul cerut).
+    """
+    _int_codec(version)
+    counts = {"migrated": 0, "skipped": 0}
+    for path in sorted(Path(keys_dir).glob("*.json")):
+        for suffix, load, save in (("_public.json", load_public, save_public),
+                                   ("_private.json", load_private, save_private)):
+            if not path.name.endswith(suffix):
+                continue
+            if key_format_version(path) == version:
+                counts["skipped"] += 1
+                continue
+            name = path.name[:-len(suffix)]
+            keys = load(name, keys_dir=keys_dir)
+            if isinstance(keys, dict):
+                cls = GQKeys if keys.get("protocol") == "gq" else FFSKeys
+                keys = cls(n=keys["n"], k=keys["k"], s=[], v=keys["v"])
+            save(keys, name, keys_dir=keys_dir, version=version)
+            counts["migrated"] += 1
+    return counts
+
+
+class JsonKeyStore:
+    """
+    Cheile publice ca fișiere JSON în keys_dir (un fișier per utilizator).
+    version = formatul în care scrie save_public (3: modulul o singură dată, după ID).
+    """
+
+    def __init__(self, keys_dir: str = "keys", version: int = KEY_FORMAT_VERSION):
+        self.keys_dir = keys_dir
+        self.version = version
+
+    def load_public(self, name: str) -> Dict[str, Any]:
+        return load_public(name, keys_dir=self.keys_dir)
+
+    def save_public(self, keys: FFSKeys, name: str) -> Path:
+        return save_public(keys, name, keys_dir=self.keys_dir, version=self.version)
+
+    def names(self):
+        for path in sorted(Path(self.keys_dir).glob("*_public.json")):
+            yield path.name[:-len("_public.json")]
+
+    def close(self) -> None:
+        pass
+
+
+def open_store(store: Optional[str] = None, keys_dir: str = "keys"):
+    """
+    Backend-ul pentru cheile publice: fișierul SQLite 'store' (keydb.KeyDB)
+    dacă e dat, registrul din memoria partajată pentru 'shm:<prefix>'
+    (shm_registry.SharedKeyView, doar citire), cheile derivate din nume pentru
+    'id:<center.params.json>' (identity.IdentityStore), altfel fișierele JSON din keys_dir.
+    """
+    if store and store.startswith("shm:"):
+        from shm_registry import SharedKeyView
+        return SharedKeyView(store[len("shm:"):])
+    if store and store.startswith("id:"):
+        from identity import IdentityStore
+        return IdentityStore(store[len("id:"):])
+    if store:
+        from keydb import KeyDB
+        return KeyDB(store)
+    return JsonKeyStore(keys_dir)
@@ -0,0 +1,204 @@
+# tickets.py
+# Tichete de re-autentificare: după o sesiune FFS acceptată, verifier-ul poate
+# emite un tichet HMAC-SHA256 cu durată limitată, legat de nume și de
+# amprenta cheii publice. Un prover care revine îl prezintă în hello și
+# sare peste cele t runde cât timp tichetul e valid.
+#
+# Tichet: base64url(payload JSON) "." base64url(HMAC-SHA256(cheie, payload))
+#   payload = {"v": 1, "id": ..., "name": ..., "fp": amprenta, "iat": ..., "exp": ...}
+#
+# Cheia HMAC: fișierul --ticket-key (hex; creat dacă lipsește) ca mai multe
+# procese verifier să accepte aceleași tichete; altfel aleatoare per proces.
+# Revocarea (un tichet sau toate tichetele unui nume emise până acum) se
+# ține într-un cache mărginit; intrările expirate se elimină primele.
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import metrics
+
+TICKET_VERSION = 1
+DEFAULT_TTL = 300.0
+DEFAULT_REVOCATIONS = 10000
+
+
+def fingerprint(pub: Dict[str, Any]) -> str:
+    """Amprenta cheii publice {n, k, v}: SHA-256 peste n, k, v (hex, 128 biți)."""
+    h = hashlib.sha256()
+    h.update(format(pub["n"], "x").encode("ascii"))
+    h.update(b"|%d|" % pub["k"])
+    for x in pub["v"]:
+        h.update(format(x, "x").encode("ascii") + b",")
+    return h.hexdigest()[:32]
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def load_key(path: Optional[str]) -> bytes:
+    """Cheia HMAC din fișierul 'path' (hex); o creează dacă lipsește. None => aleatoare."""
+    if not path:
+        return secrets.token_bytes(32)
+    p = Path(path)
+    if p.exists():
+        return bytes.fromhex(p.read_text(encoding="utf-8").strip())
+    key = secrets.token_bytes(32)
+    fd = os.open(str(p), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(key.hex())
+    return key
+
+
+class TicketIssuer:
+    """
+    Emite și verifică tichete. stats: issued / presented / accepted /
+    rejected / rounds_saved (și ffs_verifier_tickets_total /
+    ffs_verifier_rounds_saved_total în metrics, dacă sunt activate).
+    """
+
+    def __init__(self, key: bytes, ttl: float = DEFAULT_TTL, revocations: int = DEFAULT_REVOCATIONS):
+        self.key = key
+        self.ttl = ttl
+        self.max_revocations = revocations
+        # id tichet / "name:<nume>" -> (momentul revocării, expirare)
+        self._revoked: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.stats = {"issued": 0, "presented": 0, "accepted": 0, "rejected": 0, "rounds_saved": 0}
+
+    def _mac(self, payload: bytes) -> bytes:
+        return hmac.new(self.key, payload, hashlib.sha256).digest()
+
+    def issue(self, name: str, pub: Dict[str, Any]) -> Tuple[str, float]:
+        """Tichet nou pentru (name, cheia pub); întoarce (tichet, expirare)."""
+        now = time.time()
+        exp = now + self.ttl
+        payload = json.dumps({"v": TICKET_VERSION, "id": secrets.token_hex(8), "name": name,
+                              "fp": fingerprint(pub), "iat": now, "exp": exp},
+                             separators=(",", ":")).encode("utf-8")
+        self.stats["issued"] += 1
+        if metrics.ENABLED:
+            metrics.inc("ffs_verifier_tickets_total", labels={"result": "issued"})
+        return _b64(payload) + "." + _b64(self._mac(payload)), exp
+
+    def _decode(self, ticket: str) -> Optional[Dict[str, Any]]:
+        try:
+            payload_b64, mac_b64 = ticket.split(".")
+            payload = _unb64(payload_b64)
+            if not hmac.compare_digest(self._mac(payload), _unb64(mac_b64)):
+                return None
+            claims = json.loads(payload)
+        except (AttributeError, ValueError, TypeError):
+            return None
+        return claims if isinstance(claims, dict) and claims.get("v") == TICKET_VERSION else None
+
+    def _check(self, ticket: Any, name: str, pub: Dict[str, Any]) -> str:
+        claims = self._decode(ticket) if isinstance(ticket, str) else None
+        if claims is None:
+            return "invalid"
+        if claims.get("name") != name or claims.get("fp") != fingerprint(pub):
+            return "mismatch"
+        if time.time() >= claims.get("exp", 0):
+            return "expired"
+        if claims.get("id") in self._revoked:
+            return "revoked"
+        revoked_name = self._revoked.get("name:" + name)
+        if revoked_name is not None and claims.get("iat", 0) <= revoked_name[0]:
+            return "revoked"
+        return "ok"
+
+    def verify(self, ticket: Any, name: str, pub: Dict[str, Any], rounds: int = 0) -> Tuple[bool, str]:
+        """
+        (True, "ok") dacă tichetul e valid pentru (name, pub); altfel (False, motiv):
+        invalid / mismatch / expired / revoked. rounds = rundele economisite la succes.
+        """
+        reason = self._check(ticket, name, pub)
+        ok = reason == "ok"
+        self.stats["presented"] += 1
+        self.stats["accepted" if ok else "rejected"] += 1
+        if ok:
+            self.stats["rounds_saved"] += rounds
+        if metrics.ENABLED:
+            metrics.inc("ffs_verifier_tickets_total", labels={"result": "accepted" if ok else reason})
+            if ok:
+                metrics.inc("ffs_verifier_rounds_saved_total", rounds)
+        return ok, reason
+
+    def _remember(self, key: str, exp: float) -> None:
+        now = time.time()
+        self._revoked[key] = (now, exp)
+        self._revoked.move_to_end(key)
+        if len(self._revoked) > self.max_revocations:
+            # întâi revocările care nu mai contează (tichetele ar fi expirat oricum)
+            for k in [k for k, (_, e) in self._revoked.items() if e <= now]:
+                del self._revoked[k]
+            while len(self._revoked) > self.max_revocations:
+                self._revoked.popitem(last=False)
+
+    def revoke(self, ticket: str) -> bool:
+        """Revocă un tichet emis de acest issuer; False dacă tichetul nu e valid."""
+        claims = self._decode(ticket)
+        if claims is None:
+            return False
+        self._remember(str(claims.get("id")), claims.get("exp", 0))
+        return True
+
+    def revoke_name(self, name: str) -> None:
+        """Revocă toate tichetele pentru 'name' emise până acum."""
+        self._remember("name:" + name, time.time() + self.ttl)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.stats["accepted"] / self.stats["presented"] if self.stats["presented"] else 0.0
+
+
+def load_ticket(path: Optional[str]) -> Optional[str]:
+    """Tichetul salvat de prover în 'path', dacă există și nu a expirat."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        d = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(d, dict) or time.time() >= d.get("expires", 0):
+        return None
+    return d.get("ticket")
+
+
+def save_ticket(path: str, ticket: Optional[str], expires: Optional[float]) -> None:
+    """Salvează tichetul primit (sau șterge fișierul dacă nu mai e niciun tichet)."""
+    if ticket is None:
+        if os.path.exists(path):
+            os.unlink(path)
+        return
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"ticket": ticket, "expires": expires or 0}, f)
+
+
+def add_cli_args(ap) -> None:
+    """Opțiunile pentru tichete ale unui verifier (verifier.py, server.py)."""
+    ap.add_argument("--tickets", action="store_true",
+                    help="emite tichete de re-autentificare dupa sesiunile acceptate")
+    ap.add_argument("--ticket-ttl", type=float, default=DEFAULT_TTL,
+                    help=f"durata de viata a unui tichet in secunde (default: {DEFAULT_TTL:.0f})")
+    ap.add_argument("--ticket-key", default=None,
+                    help="fisier cu cheia HMAC (hex, creat daca lipseste; default: aleatoare per proces)")
+    ap.add_argument("--revocations", type=int, default=DEFAULT_REVOCATIONS,
+                    help="dimensiunea maxima a cache-ului de revocari")
+
+
+def from_cli_args(args) -> Optional[TicketIssuer]:
+    if not args.tickets:
+        return None
+    return TicketIssuer(load_key(args.ticket_key), args.ticket_ttl, args.revocations)
@@ -0,0 +1,160 @@
+# transcript.py
+# Jurnal append-only cu rundele verificate de verifier: (nume, runda, x, e, y, ok).
+#
+# Format (binar, compact, citibil în flux):
+#   antet fișier : MAGIC (8 octeți)
+#   înregistrare : >I lungime | >H len(nume) nume | >I runda | >B ok | >H k
+#                  | bitmap e (ceil(k/8) octeți, bitul j = e_j) | >H len(x) x | >H len(y) y
+# x și y sunt big-endian fără semn. Fiecare înregistrare are prefixul de
+# lungime, deci cititorul poate sări peste ele fără să le decodeze.
+
+import os
+import struct
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+MAGIC = b"FFSTRN1\n"
+_LEN = struct.Struct(">I")
+_HEAD = struct.Struct(">IBH")  # runda, ok, k
+_H = struct.Struct(">H")
+
+# (nume, runda, x, e, y, ok)
+Record = Tuple[str, int, int, List[int], int, bool]
+
+
+def _int_bytes(x: int) -> bytes:
+    return x.to_bytes((x.bit_length() + 7) // 8, "big")
+
+
+def encode_record(name: str, round_no: int, x: int, e: List[int], y: int, ok: bool) -> bytes:
+    k = len(e)
+    bitmap = 0
+    for j, bit in enumerate(e):
+        if bit:
+            bitmap |= 1 << j
+    nb = name.encode("utf-8")
+    xb, yb = _int_bytes(x), _int_bytes(y)
+    payload = b"".join((
+        _H.pack(len(nb)), nb,
+        _HEAD.pack(round_no, 1 if ok else 0, k),
+        bitmap.to_bytes((k + 7) // 8, "little"),
+        _H.pack(len(xb)), xb,
+        _H.pack(len(yb)), yb,
+    ))
+    return _LEN.pack(len(payload)) + payload
+
+
+def decode_record(payload: bytes) -> Record:
+    pos = 0
+    (nlen,) = _H.unpack_from(payload, pos)
+    pos += 2
+    name = payload[pos:pos + nlen].decode("utf-8")
+    pos += nlen
+    round_no, ok, k = _HEAD.unpack_from(payload, pos)
+    pos += _HEAD.size
+    ebytes = (k + 7) // 8
+    bitmap = int.from_bytes(payload[pos:pos + ebytes], "little")
+    pos += ebytes
+    e = [(bitmap >> j) & 1 for j in range(k)]
+    (xlen,) = _H.unpack_from(payload, pos)
+    pos += 2
+    x = int.from_bytes(payload[pos:pos + xlen], "big")
+    pos += xlen
+    (ylen,) = _H.unpack_from(payload, pos)
+    pos += 2
+    y = int.from_bytes(payload[pos:pos + ylen], "big")
+    return name, round_no, x, e, y, bool(ok)
+
+
+class TranscriptWriter:
+    """
+    Scriitor append-only. Înregistrările se adună într-un buffer și se scriu
+    cu un singur write() (O_APPEND) la flush_bytes octeți și la close(), deci
+    mai multe procese pot scrie în același fișier fără să se întrepătrundă.
+    """
+
+    def __init__(self, path: str, flush_bytes: int = 1 << 16):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.records = 0
+        self._buf = bytearray()
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, MAGIC)
+
+    def record(self, name: str, round_no: int, x: int, e: List[int], y: int, ok: bool) -> None:
+        self._buf += encode_record(name, round_no, x, e, y, ok)
+        self.records += 1
+        if len(self._buf) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buf:
+            os.write(self._fd, bytes(self._buf))
+            self._buf.clear()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "TranscriptWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_transcript(path: Optional[str]) -> Optional[TranscriptWriter]:
+    """TranscriptWriter pentru 'path', sau None dacă jurnalul e dezactivat."""
+    return TranscriptWriter(path) if path else None
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise EOFError("Inregistrare trunchiata in transcript")
+    return data
+
+
+def iter_payloads(f: BinaryIO) -> Iterator[bytes]:
+    """Payload-urile (nedecodate) din flux, una câte una; verifică antetul."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Fisierul nu pare a fi un transcript FFS.")
+    while True:
+        head = f.read(_LEN.size)
+        if not head:
+            return
+        if len(head) != _LEN.size:
+            raise EOFError("Inregistrare trunchiata in transcript")
+        (size,) = _LEN.unpack(head)
+        yield _read_exact(f, size)
+
+
+def iter_chunks(path: str, records: int = 4096) -> Iterator[List[bytes]]:
+    """
+    Transcriptul în bucăți de câte 'records' payload-uri nedecodate; memoria
+    folosită e proporțională cu o bucată, nu cu fișierul. La o înregistrare
+    trunchiată, cele citite înainte se livrează și apoi se ridică EOFError.
+    """
+    with open(path, "rb", buffering=1 << 20) as f:
+        chunk: List[bytes] = []
+        try:
+            for payload in iter_payloads(f):
+                chunk.append(payload)
+                if len(chunk) >= records:
+                    yield chunk
+                    chunk = []
+        except EOFError:
+            if chunk:
+                yield chunk
+            raise
+        if chunk:
+            yield chunk
+
+
+def iter_records(path: str) -> Iterator[Record]:
+    """Înregistrările decodate, în ordinea din fișier."""
+    with open(path, "rb", buffering=1 << 20) as f:
+        for payload in iter_payloads(f):
+            yield decode_record(payload)
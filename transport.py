@@ -0,0 +1,160 @@
+# transport.py
+# Transportul mesajelor protocolului, separat de logica sesiunilor
+# (ProverSession / VerifierSession) și de codec-uri (wire.py).
+#
+# Orice transport are aceeași interfață:
+#   send(msg, codec=None)  - trimite un mesaj (dict)
+#   recv(codec=None)       - următorul mesaj; EOFError când capătul celălalt a închis
+#   close()
+#
+# Implementări:
+#   StreamTransport - fluxuri binare: stdin/stdout (stdio()), pipe-urile unui
+#                     subproces (popen()), pipe-uri os.pipe() (pipe_pair())
+#   SocketTransport - Unix domain socket sau TCP (connect(), socket_pair())
+#   QueueTransport  - cozi în același proces (queue_pair()); dict-urile trec
+#                     ca atare, fără serializare, iar codec-ul e ignorat
+import os
+import queue
+import socket
+import subprocess
+import sys
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from wire import JSON, encode, parse_address
+
+TRANSPORTS = ("stdio", "unix", "tcp", "queue")
+
+
+class StreamTransport:
+    """Mesaje codate (wire.encode / codec.read) peste două fluxuri binare."""
+
+    def __init__(self, inp: BinaryIO, out: BinaryIO, name: str = "stream"):
+        self.inp = inp
+        self.out = out
+        self.name = name
+
+    def send(self, msg: Dict[str, Any], codec=None) -> None:
+        self.out.write(encode(msg, codec))
+        self.out.flush()
+
+    def recv(self, codec=None) -> Dict[str, Any]:
+        return (codec or JSON).read(self.inp)
+
+    def close(self) -> None:
+        for f in (self.out, self.inp):
+            try:
+                f.close()
+            except (OSError, ValueError):
+                pass
+
+
+class SocketTransport(StreamTransport):
+    """StreamTransport peste un socket conectat (Unix sau TCP)."""
+
+    def __init__(self, sock: socket.socket, name: str = "socket"):
+        self.sock = sock
+        super().__init__(sock.makefile("rb"), sock.makefile("wb"), name)
+
+    def close(self) -> None:
+        super().close()
+        self.sock.close()
+
+
+class QueueTransport:
+    """
+    Un capăt al unei perechi de cozi (queue_pair()). Mesajele nu se
+    serializează: destinatarul primește exact obiectul trimis, deci niciun
+    capăt nu trebuie să modifice un mesaj după ce l-a trimis / primit.
+    """
+
+    name = "queue"
+    _CLOSED = None
+
+    def __init__(self, inbox: "queue.Queue", outbox: "queue.Queue", timeout: Optional[float] = None):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.timeout = timeout
+
+    def send(self, msg: Dict[str, Any], codec=None) -> None:
+        self.outbox.put(msg)
+
+    def recv(self, codec=None) -> Dict[str, Any]:
+        try:
+            msg = self.inbox.get(timeout=self.timeout)
+        except queue.Empty:
+            raise EOFError("No message (timeout).") from None
+        if msg is self._CLOSED:
+            # lăsăm marcajul în coadă pentru apelurile următoare
+            self.inbox.put(msg)
+            raise EOFError("No more input (EOF).")
+        return msg
+
+    def close(self) -> None:
+        self.outbox.put(self._CLOSED)
+
+
+def stdio() -> StreamTransport:
+    return StreamTransport(sys.stdin.buffer, sys.stdout.buffer, "stdio")
+
+
+def popen(proc: subprocess.Popen) -> StreamTransport:
+    """Capătul părintelui pentru un subproces cu stdin/stdout pe pipe-uri."""
+    return StreamTransport(proc.stdout, proc.stdin, "stdio")
+
+
+def connect(address: str) -> SocketTransport:
+    """Conectare la 'unix:/cale' sau 'tcp://host:port'."""
+    kind, target = parse_address(address)
+    family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+    if kind == "tcp" and ":" in target[0]:
+        family = socket.AF_INET6
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.connect(target)
+    except OSError:
+        sock.close()
+        raise
+    if kind == "tcp":
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return SocketTransport(sock, kind)
+
+
+def queue_pair(timeout: Optional[float] = None) -> Tuple[QueueTransport, QueueTransport]:
+    a, b = queue.Queue(), queue.Queue()
+    return QueueTransport(a, b, timeout), QueueTransport(b, a, timeout)
+
+
+def pipe_pair() -> Tuple[StreamTransport, StreamTransport]:
+    """Două capete legate prin os.pipe() (același mecanism ca stdio la un subproces)."""
+    r1, w1 = os.pipe()
+    r2, w2 = os.pipe()
+    a = StreamTransport(os.fdopen(r1, "rb"), os.fdopen(w2, "wb"), "stdio")
+    b = StreamTransport(os.fdopen(r2, "rb"), os.fdopen(w1, "wb"), "stdio")
+    return a, b
+
+
+def socket_pair(kind: str = "unix") -> Tuple[SocketTransport, SocketTransport]:
+    """Două capete conectate local: socketpair() pentru unix, loopback pentru tcp."""
+    if kind == "unix":
+        s1, s2 = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        return SocketTransport(s1, "unix"), SocketTransport(s2, "unix")
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        s1 = socket.create_connection(listener.getsockname())
+        s2, _ = listener.accept()
+    for s in (s1, s2):
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return SocketTransport(s1, "tcp"), SocketTransport(s2, "tcp")
+
+
+def local_pair(kind: str):
+    """Pereche de capete în același proces pentru oricare din TRANSPORTS."""
+    if kind == "queue":
+        return queue_pair()
+    if kind == "stdio":
+        return pipe_pair()
+    if kind in ("unix", "tcp"):
+        return socket_pair(kind)
+    raise ValueError(f"transport trebuie sa fie unul din {TRANSPORTS}")
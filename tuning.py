@@ -0,0 +1,196 @@
+# tuning.py
+# Autotuner pentru (k, t): probabilitatea de trișare într-o autentificare
+# este 2^-(k*t), deci ținta de "soundness" S biți cere k*t >= S. Perechile
+# care ating ținta diferă mult ca număr de runde, octeți pe fir și CPU;
+# tuner-ul le măsoară pe mașina curentă, peste transportul dat, și alege
+# perechea cu latența minimă sau rata CPU maximă (cpu_rate).
+#
+# cpu_rate = 1 / CPU-ul mediu al unei sesiuni în proces (prover + verifier),
+# adică o limită superioară per core, nu throughput-ul măsurat al unui server;
+# pentru acela: loadgen.py contra server.py.
+#
+# Profilul rezultat (JSON) e citit de "main.py keygen --profile" (k și
+# protocolul) și de verifier.py / server.py --profile (t și modul rundelor).
+# Cu mai multe protocoale (protocols.py), candidații se măsoară pentru fiecare.
+import io
+import json
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import protocols
+import transport
+from ffs import authenticate
+from wire import JSON, encode
+
+PROFILE_TYPE = "ffs_profile"
+PROFILE_VERSION = 1
+OBJECTIVES = ("latency", "cpu_rate")
+
+
+def candidates(soundness_bits: int, k_max: int = 64, t_max: int = 64) -> List[tuple]:
+    """
+    Perechile (k, t) Pareto-minimale cu k*t >= soundness_bits: pentru fiecare t,
+    cel mai mic k = ceil(S / t). (Un k mai mare la același t doar costă în plus.)
+    """
+    if soundness_bits <= 0:
+        raise ValueError("soundness_bits trebuie sa fie >= 1")
+    pairs = []
+    for t in range(1, t_max + 1):
+        k = -(-soundness_bits // t)
+        if k <= k_max and (not pairs or pairs[-1][0] != k):
+            pairs.append((k, t))
+    return pairs
+
+
+def session_bytes(keys, t: int, mode: str, codec: str) -> int:
+    """Octeții pe fir ai unei autentificări complete (ambele sensuri) cu codec-ul dat."""
+    # importuri locale: verifier.py / server.py importă acest modul pentru --profile
+    from prover import ProverSession
+    from verifier import VerifierSession
+
+    pub = protocols.public_key(keys)
+    prover = ProverSession(keys, "tune", t, mode=mode, codecs=(codec, "json"))
+    verifier = VerifierSession(lambda _name: pub, t, modes=(mode,), codecs=(codec, "json"))
+    total = 0
+
+    def deliver(msg, sender_codec, receiver_codec):
+        nonlocal total
+        frame = encode(msg, sender_codec)
+        total += len(frame)
+        reader = JSON if msg["type"] == "hello" or receiver_codec is None else receiver_codec
+        return reader.read(io.BytesIO(frame))
+
+    to_verifier = [prover.hello()]
+    while to_verifier and not verifier.done:
+        to_prover = []
+        for msg in to_verifier:
+            to_prover += verifier.on_message(deliver(msg, prover.wire_codec, verifier.wire_codec))
+        to_verifier = []
+        for msg in to_prover:
+            to_verifier += prover.on_message(deliver(msg, verifier.wire_codec, prover.wire_codec))
+    return total
+
+
+def _measure_direct(keys, t: int, sessions: int):
+    wall, cpu = [], []
+    for _ in range(sessions):
+        w0, c0 = time.perf_counter(), time.process_time()
+        if keys.protocol == protocols.DEFAULT:
+            authenticate(keys, t)
+        else:
+            protocols.authenticate(keys, t)
+        wall.append(time.perf_counter() - w0)
+        cpu.append(time.process_time() - c0)
+    return wall, cpu
+
+
+def _measure_transport(keys, t: int, kind: str, mode: str, codec: str, sessions: int):
+    from prover import ProverSession, run_session as run_prover
+    from verifier import VerifierSession, run_session as run_verifier
+
+    pub = protocols.public_key(keys)
+    codecs = (codec, "json")
+    prover_end, verifier_end = transport.local_pair(kind)
+
+    def prover_loop() -> None:
+        for _ in range(sessions):
+            run_prover(ProverSession(keys, "tune", t, mode=mode, codecs=codecs), prover_end)
+
+    thread = threading.Thread(target=prover_loop, daemon=True)
+    thread.start()
+    wall, cpu = [], []
+    try:
+        for _ in range(sessions):
+            w0, c0 = time.perf_counter(), time.process_time()
+            run_verifier(VerifierSession(lambda _name: pub, t, modes=(mode,), codecs=codecs), verifier_end)
+            wall.append(time.perf_counter() - w0)
+            # process_time include și thread-ul prover-ului: CPU total per sesiune
+            cpu.append(time.process_time() - c0)
+    finally:
+        thread.join()
+        prover_end.close()
+        verifier_end.close()
+    return wall, cpu
+
+
+def measure(n: int, k: int, t: int, kind: str = "direct", mode: str = "sequential", codec: str = "bin",
+            sessions: int = 50, warmup: int = 5, protocol: str = protocols.DEFAULT) -> Dict[str, Any]:
+    """Latența (mediana, p95) și CPU per autentificare pentru (k, t) pe modulul n, cu 'protocol'."""
+    keys = protocols.get(protocol).keygen(n, k)
+    if kind == "direct":
+        _measure_direct(keys, t, warmup)
+        wall, cpu = _measure_direct(keys, t, sessions)
+    else:
+        _measure_transport(keys, t, kind, mode, codec, warmup)
+        wall, cpu = _measure_transport(keys, t, kind, mode, codec, sessions)
+    # pentru "direct" și "queue": cât ar costa aceeași sesiune pe fir
+    nbytes = session_bytes(keys, t, mode, codec)
+    wall.sort()
+    cpu_mean = statistics.fmean(cpu)
+    return {
+        "protocol": protocol,
+        "k": k,
+        "t": t,
+        "mode": mode,
+        "latency_ms": statistics.median(wall) * 1e3,
+        "p95_ms": wall[min(len(wall) - 1, int(0.95 * len(wall)))] * 1e3,
+        "cpu_ms": cpu_mean * 1e3,
+        # limita superioară de autentificări/s pe un core, din CPU (nu throughput end-to-end)
+        "cpu_rate": 1.0 / cpu_mean if cpu_mean > 0 else float("inf"),
+        "bytes": nbytes,
+    }
+
+
+def best(results: List[Dict[str, Any]], objective: str = "latency") -> Dict[str, Any]:
+    if objective == "latency":
+        return min(results, key=lambda r: (r["latency_ms"], r["bytes"]))
+    if objective == "cpu_rate":
+        return max(results, key=lambda r: (r["cpu_rate"], -r["bytes"]))
+    raise ValueError(f"objective trebuie sa fie unul din {OBJECTIVES}")
+
+
+def make_profile(choice: Dict[str, Any], results: List[Dict[str, Any]], soundness_bits: int, objective: str,
+                 kind: str, codec: str, bits: int) -> Dict[str, Any]:
+    return {
+        "type": PROFILE_TYPE,
+        "version": PROFILE_VERSION,
+        "protocol": choice.get("protocol", protocols.DEFAULT),
+        "k": choice["k"],
+        "t": choice["t"],
+        "mode": choice["mode"],
+        "transport": kind,
+        "codec": codec,
+        "soundness_bits": soundness_bits,
+        "objective": objective,
+        "bits": bits,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "candidates": results,
+    }
+
+
+def save_profile(profile: Dict[str, Any], path: str) -> Path:
+    p = Path(path)
+    p.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+    return p
+
+
+def load_profile(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Profilul scris de 'main.py tune', sau None dacă path e None."""
+    if not path:
+        return None
+    d = json.loads(Path(path).read_text(encoding="utf-8"))
+    if d.get("type") != PROFILE_TYPE or d.get("version") != PROFILE_VERSION:
+        raise ValueError(f"{path} nu pare a fi un profil FFS (main.py tune).")
+    return d
+
+
+def profile_value(profile: Optional[Dict[str, Any]], key: str, explicit, default):
+    """Valoarea explicită din CLI, altfel cea din profil, altfel default."""
+    if explicit is not None:
+        return explicit
+    if profile is not None and key in profile:
+        return profile[key]
+    return default
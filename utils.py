@@ -3,17 +3,26 @@
 # Include:
 #  - invers modular
 #  - random coprime
-#  - test primalitate Miller-Rabin
+#  - test primalitate Miller-Rabin (runde FIPS 186-5, opțional Baillie–PSW)
+#  - ciur incremental pentru candidați
 #  - generare Blum primes (p ≡ 3 mod 4)
+#  - generare paralelă (process pool) pentru p și q
+# Aritmetica grea trece prin bigint.py (gmpy2 dacă e instalat).
 # :contentReference[oaicite:1]{index=1}
 
+import multiprocessing as mp
+import os
 import secrets
-from math import gcd
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import gcd, isqrt
+from typing import Optional
+
+import bigint
 
 
 def modinv(a: int, n: int) -> int:
-    """Invers modular a^{-1} mod n (Python 3.8+)."""
-    return pow(a, -1, n)
+    """Invers modular a^{-1} mod n (backend-ul din bigint.py)."""
+    return int(bigint.invert(a, n))
 
 
 def random_coprime(n: int) -> int:
@@ -24,22 +33,48 @@ def random_coprime(n: int) -> int:
             return x
 
 
-def is_probable_prime(n: int, rounds: int = 16) -> bool:
-    """
-    Test probabilistic Miller–Rabin.
-    rounds=16 e suficient pentru proiect (probabilitate foarte mică de eroare).
-    """
-    if n < 2:
-        return False
+# =========================
+# Test de primalitate
+# =========================
+
+def _small_primes(limit: int) -> list[int]:
+    """Ciurul lui Eratostene: toate primele < limit."""
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
 
-    # small primes quick check
-    small_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
-    for p in small_primes:
-        if n == p:
-            return True
-        if n % p == 0:
-            return False
 
+# primele impare < 2^16 (6541 valori) folosite la cernerea candidaților
+SIEVE_LIMIT = 1 << 16
+SIEVE_PRIMES = _small_primes(SIEVE_LIMIT)[1:]
+
+# prime mici pentru trial division rapid în is_probable_prime
+_TRIAL_PRIMES = [2] + SIEVE_PRIMES[:255]
+
+# Runde Miller–Rabin după dimensiunea candidatului (FIPS 186-5, Tabel B.1,
+# generare p,q pentru RSA). Sub 512 biți (în afara tabelului) păstrăm
+# marja vechii implementări: 16 runde.
+_MR_ROUNDS_TABLE = [
+    (1536, 4),
+    (1024, 5),
+    (512, 7),
+]
+_MR_ROUNDS_DEFAULT = 16
+
+
+def mr_rounds(bits: int) -> int:
+    """Numărul minim de runde Miller–Rabin pentru un candidat de 'bits' biți."""
+    for min_bits, rounds in _MR_ROUNDS_TABLE:
+        if bits >= min_bits:
+            return rounds
+    return _MR_ROUNDS_DEFAULT
+
+
+def _miller_rabin(n: int, bases) -> bool:
+    n = bigint.mpz(n)
     # write n-1 = d * 2^s
     d = n - 1
     s = 0
@@ -48,9 +83,8 @@ def is_probable_prime(n: int, rounds: int = 16) -> bool:
         d //= 2
 
     # witness loop
-    for _ in range(rounds):
-        a = secrets.randbelow(n - 3) + 2  # [2, n-2]
-        x = pow(a, d, n)
+    for a in bases:
+        x = bigint.powmod(a, d, n)
         if x == 1 or x == n - 1:
             continue
 
@@ -64,34 +98,272 @@ def is_probable_prime(n: int, rounds: int = 16) -> bool:
     return True
 
 
-def generate_prime(bits: int, require_mod4_eq_3: bool = False) -> int:
+def jacobi(a: int, n: int) -> int:
+    """Simbolul Jacobi (a/n), n impar pozitiv."""
+    if n <= 0 or n % 2 == 0:
+        raise ValueError("n trebuie sa fie impar si pozitiv")
+    a %= n
+    if bigint.jacobi is not None:
+        return int(bigint.jacobi(a, n))
+    result = 1
+    while a != 0:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas(n: int) -> bool:
+    """
+    Test Lucas tare cu parametrii Selfridge (metoda A): D primul din
+    5, -7, 9, -11, ... cu (D/n) = -1, P = 1, Q = (1 - D) / 4.
+    """
+    r = isqrt(n)
+    if r * r == n:
+        return False
+
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P = 1
+    Q = (1 - D) // 4
+
+    # n + 1 = d * 2^s
+    d = n + 1
+    s = 0
+    while d % 2 == 0:
+        s += 1
+        d //= 2
+
+    def half(x: int) -> int:
+        # x / 2 mod n (n impar)
+        if x & 1:
+            x += n
+        return x >> 1
+
+    # U_d, V_d prin metoda binară (de la indexul 1)
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V = (U * V) % n, (V * V - 2 * Qk) % n
+        Qk = (Qk * Qk) % n
+        if bit == "1":
+            U, V = half((P * U + V) % n), half((D * U + P * V) % n)
+            Qk = (Qk * Q) % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        Qk = (Qk * Qk) % n
+        if V == 0:
+            return True
+    return False
+
+
+def is_probable_prime(n: int, rounds: Optional[int] = None, bpsw: bool = False) -> bool:
+    """
+    Test probabilistic Miller–Rabin.
+    rounds=None => numărul de runde din mr_rounds() (FIPS 186-5).
+    bpsw=True => în plus Baillie–PSW (MR baza 2 + Lucas tare).
+    """
+    if n < 2:
+        return False
+
+    # small primes quick check
+    for p in _TRIAL_PRIMES:
+        if n == p:
+            return True
+        if n % p == 0:
+            return False
+
+    if rounds is None:
+        rounds = mr_rounds(n.bit_length())
+
+    if bigint.is_prime is not None:
+        # gmpy2: Miller–Rabin (și BPSW) din GMP
+        return bigint.is_prime(n, rounds, bpsw)
+
+    bases = (secrets.randbelow(n - 3) + 2 for _ in range(rounds))  # [2, n-2]
+    if not _miller_rabin(n, bases):
+        return False
+
+    if bpsw:
+        return _miller_rabin(n, (2,)) and _strong_lucas(n)
+
+    return True
+
+
+# =========================
+# Generare de prime (ciur incremental + Miller–Rabin)
+# =========================
+
+SIEVE_WINDOW = 4096  # candidați (≡ 3 mod 4 sau impari) per fereastră
+
+
+def _random_start(bits: int, require_mod4_eq_3: bool) -> int:
+    # Asigură: bitul MSB = 1 (dimensiune corectă) și număr impar
+    p = secrets.randbits(bits) | (1 << (bits - 1)) | 1
+    if require_mod4_eq_3:
+        p |= 3
+    return p
+
+
+def prime_candidates(bits: int, require_mod4_eq_3: bool = False, window: int = SIEVE_WINDOW,
+                     max_windows: Optional[int] = None):
+    """
+    Generator de candidați care trec de ciur.
+    Pornește dintr-un singur punct random și parcurge numerele
+    start, start + step, start + 2*step, ... (step = 4 pentru p ≡ 3 mod 4,
+    altfel 2). Pentru fiecare prim mic q ținem reziduul start mod q și îl
+    actualizăm incremental de la o fereastră la alta, fără împărțiri de
+    numere mari. Dacă se depășește 2^bits, se alege un nou start.
+    """
+    step = 4 if require_mod4_eq_3 else 2
+    top = 1 << bits
+    # limita ciurului crește cu dimensiunea: la biți puțini MR e ieftin și
+    # nu merită mii de prime mici
+    limit = min(SIEVE_LIMIT, bits * 32, 1 << (bits - 1))
+    primes = [q for q in SIEVE_PRIMES if q < limit]
+    # step^{-1} mod q, ca să găsim primul index i cu start + i*step ≡ 0 (mod q)
+    inv_step = [pow(step, -1, q) for q in primes]
+    advance = step * window
+
+    windows = 0
+    while True:
+        start = _random_start(bits, require_mod4_eq_3)
+        residues = [start % q for q in primes]
+
+        while start + advance <= top:
+            if max_windows is not None and windows >= max_windows:
+                return
+            windows += 1
+
+            sieve = bytearray([1]) * window
+            for idx, q in enumerate(primes):
+                i0 = (-residues[idx] * inv_step[idx]) % q
+                if i0 < window:
+                    sieve[i0::q] = bytes(len(range(i0, window, q)))
+                residues[idx] = (residues[idx] + advance) % q
+
+            for i in range(window):
+                if sieve[i]:
+                    yield start + i * step
+
+            start += advance
+
+
+def generate_prime(bits: int, require_mod4_eq_3: bool = False, workers: int = 1,
+                   bpsw: bool = False) -> int:
     """
     Generează un prim de 'bits' biți.
     Dacă require_mod4_eq_3=True, generează Blum prime: p ≡ 3 (mod 4),
     conform Protocol 10.26 (p și q congruente cu 3 mod 4). :contentReference[oaicite:2]{index=2}
+    Candidații vin din prime_candidates(); doar cei care trec de ciur
+    ajung la Miller–Rabin. Cu workers > 1, căutarea se împarte pe un process pool.
     """
     if bits < 16:
         raise ValueError("bits trebuie sa fie >= 16")
 
-    while True:
-        # Asigură: bitul MSB = 1 (dimensiune corectă) și număr impar
-        p = secrets.randbits(bits) | (1 << (bits - 1)) | 1
-
-        if require_mod4_eq_3 and (p % 4 != 3):
-            continue
+    if workers > 1:
+        return generate_primes_parallel(bits, 1, require_mod4_eq_3, workers=workers, bpsw=bpsw)[0]
 
-        if is_probable_prime(p):
+    rounds = mr_rounds(bits)
+    for p in prime_candidates(bits, require_mod4_eq_3):
+        if is_probable_prime(p, rounds=rounds, bpsw=bpsw):
             return p
+    raise AssertionError("unreachable")
 
 
-def generate_blum_modulus(bits: int) -> tuple[int, int, int]:
+def generate_blum_modulus(bits: int, workers: int = 1) -> tuple[int, int, int]:
     """
     Generează p,q Blum primes (p≡q≡3 mod 4) și n=p*q.
     Returnează (p, q, n). Conform Step 1, Protocol 10.26. :contentReference[oaicite:3]{index=3}
+    Cu workers > 1, p și q sunt căutate simultan pe același pool.
     """
+    if workers > 1:
+        p, q = generate_primes_parallel(bits, 2, require_mod4_eq_3=True, workers=workers)
+        return p, q, p * q
+
     p = generate_prime(bits, require_mod4_eq_3=True)
     q = generate_prime(bits, require_mod4_eq_3=True)
     while q == p:
         q = generate_prime(bits, require_mod4_eq_3=True)
     n = p * q
     return p, q, n
+
+
+# =========================
+# Generare paralelă (process pool)
+# =========================
+
+_stop_event = None
+
+
+def _init_prime_worker(stop_event) -> None:
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _search_prime_batch(bits: int, require_mod4_eq_3: bool, windows: int, bpsw: bool) -> Optional[int]:
+    """
+    Rulează în worker: cerne cel mult 'windows' ferestre dintr-un start random
+    și testează supraviețuitorii. Se oprește devreme dacă alt worker a
+    semnalat că rezultatul e gata.
+    """
+    rounds = mr_rounds(bits)
+    for p in prime_candidates(bits, require_mod4_eq_3, max_windows=windows):
+        if _stop_event is not None and _stop_event.is_set():
+            return None
+        if is_probable_prime(p, rounds=rounds, bpsw=bpsw):
+            return p
+    return None
+
+
+def generate_primes_parallel(
+    bits: int,
+    count: int,
+    require_mod4_eq_3: bool = False,
+    workers: Optional[int] = None,
+    batch: int = 1,
+    bpsw: bool = False,
+) -> list[int]:
+    """
+    Caută 'count' prime distincte de 'bits' biți pe un pool de procese.
+    Fiecare task cerne 'batch' ferestre de candidați; pool-ul ține mereu
+    'workers' loturi în lucru și se oprește imediat ce are 'count' prime.
+    """
+    if bits < 16:
+        raise ValueError("bits trebuie sa fie >= 16")
+    if count <= 0:
+        raise ValueError("count trebuie sa fie >= 1")
+
+    workers = workers or os.cpu_count() or 1
+    stop_event = mp.Event()
+    found: list[int] = []
+
+    ex = ProcessPoolExecutor(max_workers=workers, initializer=_init_prime_worker, initargs=(stop_event,))
+    try:
+        pending = {ex.submit(_search_prime_batch, bits, require_mod4_eq_3, batch, bpsw) for _ in range(workers)}
+        while len(found) < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                p = fut.result()
+                if p is not None and p not in found and len(found) < count:
+                    found.append(p)
+            while len(found) < count and len(pending) < workers:
+                pending.add(ex.submit(_search_prime_batch, bits, require_mod4_eq_3, batch, bpsw))
+    finally:
+        stop_event.set()
+        ex.shutdown(wait=True, cancel_futures=True)
+
+    return found
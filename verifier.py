@@ -1,122 +1,465 @@
 # verifier.py
 import argparse
-import json
 import subprocess
 import sys
-from typing import Any, Dict
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
 
-from storage import load_public
+import bigint
+import metrics
+import protocols
+import tickets
+import transport
+import tuning
+# verifier_check (mutat în ffs.py) rămâne importabil și de aici: audit.py, fiat_shamir.py, bench-urile
+from ffs import verifier_check
+from precomp import build_table
+from storage import check_name, open_store
+from transcript import open_transcript
+from wire import CODECS, MAX_T, MODES, make_codec
 
-def send(proc: subprocess.Popen, msg: Dict[str, Any]) -> None:
-    proc.stdin.write(json.dumps(msg) + "\n")
-    proc.stdin.flush()
+# cât așteptăm ca un prover pornit de authenticate_spawn să iasă singur
+PROVER_EXIT_TIMEOUT = 5.0
 
-def recv(proc: subprocess.Popen) -> Dict[str, Any]:
-    line = proc.stdout.readline()
-    if not line:
-        raise EOFError("Prover closed stdout (EOF).")
-    return json.loads(line)
 
-def verifier_check(n: int, v: list[int], x: int, e: list[int], y: int) -> bool:
-    # z = y^2 * Π v_j^{e_j} mod n; accept if z = ±x and z != 0
-    z = pow(y, 2, n)
-    for j in range(len(v)):
-        if e[j] == 1:
-            z = (z * v[j]) % n
-    return (z != 0) and (z == x or z == (-x) % n)
+def _is_int(value: Any) -> bool:
+    # x, y vin deja ca int din codec-uri; orice altceva e un mesaj greșit al prover-ului
+    return isinstance(value, int) and not isinstance(value, bool)
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--name", required=True)
-    ap.add_argument("--keys-dir", default="keys")
-    ap.add_argument("--t", type=int, default=4)
-    ap.add_argument("--verbose", action="store_true")
-    ap.add_argument("--python", default=sys.executable, help="python executable (default: current)")
-    args = ap.parse_args()
 
-    pub = load_public(args.name, keys_dir=args.keys_dir)
-    n = pub["n"]
-    k = pub["k"]
-    v = pub["v"]
+class VerifierSession:
+    """
+    Starea verifier-ului pentru o autentificare, fără I/O.
+    on_message() primește un mesaj de la prover și întoarce mesajele de
+    trimis înapoi. La final: done=True și ok = rezultatul autentificării.
 
-    # Start prover as subprocess
-    proc = subprocess.Popen(
-        [args.python, "prover.py", "--name", args.name, "--keys-dir", args.keys_dir, "--t", str(args.t)],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        text=True,
-        bufsize=1,
-    )
+    lookup(name) -> {n, k, v[, v_table, protocol]} dă cheia publică pentru numele din hello.
+    t este numărul minim de runde acceptat; cu min_bits, pragul e în biți de
+    soundness (protocol.soundness_bits(k, t), ex. o rundă GQ cu k mare) și
+    t nu mai contează. modes sunt modurile permise,
+    codecs codec-urile de fir acceptate (primul oferit de prover câștigă),
+    protocols protocoalele acceptate (protocols.py); protocolul din hello
+    trebuie să fie și cel al cheii publice.
+    transcript (opțional): transcript.TranscriptWriter, primește fiecare
+    rundă verificată (nume, runda, x, e, y, ok).
+    tickets (opțional): tickets.TicketIssuer; un tichet valid prezentat în
+    hello înlocuiește rundele, iar după o sesiune acceptată se emite unul
+    nou dacă prover-ul l-a cerut ("want_ticket").
+    """
 
-    try:
-        hello = recv(proc)
-        if args.verbose:
-            print("Prover says:", hello)
-
-        ok_all = True
-
-        for round_no in range(1, args.t + 1):
-            msg = recv(proc)
-            if msg.get("type") != "commit" or msg.get("round") != round_no:
-                print("Bad commit from prover:", msg)
-                ok_all = False
-                break
+    def __init__(self, lookup: Callable[[str], Dict[str, Any]], t: int,
+                 modes=MODES, verbose: bool = False, codecs=CODECS, transcript=None, tickets=None,
+                 protocols=protocols.NAMES, min_bits: Optional[int] = None):
+        self.lookup = lookup
+        self.protocols = tuple(protocols)
+        self.protocol = None
+        self.transcript = transcript
+        self.tickets = tickets
+        self.want_ticket = False
+        self.ticket_used = False
+        self.min_t = t
+        self.min_bits = min_bits
+        self.modes = tuple(modes)
+        self.codecs = tuple(codecs)
+        self.verbose = verbose
+        self.codec = "json"
+        self._wire_codec = None
 
-            x = int(msg["x"])
+        self.name: Optional[str] = None
+        self.pub: Optional[Dict[str, Any]] = None
+        self.t = t
+        self.mode: Optional[str] = None
+        self.round_no = 0
+        self.x: List[int] = []
+        self.e: List[List[int]] = []
+        self.ok = True
+        self.done = False
+        self.error: Optional[str] = None
 
-            # Verifier chooses random challenge vector e
-            e = [0] * k
-            # make it random
-            import secrets
-            e = [secrets.randbelow(2) for _ in range(k)]
+        # metrics: momentul începerii sesiunii și al ultimului mesaj trimis
+        self._started: Optional[float] = None
+        self._sent_at: Optional[float] = None
 
-            send(proc, {"type": "challenge", "round": round_no, "e": e})
+    @property
+    def wire_codec(self):
+        """Codec-ul negociat (JSON până la hello)."""
+        if self.pub is None:
+            return None
+        if self._wire_codec is None or self._wire_codec.name != self.codec:
+            self._wire_codec = make_codec(self.codec, self.pub["n"], self.pub["k"])
+        return self._wire_codec
 
-            msg2 = recv(proc)
-            if msg2.get("type") != "response" or msg2.get("round") != round_no:
-                print("Bad response from prover:", msg2)
-                ok_all = False
-                break
+    def _challenge(self) -> List[int]:
+        if metrics.ENABLED:
+            t0 = perf_counter()
+        # Verifier chooses random challenge vector e
+        e = self.protocol.challenge(self.pub["k"])
+        if metrics.ENABLED:
+            metrics.observe("ffs_verifier_challenge_seconds", perf_counter() - t0)
+        return e
 
-            y = int(msg2["y"])
+    def _check(self, round_no: int, x: int, e: List[int], y: int) -> bool:
+        n, v = self.pub["n"], self.pub["v"]
+        if metrics.ENABLED:
+            t0 = perf_counter()
+        ok = self.protocol.check(self.pub, x, e, y)
+        if metrics.ENABLED:
+            metrics.observe("ffs_verifier_check_seconds", perf_counter() - t0)
+        if self.transcript is not None:
+            self.transcript.record(self.name, round_no, x, e, y, ok)
 
-            ok = verifier_check(n, v, x, e, y)
-
-            if args.verbose:
+        if self.verbose:
+            print(f"\n--- Runda {round_no} ({self.protocol.name}) ---")
+            print("x =", x)
+            print("e =", e)
+            print("y =", y)
+            if self.protocol.name == "ffs":
                 # compute z for display
                 z = pow(y, 2, n)
-                for j in range(k):
+                for j in range(len(v)):
                     if e[j] == 1:
                         z = (z * v[j]) % n
-                print(f"\n--- Runda {round_no} ---")
-                print("x =", x)
-                print("e =", e)
-                print("y =", y)
                 print("z =", z)
                 print("z==x?", z == x)
                 print("z==-x mod n?", z == (-x) % n)
-                print("OK?", ok)
+            print("OK?", ok)
+
+        return ok
+
+    def _fail(self, message: str, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self.ok = False
+        self.done = True
+        self.error = message
+        if self.verbose:
+            print(message + ":", msg)
+        return [{"type": "error", "message": message}]
+
+    def on_message(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not metrics.ENABLED:
+            return self._dispatch(msg)
+
+        now = perf_counter()
+        mtype = msg.get("type")
+        if self._started is None:
+            self._started = now
+        if self._sent_at is not None:
+            if mtype in ("commit", "commits"):
+                metrics.observe("ffs_verifier_commit_wait_seconds", now - self._sent_at, {"mode": self.mode})
+            elif mtype in ("response", "responses"):
+                metrics.observe("ffs_verifier_response_wait_seconds", now - self._sent_at, {"mode": self.mode})
+
+        was_done = self.done
+        out = self._dispatch(msg)
+        self._sent_at = perf_counter()
+
+        if self.done and not was_done:
+            result = "error" if self.error is not None else ("accepted" if self.ok else "rejected")
+            metrics.inc("ffs_verifier_sessions_total", labels={"result": result})
+            metrics.observe("ffs_verifier_session_seconds", self._sent_at - self._started, {"mode": self.mode})
+        return out
+
+    def _dispatch(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        mtype = msg.get("type")
+
+        if mtype == "error":
+            # prover-ul a abandonat deja; nu mai răspundem
+            self._fail("Prover error", msg)
+            return []
+
+        if mtype == "done":
+            if self.verbose:
+                print("\nProver done:", msg)
+            self.done = True
+            return []
+
+        if self.pub is None:
+            return self._on_hello(msg)
+
+        if self.mode == "parallel":
+            return self._on_parallel(msg)
+        return self._on_sequential(msg)
+
+    def _strong_enough(self, protocol: str, k: int, t: int) -> bool:
+        if not 1 <= t <= MAX_T:
+            return False
+        if self.min_bits is None:
+            return t >= self.min_t
+        return protocols.get(protocol).soundness_bits(k, t) >= self.min_bits
+
+    def _on_hello(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if msg.get("type") != "hello" or msg.get("role") != "prover":
+            return self._fail("Expected hello", msg)
+        if self.verbose:
+            print("Prover says:", msg)
+
+        try:
+            name = check_name(msg.get("name"))
+            pub = self.lookup(name)
+        except (OSError, KeyError, ValueError):
+            return self._fail("Unknown prover", msg)
+
+        protocol = msg.get("protocol", protocols.DEFAULT)
+        if protocol not in self.protocols or protocol != protocols.of_public(pub):
+            return self._fail("Unsupported protocol", msg)
+
+        t = msg.get("t")
+        if msg.get("k") != pub["k"] or not isinstance(t, int) or not self._strong_enough(protocol, pub["k"], t):
+            return self._fail("Bad hello parameters", msg)
+
+        # modul propus de prover, dacă e permis; altfel primul comun
+        offered = msg.get("modes") or [msg.get("mode", "sequential")]
+        preferred = msg.get("mode", "sequential")
+        if preferred in self.modes:
+            mode = preferred
+        else:
+            common = [m for m in offered if m in self.modes]
+            if not common:
+                return self._fail("No common mode", msg)
+            mode = common[0]
+
+        offered_codecs = msg.get("codecs") or ["json"]
+        codec = next((c for c in offered_codecs if c in self.codecs), "json")
+
+        self.name = name
+        self.pub = pub
+        self.protocol = protocols.get(protocol)
+        self.t = t
+        self.mode = mode
+        self.codec = codec
+        self.round_no = 1
+        reply = {"type": "hello", "role": "verifier", "protocol": protocol, "mode": mode, "codec": codec, "t": t}
+
+        if self.tickets is not None:
+            self.want_ticket = bool(msg.get("want_ticket"))
+            if msg.get("ticket") is not None:
+                ok, reason = self.tickets.verify(msg["ticket"], self.name, pub, rounds=t)
+                reply["ticket"] = "accepted" if ok else reason
+                if ok:
+                    # re-autentificare fără runde
+                    self.ticket_used = True
+                    self.done = True
+                    if self.verbose:
+                        print("Ticket accepted for", self.name)
+        return [reply]
+
+    def _finish_rounds(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Rezultatul final; dacă sesiunea a fost acceptată, înainte de el vine tichetul cerut."""
+        if self.tickets is None or not self.ok or not self.want_ticket:
+            return [result]
+        ticket, expires = self.tickets.issue(self.name, self.pub)
+        return [{"type": "ticket", "ticket": ticket, "expires": expires}, result]
+
+    def _on_sequential(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        round_no = self.round_no
+        mtype = msg.get("type")
 
-            send(proc, {"type": "result", "round": round_no, "ok": ok})
+        if mtype == "commit" and msg.get("round") == round_no and not self.x:
+            if not _is_int(msg.get("x")):
+                return self._fail("Bad commit from prover", msg)
+            self.x = [msg["x"]]
+            self.e = [self._challenge()]
+            return [{"type": "challenge", "round": round_no, "e": self.e[0]}]
 
+        if mtype == "response" and msg.get("round") == round_no and self.x:
+            if not _is_int(msg.get("y")):
+                return self._fail("Bad response from prover", msg)
+            ok = self._check(round_no, self.x[0], self.e[0], msg["y"])
+            self.x, self.e = [], []
             if not ok:
-                ok_all = False
-                break
+                # runda respinsă încheie sesiunea: nu mai așteptăm "done" de la prover
+                self.ok = False
+                self.done = True
+            elif round_no < self.t:
+                self.round_no += 1
+                return [{"type": "result", "round": round_no, "ok": ok}]
+            return self._finish_rounds({"type": "result", "round": round_no, "ok": ok})
 
-        done = recv(proc)
-        if args.verbose:
-            print("\nProver done:", done)
+        return self._fail("Bad message from prover", msg)
 
-        print("\n=== VERIFIER FINAL ===")
-        print("Accepted?", ok_all)
+    def _on_parallel(self, msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+        mtype = msg.get("type")
 
-        return 0 if ok_all else 1
+        if mtype == "commits" and not self.x:
+            xs = msg.get("x")
+            if not (isinstance(xs, list) and len(xs) == self.t and all(_is_int(x) for x in xs)):
+                return self._fail("Bad commits from prover", msg)
+            self.x = list(xs)
+            self.e = [self._challenge() for _ in range(self.t)]
+            return [{"type": "challenges", "e": self.e}]
 
+        if mtype == "responses" and self.x:
+            ys = msg.get("y")
+            if not (isinstance(ys, list) and len(ys) == self.t and all(_is_int(y) for y in ys)):
+                return self._fail("Bad responses from prover", msg)
+            for i, (x, e, y) in enumerate(zip(self.x, self.e, ys), start=1):
+                if not self._check(i, x, e, y):
+                    self.ok = False
+                    break
+            self.x, self.e = [], []
+            return self._finish_rounds({"type": "result", "ok": self.ok})
+
+        return self._fail("Bad message from prover", msg)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--name", required=True)
+    ap.add_argument("--keys-dir", default="keys")
+    ap.add_argument("--store", default=None, help="baza SQLite cu cheile publice (default: JSON in --keys-dir)")
+    ap.add_argument("--t", type=int, default=None, help="numar runde (default: din --profile, altfel 4)")
+    ap.add_argument("--mode", choices=MODES, default=None,
+                    help="sequential: 2t round trip-uri; parallel: numar fix de round trip-uri "
+                         "(default: din --profile, altfel sequential)")
+    ap.add_argument("--profile", default=None, help="profil scris de 'main.py tune' (t si mode)")
+    ap.add_argument("--codec", choices=CODECS, default=None,
+                    help="codec-ul de fir dupa hello (default: bin; json ramane fallback)")
+    ap.add_argument("--protocols", nargs="+", choices=protocols.NAMES, default=list(protocols.NAMES),
+                    help="protocoalele acceptate (protocolul e cel al cheii prover-ului)")
+    ap.add_argument("--verbose", action="store_true")
+    ap.add_argument("--python", default=sys.executable, help="python executable (default: current)")
+    ap.add_argument("--precompute-mb", type=float, default=0,
+                    help="memorie pentru tabelul de produse v (MiB, 0 = dezactivat)")
+    ap.add_argument("--window", type=int, default=None, help="fereastra tabelului (default: automat)")
+    ap.add_argument("--commit-pool", type=int, default=0,
+                    help="commitment-uri precalculate in prover (0 = dezactivat)")
+    ap.add_argument("--sessions", type=int, default=1, help="numar de autentificari (default: 1)")
+    ap.add_argument("--pool", type=int, default=0,
+                    help="foloseste N procese prover calde in loc de un proces nou per autentificare")
+    ap.add_argument("--transcript", default=None,
+                    help="adauga rundele verificate in acest jurnal (vezi audit.py)")
+    tickets.add_cli_args(ap)
+    ap.add_argument("--ticket-file", default=None,
+                    help="fisierul de tichete al prover-ului pornit (cu --tickets, sesiunile urmatoare il refolosesc)")
+    metrics.add_cli_args(ap)
+    bigint.add_cli_args(ap)
+    args = ap.parse_args()
+    if args.pool > 0:
+        # worker-ii pool-ului vorbesc printr-un Pipe multiprocessing (fără codec de fir)
+        # și nu păstrează tichete între sesiuni
+        for flag, value in (("--codec", args.codec), ("--tickets", args.tickets or None),
+                            ("--ticket-file", args.ticket_file)):
+            if value is not None:
+                ap.error(f"{flag} nu se poate folosi cu --pool")
+    args.codec = args.codec or "bin"
+    bigint.apply_cli_args(ap, args)
+    profile = tuning.load_profile(args.profile)
+    args.t = tuning.profile_value(profile, "t", args.t, 4)
+    args.mode = tuning.profile_value(profile, "mode", args.mode, "sequential")
+    if args.metrics_out:
+        metrics.enable()
+
+    store = open_store(args.store, args.keys_dir)
+    try:
+        pub = store.load_public(args.name)
     finally:
+        store.close()
+    if args.precompute_mb > 0 and protocols.of_public(pub) == "ffs":
+        pub["v_table"] = build_table(pub["v"], pub["n"], args.window, int(args.precompute_mb * 2**20))
+
+    def lookup(name: str) -> Dict[str, Any]:
+        if name != args.name:
+            raise KeyError(name)
+        return pub
+
+    accepted = 0
+    issuer = tickets.from_cli_args(args)
+    log = open_transcript(args.transcript)
+    try:
+        if args.pool > 0:
+            from prover_pool import ProverPool
+
+            with ProverPool(args.pool, keys_dir=args.keys_dir, precompute_bytes=int(args.precompute_mb * 2**20),
+                            commit_pool=args.commit_pool) as pool:
+                for _ in range(args.sessions):
+                    accepted += pool.authenticate(lookup, args.name, args.t, mode=args.mode,
+                                                  verbose=args.verbose, transcript=log,
+                                                  protocols=args.protocols)
+        else:
+            for _ in range(args.sessions):
+                accepted += authenticate_spawn(args, lookup, log, issuer)
+    finally:
+        if log is not None:
+            log.close()
+
+    if args.metrics_out:
+        print("Metrics:", metrics.export(args.metrics_out, args.metrics_format))
+
+    print("\n=== VERIFIER FINAL ===")
+    print("protocol:", protocols.of_public(pub), "| mode:", args.mode)
+    if issuer is not None:
+        print("tickets:", issuer.stats, f"| hit rate: {issuer.hit_rate:.1%}")
+    if args.sessions > 1:
+        print("Accepted:", accepted, "/", args.sessions)
+    else:
+        print("Accepted?", accepted == 1)
+
+    return 0 if accepted == args.sessions else 1
+
+
+def run_session(session: VerifierSession, conn) -> bool:
+    """Rulează sesiunea verifier-ului peste un transport (transport.py) până la final."""
+    while not session.done:
+        try:
+            msg = conn.recv(session.wire_codec)
+        except EOFError:
+            raise EOFError("Prover closed the connection (EOF).") from None
+        for out in session.on_message(msg):
+            conn.send(out, session.wire_codec)
+    return session.ok
+
+
+def spawn_prover(args: argparse.Namespace) -> subprocess.Popen:
+    """Pornește prover.py ca subproces, cu stdin/stdout pe pipe-uri."""
+    prover_cmd = [args.python, "prover.py", "--name", args.name, "--keys-dir", args.keys_dir,
+                  "--t", str(args.t), "--mode", args.mode, "--codecs", args.codec, "json"]
+    if args.precompute_mb > 0:
+        prover_cmd += ["--precompute-mb", str(args.precompute_mb)]
+        if args.window is not None:
+            prover_cmd += ["--window", str(args.window)]
+    if getattr(args, "commit_pool", 0) > 0:
+        prover_cmd += ["--commit-pool", str(args.commit_pool)]
+    if getattr(args, "ticket_file", None):
+        prover_cmd += ["--ticket-file", args.ticket_file]
+    return subprocess.Popen(
+        prover_cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+
+def authenticate_spawn(args: argparse.Namespace, lookup: Callable[[str], Dict[str, Any]],
+                       transcript=None, tickets=None) -> bool:
+    """O autentificare cu un proces prover nou (calea clasică)."""
+    proc = spawn_prover(args)
+    try:
+        session = VerifierSession(lookup, args.t, modes=(args.mode,), verbose=args.verbose,
+                                  codecs=(args.codec, "json"), transcript=transcript, tickets=tickets,
+                                  protocols=args.protocols)
+        return run_session(session, transport.popen(proc))
+
+    finally:
+        stop_prover(proc)
+
+
+def stop_prover(proc: subprocess.Popen, timeout: float = PROVER_EXIT_TIMEOUT) -> None:
+    """
+    Lasă prover-ul să se termine singur (după sesiune își salvează tichetul),
+    apoi îl culege; terminate()/kill() doar dacă nu iese în 'timeout' secunde.
+    """
+    try:
+        proc.stdin.close()
+    except OSError:
+        pass
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proc.terminate()
         try:
-            proc.terminate()
-        except Exception:
-            pass
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    proc.stdout.close()
 
 if __name__ == "__main__":
     raise SystemExit(main())
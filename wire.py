@@ -1,14 +1,274 @@
 # wire.py
+# Mesajele protocolului sunt dict-uri; pe fir sunt codate de un codec:
+#   - json: o linie JSON per mesaj (întregii mari x, y ca string zecimal)
+#   - bin : cadre binare cu prefix de lungime; x, y big-endian pe lățimea
+#           lui n, vectorii challenge ca bitmap de k biți
+# Mesajele "hello" sunt mereu JSON; codec-ul pentru restul sesiunii se
+# negociază în hello (prover-ul oferă "codecs", verifier-ul alege "codec").
 import json
+import struct
 import sys
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 
-def send(msg: Dict[str, Any]) -> None:
-    sys.stdout.write(json.dumps(msg) + "\n")
-    sys.stdout.flush()
+def send(msg: Dict[str, Any], out: Optional[BinaryIO] = None, codec=None) -> None:
+    out = out or sys.stdout.buffer
+    out.write(encode(msg, codec))
+    out.flush()
 
-def recv() -> Dict[str, Any]:
-    line = sys.stdin.readline()
-    if not line:
-        raise EOFError("No more input (EOF).")
-    return json.loads(line)
+def recv(inp: Optional[BinaryIO] = None, codec=None) -> Dict[str, Any]:
+    return (codec or JSON).read(inp or sys.stdin.buffer)
+
+def encode(msg: Dict[str, Any], codec=None) -> bytes:
+    """Codează msg; hello merge mereu ca JSON."""
+    if codec is None or msg.get("type") == "hello":
+        codec = JSON
+    return codec.encode(msg)
+
+def parse_address(addr: str) -> Tuple[str, Any]:
+    """
+    'tcp://host:port' -> ("tcp", (host, port))
+    'unix:/cale/socket' sau 'unix:///cale/socket' -> ("unix", "/cale/socket")
+    """
+    if addr.startswith("unix:"):
+        path = addr[len("unix:"):]
+        if path.startswith("//"):
+            path = path[2:]
+        return "unix", path
+    if addr.startswith("tcp://"):
+        host, _, port = addr[len("tcp://"):].rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"Adresa TCP invalida: {addr}")
+        return "tcp", (host.strip("[]"), int(port))
+    raise ValueError(f"Adresa necunoscuta (tcp://host:port sau unix:/cale): {addr}")
+
+# Moduri de rulare a celor t runde (negociate în hello):
+#   sequential - câte un schimb commit/challenge/response/result pe rundă
+#   parallel   - toate cele t runde într-un singur schimb (one-shot t)
+MODES = ("sequential", "parallel")
+
+
+# =========================
+# Codec-uri
+# =========================
+
+# câmpurile cu întregi mari (sau liste de întregi mari)
+_BIG_FIELDS = ("x", "y")
+
+
+def _json_int(field: str, val: Any) -> int:
+    # pe fir întregii mari sunt string-uri zecimale (encode); float-uri ca 1e3 nu se acceptă
+    if isinstance(val, int) and not isinstance(val, bool):
+        return val
+    if isinstance(val, str) and val.isascii() and val.isdigit():
+        return int(val)
+    raise ValueError(f"Campul {field!r} nu este un intreg.")
+
+
+class JsonCodec:
+    """O linie JSON per mesaj."""
+    name = "json"
+
+    def encode(self, msg: Dict[str, Any]) -> bytes:
+        d = dict(msg)
+        for f in _BIG_FIELDS:
+            if f in d:
+                val = d[f]
+                d[f] = [str(x) for x in val] if isinstance(val, list) else str(val)
+        return (json.dumps(d) + "\n").encode("utf-8")
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        d = json.loads(data)
+        if not isinstance(d, dict):
+            raise ValueError("Mesajul JSON nu este un obiect.")
+        if d.get("type") != "hello":
+            for f in _BIG_FIELDS:
+                if f in d:
+                    val = d[f]
+                    d[f] = [_json_int(f, x) for x in val] if isinstance(val, list) else _json_int(f, val)
+        return d
+
+    def read(self, inp: BinaryIO) -> Dict[str, Any]:
+        line = inp.readline()
+        if not line:
+            raise EOFError("No more input (EOF).")
+        return self.decode(line)
+
+    async def aread(self, reader) -> Dict[str, Any]:
+        line = await reader.readline()
+        if not line:
+            raise EOFError("No more input (EOF).")
+        return self.decode(line)
+
+
+JSON = JsonCodec()
+
+# tipurile de mesaje în codec-ul binar
+_T_COMMIT, _T_CHALLENGE, _T_RESPONSE, _T_RESULT = 1, 2, 3, 4
+_T_COMMITS, _T_CHALLENGES, _T_RESPONSES, _T_DONE, _T_ERROR = 5, 6, 7, 8, 9
+_T_TICKET = 10
+_TYPE_CODES = {
+    "commit": _T_COMMIT, "challenge": _T_CHALLENGE, "response": _T_RESPONSE, "result": _T_RESULT,
+    "commits": _T_COMMITS, "challenges": _T_CHALLENGES, "responses": _T_RESPONSES,
+    "done": _T_DONE, "error": _T_ERROR, "ticket": _T_TICKET,
+}
+_TYPE_NAMES = {v: k for k, v in _TYPE_CODES.items()}
+
+_HEADER = struct.Struct(">IB")  # lungime (tip + payload), tip
+_U32 = struct.Struct(">I")
+_F64 = struct.Struct(">d")
+MAX_FRAME = 64 * 1024 * 1024
+# limita pentru t (și pentru count în commits/challenges/responses)
+MAX_T = 4096
+
+
+class BinaryCodec:
+    """
+    Cadru: u32 lungime | u8 tip | payload.
+      commit/response     : u32 round | int
+      challenge           : u32 round | bitmap(k)
+      result              : u32 round (0 = parallel) | u8 ok
+      commits/responses   : u32 count | count * int
+      challenges          : u32 count | count * bitmap(k)
+      done                : u8 ok
+      error               : u32 round | mesaj utf-8
+      ticket              : f64 expirare | tichet ascii
+    int = big-endian pe nbytes (lățimea lui n); bitmap(k) = ceil(k/8) octeți,
+    bitul j = e_{j+1}.
+    """
+    name = "bin"
+
+    def __init__(self, nbytes: int, k: int):
+        self.nbytes = nbytes
+        self.k = k
+        self.ebytes = (k + 7) // 8
+
+    def _int(self, x: int) -> bytes:
+        return x.to_bytes(self.nbytes, "big")
+
+    def _bitmap(self, e: List[int]) -> bytes:
+        m = 0
+        for j, bit in enumerate(e):
+            if bit:
+                m |= 1 << j
+        return m.to_bytes(self.ebytes, "little")
+
+    def _bits(self, data: bytes) -> List[int]:
+        m = int.from_bytes(self._fixed(data, self.ebytes, "e"), "little")
+        if m >> self.k:
+            raise ValueError(f"Challenge binar cu biti peste k={self.k}")
+        return [(m >> j) & 1 for j in range(self.k)]
+
+    @staticmethod
+    def _fixed(data: bytes, size: int, field: str) -> bytes:
+        # câmpurile x, y, e au lățimea fixă negociată (nbytes / ebytes)
+        if len(data) != size:
+            raise ValueError(f"Camp binar {field} de {len(data)} octeti (asteptat {size})")
+        return data
+
+    def encode(self, msg: Dict[str, Any]) -> bytes:
+        mtype = msg["type"]
+        code = _TYPE_CODES[mtype]
+        rnd = _U32.pack(msg.get("round", 0))
+
+        if code in (_T_COMMIT, _T_RESPONSE):
+            body = rnd + self._int(msg["x" if code == _T_COMMIT else "y"])
+        elif code == _T_CHALLENGE:
+            body = rnd + self._bitmap(msg["e"])
+        elif code == _T_RESULT:
+            body = rnd + bytes([bool(msg.get("ok"))])
+        elif code in (_T_COMMITS, _T_RESPONSES):
+            vals = msg["x" if code == _T_COMMITS else "y"]
+            body = _U32.pack(len(vals)) + b"".join(self._int(v) for v in vals)
+        elif code == _T_CHALLENGES:
+            body = _U32.pack(len(msg["e"])) + b"".join(self._bitmap(e) for e in msg["e"])
+        elif code == _T_DONE:
+            body = bytes([bool(msg.get("ok"))])
+        elif code == _T_TICKET:
+            body = _F64.pack(msg.get("expires", 0.0)) + msg["ticket"].encode("ascii")
+        else:
+            body = rnd + str(msg.get("message", "")).encode("utf-8")
+
+        return _HEADER.pack(len(body) + 1, code) + body
+
+    def _count(self, body: bytes, size: int) -> int:
+        # count vine de pe fir: se verifică înainte de a aloca lista
+        count = _U32.unpack_from(body)[0]
+        if count > MAX_T or len(body) != 4 + count * size:
+            raise ValueError(f"Cadru binar invalid (count {count}, {len(body)} octeti)")
+        return count
+
+    def decode(self, code: int, body: bytes) -> Dict[str, Any]:
+        mtype = _TYPE_NAMES.get(code)
+        if mtype is None:
+            raise ValueError(f"Tip de mesaj binar necunoscut: {code}")
+        try:
+            return self._decode(mtype, code, body)
+        except (struct.error, IndexError):
+            raise ValueError(f"Cadru binar trunchiat ({mtype}, {len(body)} octeti)") from None
+
+    def _decode(self, mtype: str, code: int, body: bytes) -> Dict[str, Any]:
+        msg: Dict[str, Any] = {"type": mtype}
+        nb, eb = self.nbytes, self.ebytes
+
+        if code in (_T_COMMIT, _T_RESPONSE, _T_CHALLENGE, _T_RESULT, _T_ERROR):
+            rnd = _U32.unpack_from(body)[0]
+            if rnd:
+                msg["round"] = rnd
+            rest = body[4:]
+            if code == _T_COMMIT:
+                msg["x"] = int.from_bytes(self._fixed(rest, nb, "x"), "big")
+            elif code == _T_RESPONSE:
+                msg["y"] = int.from_bytes(self._fixed(rest, nb, "y"), "big")
+            elif code == _T_CHALLENGE:
+                msg["e"] = self._bits(rest)
+            elif code == _T_RESULT:
+                msg["ok"] = bool(rest[0])
+            else:
+                msg["message"] = rest.decode("utf-8", "replace")
+        elif code in (_T_COMMITS, _T_RESPONSES):
+            count = self._count(body, nb)
+            msg["x" if code == _T_COMMITS else "y"] = [
+                int.from_bytes(body[4 + i * nb:4 + (i + 1) * nb], "big") for i in range(count)
+            ]
+        elif code == _T_CHALLENGES:
+            count = self._count(body, eb)
+            msg["e"] = [self._bits(body[4 + i * eb:4 + (i + 1) * eb]) for i in range(count)]
+        elif code == _T_TICKET:
+            msg["expires"] = _F64.unpack_from(body)[0]
+            msg["ticket"] = body[_F64.size:].decode("ascii", "replace")
+        else:
+            msg["ok"] = bool(body[0])
+        return msg
+
+    def _check_length(self, length: int) -> None:
+        if not 1 <= length <= MAX_FRAME:
+            raise ValueError(f"Cadru binar invalid (lungime {length})")
+
+    def read(self, inp: BinaryIO) -> Dict[str, Any]:
+        header = inp.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise EOFError("No more input (EOF).")
+        length, code = _HEADER.unpack(header)
+        self._check_length(length)
+        body = inp.read(length - 1)
+        if len(body) < length - 1:
+            raise EOFError("Truncated frame (EOF).")
+        return self.decode(code, body)
+
+    async def aread(self, reader) -> Dict[str, Any]:
+        header = await reader.readexactly(_HEADER.size)
+        length, code = _HEADER.unpack(header)
+        self._check_length(length)
+        return self.decode(code, await reader.readexactly(length - 1))
+
+
+# în ordinea preferinței
+CODECS = ("bin", "json")
+
+
+def make_codec(name: str, n: int, k: int):
+    if name == "json":
+        return JSON
+    if name == "bin":
+        return BinaryCodec((n.bit_length() + 7) // 8, k)
+    raise ValueError(f"Codec necunoscut: {name}")